@@ -0,0 +1,159 @@
+"""Load test for the local JSON API: requests per second and latency percentiles.
+
+For each ledger size a generated ledger is served by ``main.py serve`` in
+a child process, and ``--clients`` concurrent clients, each on its own
+keep-alive connection, send a mix of reads (a transaction by id, the
+summary, a page of expenses, the category report, a search) and, for the
+``--write-ratio`` share of requests, writes (add, update, and delete of a
+row the client added itself). Any response with an unexpected status
+counts as an error and makes the exit status non-zero. Run from the
+repository root:
+
+    python -m benchmarks.api_load --sizes 1k 100k --clients 1 16 64 --duration 10
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+from urllib.parse import urlsplit, quote
+
+from benchmarks.generate import REMARKS, generate, parse_size
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = sorted({word for words in REMARKS.values() for word in words})
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {f"p{int(fraction * 100)}_ms": round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 3)
+            for fraction in (0.5, 0.95, 0.99)} | {"max_ms": round(samples[-1] * 1000, 3)}
+
+
+async def _request(reader, writer, method, path, document=None):
+    """Send one request on a keep-alive connection and return (status, body)."""
+    body = b"" if document is None else json.dumps(document).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, rows, write_ratio, deadline, rng, samples, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    added = []
+    try:
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                choice = rng.random()
+                if added and choice < 0.25:
+                    op, expected = "delete", 200
+                    request = ("DELETE", f"/transactions/{added.pop()}", None)
+                elif choice < 0.6:
+                    op, expected = "add", 201
+                    request = ("POST", "/transactions", {"date": "15/06/2025", "amount": "12.50",
+                                                         "category": "Food & Dining", "remarks": "load test",
+                                                         "type": "expense"})
+                else:
+                    op, expected = "update", 200
+                    request = ("PATCH", f"/transactions/{rng.randint(1, rows)}",
+                               {"amount": f"{rng.uniform(1, 100):.2f}"})
+            else:
+                op, expected = rng.choice(["get", "get", "get", "summary", "page", "report", "search"]), 200
+                path = {
+                    "get": lambda: f"/transactions/{rng.randint(1, rows)}",
+                    "summary": lambda: "/summary",
+                    "page": lambda: f"/transactions?type=expense&offset={rng.randint(0, 200)}&limit=20",
+                    "report": lambda: "/reports/categories",
+                    "search": lambda: f"/search?q={quote(rng.choice(WORDS))}&limit=20"
+                }[op]()
+                request = ("GET", path, None)
+
+            started = time.perf_counter()
+            status, body = await _request(reader, writer, *request)
+            samples[op].append(time.perf_counter() - started)
+            if status != expected:
+                errors[op] += 1
+            elif op == "add":
+                added.append(json.loads(body)["id"])
+    finally:
+        writer.close()
+
+
+async def _load(host, port, rows, clients, duration, write_ratio, seed):
+    samples, errors = defaultdict(list), defaultdict(int)
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, rows, write_ratio, started + duration,
+                                   random.Random(seed * 1000 + client), samples, errors)
+                           for client in range(clients)))
+    return time.perf_counter() - started, samples, errors
+
+
+def run(rows, backend, client_counts, duration, write_ratio, seed):
+    """Serve a generated ledger of ``rows`` rows and load it with each client count."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        generate(directory, rows, seed)
+        env = dict(os.environ, BUDGET_DATA_DIR=directory, BUDGET_STORAGE_BACKEND=backend)
+        server = subprocess.Popen([sys.executable, "main.py", "serve", "--port", "0"], cwd=BASE_DIR, env=env,
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            url = urlsplit(json.loads(server.stdout.readline())["listening"])
+            for clients in client_counts:
+                elapsed, samples, errors = asyncio.run(
+                    _load(url.hostname, url.port, rows, clients, duration, write_ratio, seed))
+                requests = sum(len(latencies) for latencies in samples.values())
+                results.append({
+                    "rows": rows,
+                    "backend": backend,
+                    "clients": clients,
+                    "requests": requests,
+                    "requests_per_sec": round(requests / elapsed, 1),
+                    **_percentiles([latency for latencies in samples.values() for latency in latencies]),
+                    "errors": sum(errors.values()),
+                    "ops": {op: {"requests": len(latencies), "errors": errors[op], **_percentiles(latencies)}
+                            for op, latencies in sorted(samples.items())}
+                })
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size("1k"), parse_size("100k")])
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite", "binary"], nargs="+", default=["json"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 64], help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per client count")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that are writes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    for backend in args.backend:
+        for rows in args.sizes:
+            for result in run(rows, backend, args.clients, args.duration, args.write_ratio, args.seed):
+                failures += result["errors"]
+                print(json.dumps(result), flush=True)
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
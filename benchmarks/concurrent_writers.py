@@ -0,0 +1,98 @@
+"""Stress benchmark: several processes adding transactions to one ledger at the same time.
+
+Every writer tags its rows with a unique remark, so after the run the ledger
+is re-read and checked for lost or duplicated updates. Run from the
+repository root:
+
+    python -m benchmarks.concurrent_writers --writers 1 2 4 8 --ops 200 --batch 1 25
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+from src.models.transaction_store import TransactionStore, JournalTransactionStore
+from src.models.binary_store import BinaryTransactionStore
+
+
+def _open_store(backend, directory):
+    path = os.path.join(directory, "transactions.json")
+    meta_path = os.path.join(directory, "transactions.meta.json")
+    if backend == "journal":
+        return JournalTransactionStore(path, os.path.join(directory, "transactions.journal"), meta_path=meta_path)
+    if backend == "binary":
+        return BinaryTransactionStore(os.path.join(directory, "transactions.bin"),
+                                      os.path.join(directory, "transactions.bin.meta.json"))
+    return TransactionStore(path, meta_path)
+
+
+def _writer(backend, directory, writer, ops, batch_size, start):
+    store = _open_store(backend, directory)
+    start.wait()
+    for first in range(0, ops, batch_size):
+        # each batch is one group commit: one lock acquisition and one write
+        with store.batch():
+            for op in range(first, min(first + batch_size, ops)):
+                store.add("01/01/2024", "1.00", "Others", f"{writer}:{op}", "expense")
+
+
+def run(backend, writers, ops, batch_size):
+    """Time ``writers`` processes adding ``ops`` rows each and verify the result."""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "transactions.json"), 'w', encoding='utf-8') as file:
+            file.write("[]")
+
+        start = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=_writer, args=(backend, directory, writer, ops, batch_size, start))
+                     for writer in range(writers)]
+        for process in processes:
+            process.start()
+
+        started = time.perf_counter()
+        start.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        transactions = _open_store(backend, directory).all()
+        expected = {f"{writer}:{op}" for writer in range(writers) for op in range(ops)}
+        found = [t.remarks for t in transactions]
+        ids = [t.id for t in transactions]
+
+        return {
+            "backend": backend,
+            "writers": writers,
+            "batch": batch_size,
+            "ops": writers * ops,
+            "seconds": round(elapsed, 4),
+            "ops_per_sec": round(writers * ops / elapsed, 1),
+            "lost": len(expected - set(found)),
+            "duplicated": len(found) - len(set(found)) + len(ids) - len(set(ids)),
+            "failed_writers": sum(1 for process in processes if process.exitcode)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["json", "journal", "binary"], nargs="+",
+                        default=["json", "journal", "binary"])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=200, help="rows added by each writer")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 25], help="rows per group commit")
+    args = parser.parse_args()
+
+    failures = 0
+    for backend in args.backend:
+        for batch_size in args.batch:
+            for writers in args.writers:
+                result = run(backend, writers, args.ops, batch_size)
+                failures += result["lost"] + result["duplicated"] + result["failed_writers"]
+                print(json.dumps(result), flush=True)
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Seeded synthetic ledger generator for the benchmarks.
+
+Writes ``transactions.json`` and ``categories.json`` into a data directory.
+The ledger has realistic shapes rather than uniform noise:
+- ids run mostly in date order, with some entries backdated by a few days
+- weekends are busier
+- about one row in twelve is income
+- amounts are log-normal around a typical value per category
+- a share of remarks is left empty
+
+Rows are streamed to disk in the same indented layout the store writes, so
+10M rows do not have to fit in memory. Run from the repository root:
+
+    python -m benchmarks.generate --rows 1m --out /tmp/ledger
+"""
+
+import os
+import json
+import math
+import time
+import random
+import argparse
+from collections import namedtuple
+from datetime import date
+
+from src.models.transaction_store import _format_record
+
+Row = namedtuple("Row", "id date amount category_id remarks type")
+
+# (category, weight, typical amount, spread) per type, spread is the sigma of the log-normal
+CATEGORIES = {
+    "expense": [
+        ("Food & Dining", 40, 12.0, 0.6),
+        ("Transportation", 20, 8.0, 0.5),
+        ("Shopping", 15, 45.0, 0.9),
+        ("Housing & Utilities", 8, 900.0, 0.3),
+        ("Insurance", 4, 150.0, 0.2),
+        ("Others", 13, 30.0, 1.0)
+    ],
+    "income": [
+        ("Salary", 70, 5000.0, 0.1),
+        ("Investment", 15, 200.0, 1.0),
+        ("Gifts", 10, 100.0, 0.7),
+        ("Others", 5, 50.0, 0.8)
+    ]
+}
+INCOME_SHARE = 1 / 12
+# category ids in categories.json order, expense categories first
+CATEGORY_IDS = {(transaction_type, entry[0]): category_id for category_id, (transaction_type, entry) in enumerate(
+    ((transaction_type, entry) for transaction_type, entries in CATEGORIES.items() for entry in entries), start=1)}
+
+REMARKS = {
+    "Food & Dining": ["lunch", "dinner", "breakfast", "coffee", "hawker", "groceries", "supper", "takeaway"],
+    "Transportation": ["bus", "train", "taxi", "grab", "fuel", "parking", "toll"],
+    "Shopping": ["clothes", "shoes", "books", "gadgets", "gift", "online", "household"],
+    "Housing & Utilities": ["rent", "electricity", "water", "internet", "phone", "repairs"],
+    "Insurance": ["health", "life", "car", "travel"],
+    "Salary": ["monthly", "bonus", "overtime"],
+    "Investment": ["dividend", "interest", "coupon"],
+    "Gifts": ["birthday", "festive", "angpao"],
+    "Others": ["misc", "refund", "fees", "donation", "subscription"]
+}
+EMPTY_REMARKS = 0.3
+
+LAST_DAY = date(2025, 12, 31).toordinal()
+
+
+def parse_size(text):
+    """Parse a row count such as 1000, 100k or 10m."""
+    text = text.strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale != 1 else text) * scale)
+
+
+def generate_rows(rows, seed=0, years=5):
+    """Yield ``rows`` Row records, oldest first apart from the occasional backdated entry."""
+    rng = random.Random(seed)
+    first_day = LAST_DAY - int(years * 365.25)
+    span = LAST_DAY - first_day
+    weighted = {transaction_type: (entries, [weight for _, weight, _, _ in entries])
+                for transaction_type, entries in CATEGORIES.items()}
+
+    for index in range(1, rows + 1):
+        ordinal = first_day + span * index // rows
+        if rng.random() < 0.1:
+            ordinal -= rng.randint(1, 7)
+        # some weekday rows move to the Saturday after, so weekends are busier (ordinal 1 is a Monday)
+        weekday = (ordinal - 1) % 7
+        if weekday < 5 and rng.random() < 0.2:
+            ordinal += 5 - weekday
+        ordinal = max(first_day, min(LAST_DAY, ordinal))
+
+        transaction_type = "income" if rng.random() < INCOME_SHARE else "expense"
+        entries, weights = weighted[transaction_type]
+        category, _, typical, spread = rng.choices(entries, weights)[0]
+        amount = max(0.01, rng.lognormvariate(math.log(typical), spread))
+
+        remarks = ""
+        if rng.random() >= EMPTY_REMARKS:
+            remarks = " ".join(rng.sample(REMARKS[category], rng.randint(1, 2)))
+
+        yield Row(index, date.fromordinal(ordinal).strftime("%d/%m/%Y"), f"{amount:.2f}",
+                  CATEGORY_IDS[(transaction_type, category)], remarks, transaction_type)
+
+
+def generate(directory, rows, seed=0, years=5):
+    """Write transactions.json and categories.json for ``rows`` rows into ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "categories.json"), 'w', encoding='utf-8') as file:
+        json.dump({"next_id": len(CATEGORY_IDS) + 1,
+                   "categories": [{"id": category_id, "type": transaction_type, "name": name}
+                                  for (transaction_type, name), category_id in CATEGORY_IDS.items()]}, file, indent=4)
+
+    with open(os.path.join(directory, "transactions.json"), 'w', encoding='utf-8') as file:
+        separator = "[\n"
+        for row in generate_rows(rows, seed, years):
+            file.write(separator + _format_record(row))
+            separator = ",\n"
+        file.write("[]" if separator == "[\n" else "\n]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_size, default=parse_size("100k"), help="e.g. 1k, 100k, 1m, 10m")
+    parser.add_argument("--out", required=True, help="data directory to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=float, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generate(args.out, args.rows, args.seed, args.years)
+    print(json.dumps({"rows": args.rows, "seed": args.seed, "directory": args.out,
+                      "seconds": round(time.perf_counter() - started, 2)}))
+
+
+if __name__ == "__main__":
+    main()
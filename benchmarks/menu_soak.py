@@ -0,0 +1,102 @@
+"""Soak benchmark: drive the menus through a long scripted session and watch memory.
+
+The app runs against a temporary copy of the data with ``input`` fed from a
+script that cycles through every menu, a report, invalid choices and
+"Go Back". Traced memory is sampled as the session goes on; the run fails
+if it keeps growing after the first sample or the session does not reach
+its last navigation. Run from the repository root:
+
+    python -m benchmarks.menu_soak --navigations 100000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import builtins
+import resource
+import tempfile
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# one lap through the menus, every entry is one answer to input()
+LAP = [
+    "1", "8",                   # manage transactions, go back
+    "2", "3", "", "13",         # reports, financial summary, continue, go back
+    "3", "7", "", "8",          # categories, view categories, continue, go back
+    "x", "2", "99", "13",       # invalid choice on the main and the reports menus
+]
+
+
+def _script(navigations):
+    for step in range(navigations):
+        yield LAP[step % len(LAP)]
+    # finish the lap back on the main menu, then exit
+    for answer in LAP[navigations % len(LAP):] if navigations % len(LAP) else ():
+        yield answer
+    yield "5"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--navigations", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--max-growth-kb", type=float, default=256.0,
+                        help="allowed growth of traced memory between the first and last sample")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("transactions.json", "categories.json"):
+            shutil.copy(os.path.join(BASE_DIR, "data", name), directory)
+        os.environ["BUDGET_DATA_DIR"] = directory
+        sys.path.insert(0, BASE_DIR)
+        from main import BudgetApp
+
+        answers = _script(args.navigations)
+        interval = max(1, args.navigations // args.samples)
+        samples = []
+        count = 0
+
+        def scripted_input(prompt=""):
+            nonlocal count
+            count += 1
+            if count % interval == 0:
+                samples.append(tracemalloc.get_traced_memory()[0])
+            return next(answers)
+
+        app = BudgetApp()
+        builtins.input = scripted_input
+        time.sleep = lambda seconds: None
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            app.run()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    growth = (samples[-1] - samples[0]) / 1024 if len(samples) > 1 else 0.0
+    result = {
+        "navigations": count,
+        "seconds": round(elapsed, 2),
+        "navigations_per_sec": round(count / elapsed, 1),
+        "traced_kb": [round(sample / 1024, 1) for sample in samples],
+        "traced_growth_kb": round(growth, 1),
+        "traced_peak_kb": round(peak / 1024, 1),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "passed": count > args.navigations and growth <= args.max_growth_kb
+    }
+    print(json.dumps(result, indent=4))
+    raise SystemExit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Startup benchmark: import cost and wall clock time until the main menu is shown.
+
+A ledger of ``--rows`` transactions is generated in a temporary data
+directory. The app is started once cold (no checkpoint yet) and
+``--runs`` times warm, and the best warm time is compared with the budget.
+Run from the repository root:
+
+    python -m benchmarks.startup --rows 100000 --budget-ms 150
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_MARKER = b"Main Menu"
+
+
+def _write_ledger(directory, rows):
+    random.seed(0)
+    with open(os.path.join(directory, "transactions.json"), 'w', encoding='utf-8') as file:
+        json.dump([{
+            "id": index,
+            "date": f"{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/{random.randint(2020, 2025)}",
+            "amount": f"{random.randint(1, 100000) / 100:.2f}",
+            "category": random.choice(["Food & Dining", "Transportation", "Shopping", "Salary"]),
+            "remarks": "",
+            "type": random.choice(["expense", "income"])
+        } for index in range(1, rows + 1)], file, indent=4)
+    shutil.copy(os.path.join(BASE_DIR, "data", "categories.json"), directory)
+
+
+def import_time(env):
+    """Return (total import ms of main, [(ms, module)] of the slowest project modules)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules.append((int(cumulative) / 1000, name))
+    total = next(ms for ms, name in modules if name == "main")
+    slowest = sorted(((ms, name) for ms, name in modules if name.startswith("src.")), reverse=True)[:5]
+    return total, slowest
+
+
+def time_to_menu(env):
+    """Start main.py and return the milliseconds until the main menu is printed."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=BASE_DIR, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b""
+    while MENU_MARKER not in output:
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError("main.py exited before showing the main menu")
+        output += chunk
+    elapsed = (time.perf_counter() - started) * 1000
+    process.communicate(b"5\n", timeout=30)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="allowed warm time to the first menu")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _write_ledger(directory, args.rows)
+        env = dict(os.environ, BUDGET_DATA_DIR=directory, TERM="dumb")
+
+        cold = time_to_menu(env)
+        warm = min(time_to_menu(env) for _ in range(args.runs))
+        imports, slowest = import_time(env)
+
+    result = {
+        "rows": args.rows,
+        "cold_ms": round(cold, 1),
+        "warm_ms": round(warm, 1),
+        "import_ms": round(imports, 1),
+        "slowest_imports": [[name, round(ms, 1)] for ms, name in slowest],
+        "budget_ms": args.budget_ms,
+        "within_budget": warm <= args.budget_ms
+    }
+    print(json.dumps(result, indent=4))
+    raise SystemExit(0 if result["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Benchmark suite: time the model operations on synthetic ledgers of several sizes.
+
+For each size a seeded ledger is generated (see benchmarks.generate) into a
+temporary data directory. The operations then run in a fresh Python
+process, so every size reports its own peak RSS. For each operation the
+suite records:
+- how many times it ran
+- wall time
+- ops/sec
+- the process's peak RSS once it finished
+
+The results are one JSON document. Pass a previous run as ``--baseline`` to
+list the operations whose ops/sec dropped by more than ``--tolerance``; the
+exit status is then non-zero. Run from the repository root:
+
+    python -m benchmarks.suite --sizes 1k 100k 1m 10m --output results.json
+    python -m benchmarks.suite --sizes 1k 100k --baseline results.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import importlib
+import platform
+import resource
+import tempfile
+import subprocess
+
+from benchmarks.generate import generate, parse_size
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _measure(name, operation, ops=1):
+    """Call ``operation(index)`` ``ops`` times and return its result record."""
+    started = time.perf_counter()
+    for index in range(ops):
+        operation(index)
+    elapsed = time.perf_counter() - started
+    return {
+        "op": name,
+        "ops": ops,
+        "seconds": round(elapsed, 6),
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed else None,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def run_operations(ops, reads, seed):
+    """Time every operation against the ledger in BUDGET_DATA_DIR. Runs in the child process."""
+    # importing the model opens the store, which migrates the generated ledger for every backend but json
+    results = [_measure("import", lambda index: importlib.import_module("src.models.transaction"))]
+    from src.models import transaction
+    from src.services.report_service import get_financial_summary
+
+    rng = random.Random(seed)
+    # before anything loads the ledger, so backends with random access are timed without it
+    lookups = [rng.randint(1, sum(transaction.get_totals().counts.values()) or 1) for _ in range(reads)]
+    results.append(_measure("get_transaction", lambda index: transaction.get_transaction(lookups[index]), reads))
+    results.append(_measure("load_transactions", lambda index: transaction.load_transactions()))
+    ids = [t.id for t in transaction.load_transactions()]
+
+    results.append(_measure("get_total", lambda index: transaction.get_total("expense"), reads))
+    results.append(_measure("get_financial_summary", lambda index: get_financial_summary(), reads))
+
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        results.append(_measure("view_filtered_transactions",
+                                lambda index: transaction.view_filtered_transactions("expense")))
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    results.append(_measure("add_transaction", lambda index: transaction.add_transaction(
+        "15/06/2025", "12.50", "Food & Dining", f"benchmark {index}", "expense"), ops))
+
+    targets = rng.sample(ids, min(len(ids), 2 * ops))
+    updates, deletes = targets[:ops], targets[ops:]
+    results.append(_measure("update_transaction", lambda index: transaction.update_transaction(
+        updates[index], "20.00", "Shopping", "16/06/2025", "updated"), len(updates)))
+    results.append(_measure("delete_transaction", lambda index: transaction.delete_transaction(deletes[index]),
+                            len(deletes)))
+
+    ledger = list(transaction.load_transactions())
+    results.append(_measure("save_transactions", lambda index: transaction.save_transactions(ledger)))
+    return results
+
+
+def run_size(rows, backend, ops, reads, seed):
+    """Generate a ledger of ``rows`` rows and time the operations on it in a fresh process."""
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        generate(directory, rows, seed)
+        generated = time.perf_counter() - started
+        size = os.path.getsize(os.path.join(directory, "transactions.json"))
+
+        env = dict(os.environ, BUDGET_DATA_DIR=directory, BUDGET_STORAGE_BACKEND=backend)
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", "--ops", str(ops), "--reads", str(reads),
+             "--seed", str(seed)],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True)
+        if child.returncode:
+            raise RuntimeError(f"benchmark of {rows} rows failed:\n{child.stderr}")
+
+    return [{"rows": rows, "backend": backend, **result} for result in json.loads(child.stdout)], {
+        "rows": rows, "generate_seconds": round(generated, 2), "file_mb": round(size / 1e6, 1)}
+
+
+def compare(results, baseline, tolerance):
+    """Return the operations whose ops/sec fell by more than ``tolerance`` relative to ``baseline``."""
+    previous = {(r["rows"], r["backend"], r["op"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["rows"], result["backend"], result["op"]))
+        # only like-for-like runs are compared, a different op count measures a different workload
+        if not before or before["ops"] != result["ops"] or not before["ops_per_sec"] or not result["ops_per_sec"]:
+            continue
+        ratio = result["ops_per_sec"] / before["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append({"rows": result["rows"], "backend": result["backend"], "op": result["op"],
+                                "ops_per_sec": result["ops_per_sec"], "baseline_ops_per_sec": before["ops_per_sec"],
+                                "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size("1k"), parse_size("100k")],
+                        help="ledger sizes such as 1k 100k 1m 10m")
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite", "binary"], nargs="+",
+                        default=["json"])
+    parser.add_argument("--ops", type=int, default=20, help="adds, updates and deletes timed per size")
+    parser.add_argument("--reads", type=int, default=1000, help="get_total and summary calls timed per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed drop in ops/sec before a regression")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        json.dump(run_operations(args.ops, args.reads, args.seed), sys.stdout)
+        return
+
+    results = []
+    ledgers = []
+    for backend in args.backend:
+        for rows in args.sizes:
+            timings, ledger = run_size(rows, backend, args.ops, args.reads, args.seed)
+            results.extend(timings)
+            if all(known["rows"] != rows for known in ledgers):
+                ledgers.append(ledger)
+            print(f"{backend} {rows} rows done", file=sys.stderr, flush=True)
+
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "ledgers": ledgers,
+        "results": results
+    }
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            document["regressions"] = compare(results, json.load(file), args.tolerance)
+
+    output = json.dumps(document, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + "\n")
+    print(output)
+    raise SystemExit(1 if document.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Write-behind benchmark: per-change latency and what a crash can lose.
+
+Latency: on generated ledgers of each size, single adds, updates and
+deletes are timed one at a time, ``--interval`` seconds apart as a user
+would make them, once saving before each change returns and once with
+write-behind. With write-behind the latency should stay flat as the
+ledger grows. A change made while the JSON backend is still rewriting the
+whole file for an earlier one waits for that write, so ``--interval``
+should model a user's pause between changes rather than a burst.
+
+Durability: a child process adds rows with write-behind on and reports
+each one once the add returns. The child is then stopped:
+- SIGKILL, at random moments. The ledger must still load, and only
+  changes from the last WRITE_BEHIND_MAX_DELAY seconds (plus
+  ``--slack`` for the write itself) may be missing.
+- SIGINT, as Ctrl-C does. Every reported change must be on disk.
+The exit status is non-zero if any check fails. Run from the repository
+root:
+
+    python -m benchmarks.write_behind --sizes 1k 100k --kills 10
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.generate import generate, parse_size
+from src.utils.settings import WRITE_BEHIND_MAX_DELAY
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {f"p{int(fraction * 100)}_ms": round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 3)
+            for fraction in (0.5, 0.95, 0.99)} | {"max_ms": round(samples[-1] * 1000, 3)}
+
+
+def child_latency(ops, interval, seed):
+    """Time single changes against the ledger in BUDGET_DATA_DIR. Runs in the child process."""
+    from src.models import transaction
+
+    if float(os.environ["BUDGET_WRITE_BEHIND_DELAY"]) > 0:
+        transaction.enable_write_behind()
+    rng = random.Random(seed)
+    ids = [t.id for t in transaction.load_transactions()]
+    targets = rng.sample(ids, min(len(ids), 2 * ops))
+    operations = {
+        "add": lambda index: transaction.add_transaction("15/06/2025", "12.50", "Food & Dining", "benchmark", "expense"),
+        "update": lambda index: transaction.update_transaction(targets[index], "20.00", "Shopping", "16/06/2025", "x"),
+        "delete": lambda index: transaction.delete_transaction(targets[ops + index])
+    }
+
+    results = {}
+    for name, operation in operations.items():
+        samples = []
+        for index in range(min(ops, len(targets) // 2)):
+            started = time.perf_counter()
+            operation(index)
+            samples.append(time.perf_counter() - started)
+            time.sleep(interval)
+        results[name] = _percentiles(samples)
+    transaction.flush_transactions()
+    return results
+
+
+def child_writer(acknowledgements):
+    """Add rows until stopped, writing "<id> <monotonic time>" after each add returns. Runs in the child process."""
+    from src.models import transaction
+
+    transaction.enable_write_behind()
+    index = 0
+    # the lines only have to outlive the process, not the machine, so no fsync
+    with open(acknowledgements, 'w', encoding='utf-8', buffering=1) as file:
+        while True:
+            added = transaction.add_transaction("15/06/2025", "1.00", "Others", f"writer {index}", "expense")
+            file.write(f"{added.id} {time.monotonic()}\n")
+            index += 1
+            time.sleep(0.001)
+
+
+def _env(directory, backend, delay=None):
+    env = dict(os.environ, BUDGET_DATA_DIR=directory, BUDGET_STORAGE_BACKEND=backend)
+    if delay is not None:
+        env["BUDGET_WRITE_BEHIND_DELAY"] = str(delay)
+    return env
+
+
+def _saved_ids(directory, backend):
+    """Load the ledger in a fresh process and return the ids it holds, or None if it does not load."""
+    child = subprocess.run(
+        [sys.executable, "-c", "import json; from src.models.transaction import load_transactions; "
+                               "print(json.dumps([t.id for t in load_transactions()]))"],
+        cwd=BASE_DIR, env=_env(directory, backend), capture_output=True, text=True)
+    return set(json.loads(child.stdout)) if not child.returncode else None
+
+
+def run_latency(rows, backend, ops, interval, seed):
+    results = []
+    for delay in (0, 0.2):
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, rows, seed)
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.write_behind", "--child", "latency", "--ops", str(ops),
+                 "--interval", str(interval), "--seed", str(seed)],
+                cwd=BASE_DIR, env=_env(directory, backend, delay), capture_output=True, text=True)
+            if child.returncode:
+                raise RuntimeError(f"latency run on {rows} rows failed:\n{child.stderr}")
+        for op, latency in json.loads(child.stdout).items():
+            results.append({"rows": rows, "backend": backend, "write_behind": bool(delay), "op": op, **latency})
+    return results
+
+
+def run_stop(rows, backend, stop_signal, after, slack, seed):
+    """Stop a writer with ``stop_signal`` after ``after`` seconds and check what reached the disk."""
+    with tempfile.TemporaryDirectory() as directory:
+        generate(directory, rows, seed)
+        acknowledgements = os.path.join(directory, "acknowledged.txt")
+        process = subprocess.Popen([sys.executable, "-m", "benchmarks.write_behind", "--child", "writer",
+                                    "--acknowledgements", acknowledgements],
+                                   cwd=BASE_DIR, env=_env(directory, backend), stderr=subprocess.DEVNULL)
+        time.sleep(after)
+        stopped_at = time.monotonic()
+        process.send_signal(stop_signal)
+        process.wait()
+        acknowledged = {}
+        # the writer may not have got as far as its first add
+        if os.path.exists(acknowledgements):
+            with open(acknowledgements, 'r', encoding='utf-8') as file:
+                # a line cut off by the kill was never complete, so its add was not acknowledged
+                acknowledged = {int(line.split()[0]): float(line.split()[1]) for line in file if line.endswith("\n")}
+        saved = _saved_ids(directory, backend)
+
+    lost = {} if saved is None else {id: stopped_at - at for id, at in acknowledged.items() if id not in saved}
+    if stop_signal == signal.SIGKILL:
+        # only changes younger than the flush deadline may be missing
+        passed = saved is not None and all(age < WRITE_BEHIND_MAX_DELAY + slack for age in lost.values())
+    else:
+        passed = saved is not None and not lost
+    return {
+        "rows": rows,
+        "backend": backend,
+        "signal": signal.Signals(stop_signal).name,
+        "after_seconds": round(after, 3),
+        "acknowledged": len(acknowledged),
+        "ledger_loads": saved is not None,
+        "lost": len(lost),
+        "oldest_lost_seconds": round(max(lost.values()), 3) if lost else None,
+        "passed": passed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size("1k"), parse_size("100k")])
+    parser.add_argument("--backend", choices=["json", "journal"], nargs="+", default=["json", "journal"])
+    parser.add_argument("--ops", type=int, default=20, help="changes of each kind timed per size")
+    parser.add_argument("--interval", type=float, default=1.0, help="pause between timed changes")
+    parser.add_argument("--kills", type=int, default=5, help="SIGKILL runs per size and backend")
+    parser.add_argument("--slack", type=float, default=1.0, help="seconds allowed for a flush to reach the disk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", choices=["latency", "writer"], help=argparse.SUPPRESS)
+    parser.add_argument("--acknowledgements", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "latency":
+        json.dump(child_latency(args.ops, args.interval, args.seed), sys.stdout)
+        return
+    if args.child == "writer":
+        child_writer(args.acknowledgements)
+        return
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for backend in args.backend:
+        for rows in args.sizes:
+            for result in run_latency(rows, backend, args.ops, args.interval, args.seed):
+                print(json.dumps(result), flush=True)
+            runs = [(signal.SIGKILL, rng.uniform(0.5, 3.0)) for _ in range(args.kills)] + [(signal.SIGINT, 1.5)]
+            for stop_signal, after in runs:
+                result = run_stop(rows, backend, stop_signal, after, args.slack, args.seed)
+                failures += not result["passed"]
+                print(json.dumps(result), flush=True)
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,38 @@
 """Command-line interface for the budget tracking application."""
 
+import sys
 from src.ui.menu_manager import MenuManager
 from src.ui.display_manager import DisplayManager
-from src.ui.transaction_ui import TransactionUI
-from src.ui.category_ui import CategoryUI
-from src.services.report_service import display_financial_summary
-from src.models.transaction import view_filtered_transactions
+from src.services.report_service import (display_financial_summary, display_totals_check, display_category_breakdown,
+                                         display_monthly_breakdown, display_category_month_pivot)
+from src.models.transaction import view_filtered_transactions, enable_write_behind, flush_transactions, take_save_error
 
 class BudgetApp:
     def __init__(self):
         self.display = DisplayManager()
         self.menu = MenuManager()
-        self.transaction_ui = TransactionUI(self.display)
-        self.category_ui = CategoryUI(self.display)
+        self._transaction_ui = None
+        self._category_ui = None
         self.menu.initialize_menus(self)
+        # saving happens in the background so prompts come back straight away; the
+        # queue is flushed by exit_app, or at interpreter exit after Ctrl-C
+        enable_write_behind()
+        self.display.notices.append(self._save_warning)
+
+    # the screens are built on first use so startup only pays for the main menu
+    @property
+    def transaction_ui(self):
+        if self._transaction_ui is None:
+            from src.ui.transaction_ui import TransactionUI
+            self._transaction_ui = TransactionUI(self.display)
+        return self._transaction_ui
+
+    @property
+    def category_ui(self):
+        if self._category_ui is None:
+            from src.ui.category_ui import CategoryUI
+            self._category_ui = CategoryUI(self.display)
+        return self._category_ui
 
     def main(self):
         """Main menu of the application."""
@@ -24,7 +43,7 @@ class BudgetApp:
         self.menu.display_menu("Main Menu:", self.menu.main_menu)
 
         choice = input("\nEnter your choice: ")
-        self.menu.handle_menu_choice(self.menu.main_menu, choice, self.main)
+        return self.menu.handle_menu_choice(self.menu.main_menu, choice)
 
     def manage_transactions(self):
         """Transaction management menu."""
@@ -33,7 +52,7 @@ class BudgetApp:
         self.menu.display_menu("Manage Transactions", self.menu.transaction_menu)
 
         choice = input("\nEnter your choice: ")
-        self.menu.handle_menu_choice(self.menu.transaction_menu, choice, self.manage_transactions)
+        return self.menu.handle_menu_choice(self.menu.transaction_menu, choice)
 
     def view_reports(self):
         """Reports menu."""
@@ -42,7 +61,34 @@ class BudgetApp:
         self.menu.display_menu("View Reports", self.menu.reports_menu)
 
         choice = input("\nEnter your choice: ")
-        self.menu.handle_menu_choice(self.menu.reports_menu, choice, self.view_reports)
+        return self.menu.handle_menu_choice(self.menu.reports_menu, choice)
+
+    def diagnostics(self):
+        """Instrumentation counters for the ledger I/O, totals and rendering paths."""
+        from src.utils.instrumentation import snapshot
+        from src.utils.settings import INSTRUMENTATION
+        self.display.clear()
+        self.display.show_diagnostics(snapshot(), INSTRUMENTATION)
+        self.menu.display_menu("Diagnostics", self.menu.diagnostics_menu)
+
+        choice = input("\nEnter your choice: ")
+        return self.menu.handle_menu_choice(self.menu.diagnostics_menu, choice)
+
+    def dump_diagnostics(self):
+        """Write the instrumentation counters to the diagnostics file."""
+        from src.utils.instrumentation import dump
+        from src.utils.settings import DIAGNOSTICS_FILE
+        try:
+            dump(DIAGNOSTICS_FILE)
+            print(f"\nDiagnostics written to {DIAGNOSTICS_FILE}")
+        except OSError as error:
+            print(f"\nCould not write diagnostics: {error}")
+        input("\nPress Enter to continue...")
+
+    def reset_diagnostics(self):
+        """Start the instrumentation counters from zero."""
+        from src.utils.instrumentation import reset
+        reset()
 
     def manage_categories(self):
         """Category management menu."""
@@ -51,7 +97,7 @@ class BudgetApp:
         self.menu.display_menu("Manage Categories", self.menu.categories_menu)
 
         choice = input("\nEnter your choice: ")
-        self.menu.handle_menu_choice(self.menu.categories_menu, choice, self.manage_categories)
+        return self.menu.handle_menu_choice(self.menu.categories_menu, choice)
 
     def add_transaction(self, transaction_type):
         """Add an expense transaction."""
@@ -65,24 +111,75 @@ class BudgetApp:
         """Delete an expense transaction."""
         return self.transaction_ui.delete_transaction_ui(transaction_type)
 
+    def import_transactions(self):
+        """Import transactions from a CSV file."""
+        self.display.clear()
+        return self.transaction_ui.import_transactions_ui()
+
     def view_transactions(self, transaction_type):
         """Generic view method for transactions."""
         self.display.clear()
+        # the listing streams the whole ledger, so it is printed as it goes rather than drawn as one frame
+        self.display.end_frame()
         view_filtered_transactions("expense") if transaction_type == "expense" else view_filtered_transactions("income")
 
         input("\nPress Enter to continue...")
-        return self.view_reports()
+        return "view_reports"
 
     def view_balance(self):
         """View financial summary."""
         self.display.clear()
         display_financial_summary()
         input("\nPress Enter to continue...")
-        return self.view_reports()
+        return "view_reports"
+
+    def view_category_breakdown(self, transaction_type):
+        """View totals per category."""
+        self.display.clear()
+        display_category_breakdown(transaction_type)
+        input("\nPress Enter to continue...")
+        return "view_reports"
+
+    def view_monthly_breakdown(self):
+        """View income and expenses per month."""
+        self.display.clear()
+        display_monthly_breakdown()
+        input("\nPress Enter to continue...")
+        return "view_reports"
+
+    def view_category_pivot(self, transaction_type):
+        """View a category by month table."""
+        self.display.clear()
+        display_category_month_pivot(transaction_type)
+        input("\nPress Enter to continue...")
+        return "view_reports"
+
+    def verify_totals(self):
+        """Check the running totals against the ledger and offer to rebuild them."""
+        self.display.clear()
+        if display_totals_check():
+            confirm = input("\nRebuild the totals from the ledger? (yes/no): ").lower()
+            if confirm in ["yes", "y"]:
+                display_totals_check(rebuild=True)
+        input("\nPress Enter to continue...")
+        return "view_reports"
+
+    def search_transactions(self):
+        """Search transactions by remark and category."""
+        self.display.clear()
+        self.transaction_ui.search_transactions_ui()
+        return "view_reports"
+
+    def view_between_dates(self):
+        """List the transactions between two dates."""
+        self.display.clear()
+        self.transaction_ui.view_between_dates_ui()
+        return "view_reports"
 
     def delete_all_transactions(self):
         """Delete all transactions."""
-        return self.transaction_ui.delete_all_transactions()
+        self.transaction_ui.delete_all_transactions()
+        return "view_reports"
 
     def add_category(self, transaction_type):
         """Add a category."""
@@ -100,12 +197,34 @@ class BudgetApp:
         """View all categories"""
         return self.category_ui.view_category_ui()
 
+    def _save_warning(self):
+        """Warn on the next screen when background saving fails, rather than only at exit."""
+        error = take_save_error()
+        if error is None:
+            return None
+        return f"Warning: recent changes could not be saved ({error}). They are kept and saving is retried."
+
     def exit_app(self):
         """Exit the application."""
         self.display.clear()
+        try:
+            flush_transactions()
+        except OSError as error:
+            print(f"Could not save the latest changes: {error}")
         print("Thank you for using the Budget App!")
-        exit()
+        return "exit"
+
+    def run(self):
+        """Run the application until the user exits."""
+        try:
+            self.menu.run("main")
+        finally:
+            self.display.restore()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from src.ui.cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+
     app = BudgetApp()
-    app.main()
\ No newline at end of file
+    app.run()
\ No newline at end of file
@@ -0,0 +1,585 @@
+"""Binary storage backend: fixed-width records read through mmap, exposing the same operations as TransactionStore."""
+
+import os
+import sys
+import json
+import mmap
+import struct
+from bisect import bisect_left
+from contextlib import contextmanager
+from itertools import islice
+
+from src.models.date_index import DateIndex
+from src.models.ledger_totals import LedgerTotals
+from src.models.ledger_rollups import LedgerRollups, month_key
+from src.models.transaction_record import Transaction
+from src.models.transaction_store import write_ledger
+from src.models.transaction_stream import stream_transactions
+from src.utils.file_lock import locked, atomic_write
+from src.utils.settings import COLUMNAR_THRESHOLD
+from src.utils.instrumentation import instrumented, count_bytes
+
+MAGIC = b"BUDGETL1"
+# magic, record capacity, records used (deleted ones included), live records, next id,
+# generation, heap bytes used, heap bytes no record refers to any more
+HEADER = struct.Struct("<8s7Q")
+# id, date ordinal (0 when the date did not parse), cents, remarks offset into the heap,
+# remarks length, category id, type code, flags; 32 bytes, so a record never straddles a sector
+RECORD = struct.Struct("<IiqQIHBB")
+# the same layout as NumPy fields, for reading every record at once
+RECORD_FIELDS = [("id", "<u4"), ("ordinal", "<i4"), ("cents", "<i8"), ("offset", "<u8"), ("length", "<u4"),
+                 ("category_id", "<u2"), ("type_code", "u1"), ("flags", "u1")]
+_ID = struct.Struct("<I")
+_DATE_LENGTH = struct.Struct("<H")
+
+TYPES = ("expense", "income")
+_TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+
+DELETED = 1
+DATE_TEXT = 2 # the heap entry starts with the unparsed date text, prefixed by its length
+
+MIN_CAPACITY = 1024
+HEAP_COMPACT_BYTES = 1 << 20 # unused heap bytes tolerated before the file is rewritten
+
+
+def _heap_entry(transaction):
+    """Return (flags, heap bytes) holding a transaction's remarks and, if it did not parse, its date."""
+    remarks = transaction.remarks.encode('utf-8')
+    if transaction.date_ordinal:
+        return 0, remarks
+    date = transaction.date.encode('utf-8')
+    return DATE_TEXT, _DATE_LENGTH.pack(len(date)) + date + remarks
+
+
+def _type_code(transaction_type):
+    try:
+        return _TYPE_CODES[transaction_type]
+    except KeyError:
+        raise ValueError(f"unknown type \"{transaction_type}\"") from None
+
+
+def _row(transaction):
+    """The (id, ordinal, cents, category id, type code, flags, heap bytes) a transaction is written as."""
+    flags, entry = _heap_entry(transaction)
+    return (transaction.id, transaction.date_ordinal, transaction.cents, transaction.category_id,
+            _type_code(transaction.type), flags, entry)
+
+
+def _decode(buffer, heap_start, fields):
+    """Build a Transaction from unpacked record fields, reading its heap entry from ``buffer``."""
+    transaction_id, ordinal, cents, offset, length, category_id, type_code, flags = fields
+    start = heap_start + offset
+    entry = buffer[start:start + length]
+    date_text = None
+    if flags & DATE_TEXT:
+        size = _DATE_LENGTH.unpack_from(entry)[0]
+        date_text = entry[_DATE_LENGTH.size:_DATE_LENGTH.size + size].decode('utf-8')
+        entry = entry[_DATE_LENGTH.size + size:]
+    return Transaction.from_values(transaction_id, ordinal, date_text, cents, category_id, entry.decode('utf-8'),
+                                   TYPES[type_code])
+
+
+def _totals_of(rollups):
+    cents, counts = {}, {}
+    for (_, _, transaction_type), (cell_cents, count) in rollups.cells.items():
+        cents[transaction_type] = cents.get(transaction_type, 0) + cell_cents
+        counts[transaction_type] = counts.get(transaction_type, 0) + count
+    return LedgerTotals(cents, counts)
+
+
+class _IdColumn:
+    """The ids of the first ``count`` records as a sequence, so bisect can search them in the map."""
+
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, slot):
+        return _ID.unpack_from(self.buffer, HEADER.size + slot * RECORD.size)[0]
+
+
+class BinaryTransactionStore:
+    """Keeps the ledger as fixed-width binary records in a memory-mapped file.
+
+    The file is a header, ``capacity`` record slots in id order and a heap
+    holding the remarks. A transaction is found by bisecting the id field of
+    the mapped records, so reading or editing one row parses nothing else:
+    an update or delete overwrites its record in place and an add fills the
+    next free slot. Totals and rollups are checkpointed to ``meta_path`` like
+    TransactionStore's; when the checkpoint is stale they are recomputed in
+    one struct.iter_unpack pass over the mapped records without building any
+    Transaction.
+
+    Deleted records stay behind as tombstones and replaced remarks as unused
+    heap bytes until the file is rewritten, which happens when the slots run
+    out (the capacity doubles), when most slots or heap bytes are unused, or
+    on compact().
+
+    Changes are made under the same exclusive lock as TransactionStore's and
+    published to other processes by rewriting the header when the outermost
+    batch ends. While records are being overwritten the header generation is
+    odd, so a checkpoint is never trusted for a file a crash left mid-batch;
+    each record is written whole, but such a batch may be partly applied.
+    """
+
+    def __init__(self, path, meta_path=None):
+        self.path = path
+        self.meta_path = meta_path
+        self.lock_path = f"{path}.lock"
+        self._file = None
+        self._map = None
+        self._signature = None
+        self._batch_depth = 0
+        self._dirty = False
+        self._totals = None
+        self._rollups = None
+        self._dates = None
+        self._list = None
+        # bumped on every change so derived views know when to rebuild
+        self.generation = 0
+        # called with (op, transactions) after each change, like TransactionStore.listeners
+        self.listeners = []
+        with locked(self.lock_path, shared=True):
+            self._open()
+
+    def _write_file(self, rows, next_id, generation):
+        """Atomically replace the file with one holding ``rows`` and room for as many more."""
+        records, heap, offset = [], [], 0
+        for transaction_id, ordinal, cents, category_id, type_code, flags, entry in rows:
+            records.append(RECORD.pack(transaction_id, ordinal, cents, offset, len(entry), category_id, type_code,
+                                       flags))
+            heap.append(entry)
+            offset += len(entry)
+        capacity = max(MIN_CAPACITY, 2 * len(records))
+        with atomic_write(self.path, encoding=None) as file:
+            file.write(HEADER.pack(MAGIC, capacity, len(records), len(records), next_id, generation, offset, 0))
+            file.write(b"".join(records))
+            # the unused slots read as zeros
+            file.truncate(HEADER.size + capacity * RECORD.size)
+            file.seek(0, os.SEEK_END)
+            file.write(b"".join(heap))
+            count_bytes("binary.write", written=file.tell())
+
+    def _open(self):
+        """Map the file, creating an empty ledger first if there is none, and read its header."""
+        if not os.path.exists(self.path):
+            with locked(self.lock_path):
+                if not os.path.exists(self.path):
+                    self._write_file([], 1, 0)
+
+        if self._file is not None:
+            self._file.close()
+        # unbuffered, so every write is visible through the map straight away
+        self._file = open(self.path, 'r+b', buffering=0)
+        # a stream may still be reading the previous map, it is left to the garbage collector
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._capacity, count, live, next_id, self._file_generation, heap_end, heap_dead = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a binary ledger")
+        self._committed = (count, live, next_id, heap_end, heap_dead)
+        self._count, self._live, self._next_id, self._heap_end, self._heap_dead = self._committed
+        self._heap_start = HEADER.size + self._capacity * RECORD.size
+        self._signature = (os.fstat(self._file.fileno()).st_ino, self._file_generation)
+        self._dirty = False
+
+    def _file_signature(self):
+        """Return (inode, header generation); the generation is read through the map, which shows writes in place."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+        return (inode, HEADER.unpack_from(self._map)[5])
+
+    def _buffer(self):
+        """The map, mapped again if records or heap bytes were written past its end."""
+        if len(self._map) < self._heap_start + self._heap_end:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _records(self):
+        """Iterate the unpacked fields of every used slot, straight from the map."""
+        return RECORD.iter_unpack(memoryview(self._map)[HEADER.size:HEADER.size + self._count * RECORD.size])
+
+    def _write_at(self, position, data):
+        self._file.seek(position)
+        self._file.write(data)
+
+    def _write_header(self):
+        count, live, next_id, heap_end, heap_dead = self._committed
+        self._write_at(0, HEADER.pack(MAGIC, self._capacity, count, live, next_id, self._file_generation, heap_end,
+                                      heap_dead))
+        self._signature = (self._signature[0], self._file_generation)
+
+    def _heap_append(self, entry):
+        offset = self._heap_end
+        self._write_at(self._heap_start + offset, entry)
+        self._heap_end += len(entry)
+        self._dirty = True
+        return offset
+
+    def _overwrite(self, slot, record):
+        """Overwrite one record in place, first marking the header generation odd so a crash is noticed."""
+        if not self._file_generation & 1:
+            self._file_generation += 1
+            self._write_header()
+        # the odd header and any heap bytes the record points at must reach the disk before the record
+        os.fsync(self._file.fileno())
+        self._write_at(HEADER.size + slot * RECORD.size, record)
+        self._dirty = True
+
+    @instrumented("binary.commit")
+    def _commit(self):
+        """Publish the records and heap bytes written in this batch by rewriting the header, then checkpoint."""
+        if (self._count - self._live > max(MIN_CAPACITY, self._live)
+                or self._heap_dead > max(HEAP_COMPACT_BYTES, self._heap_end // 2)):
+            self._compact()
+            return
+        os.fsync(self._file.fileno())
+        self._file_generation = (self._file_generation | 1) + 1
+        self._committed = (self._count, self._live, self._next_id, self._heap_end, self._heap_dead)
+        self._write_header()
+        os.fsync(self._file.fileno())
+        self._dirty = False
+        self._checkpoint()
+
+    @instrumented("binary.compact")
+    def _compact(self):
+        """Rewrite the file without tombstones or unused heap bytes; the totals, rollups and ids do not change."""
+        buffer, heap_start = self._buffer(), self._heap_start
+        rows = ((fields[0], fields[1], fields[2], fields[5], fields[6], fields[7],
+                 buffer[heap_start + fields[3]:heap_start + fields[3] + fields[4]])
+                for fields in self._records() if not fields[7] & DELETED)
+        self._write_file(rows, self._next_id, (self._file_generation | 1) + 1)
+        self._open()
+        self._checkpoint()
+
+    def _read_checkpoint(self):
+        """Return the checkpointed (totals, rollups) if they were taken for the current file contents."""
+        if not self.meta_path or not os.path.exists(self.meta_path):
+            return None
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if "totals" not in meta or "rollups" not in meta or meta.get("signature") != list(self._signature):
+            return None
+        return LedgerTotals.from_dict(meta["totals"]), LedgerRollups.from_list(meta["rollups"])
+
+    def _checkpoint(self):
+        if not self.meta_path or self._rollups is None:
+            return
+        with atomic_write(self.meta_path) as file:
+            file.write(f'{{"signature": {json.dumps(self._signature)}, "totals": {json.dumps(self._totals.to_dict())}, '
+                       f'"rollups": {self._rollups.to_json()}}}')
+
+    @instrumented("binary.scan")
+    def _scan(self):
+        """Recompute the rollups in one pass over the mapped records."""
+        if self._count >= COLUMNAR_THRESHOLD:
+            return self._scan_columns()
+        cells = {}
+        for _, ordinal, cents, _, _, category_id, type_code, flags in self._records():
+            if flags & DELETED:
+                continue
+            key = (month_key(ordinal), category_id, TYPES[type_code])
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [cents, 1]
+            else:
+                cell[0] += cents
+                cell[1] += 1
+        return LedgerRollups(cells)
+
+    def _scan_columns(self):
+        """Recompute the rollups from NumPy columns of the record fields, read straight from the map."""
+        import numpy as np
+        from src.models.ledger_columns import LedgerColumns
+
+        records = np.frombuffer(self._buffer(), dtype=np.dtype(RECORD_FIELDS), count=self._count, offset=HEADER.size)
+        # boolean indexing copies, so no view of the map outlives this call and it can still be closed
+        live = records[(records["flags"] & DELETED) == 0]
+        del records
+        return LedgerColumns(*(live[field].astype(np.int64)
+                               for field in ("cents", "ordinal", "category_id", "type_code"))).rollups()
+
+    def _aggregates(self):
+        """Return (totals, rollups), from the checkpoint if it matches the file or else from a scan."""
+        if self._rollups is None:
+            checkpoint = self._read_checkpoint()
+            if checkpoint is not None:
+                self._totals, self._rollups = checkpoint
+            else:
+                self._rollups = self._scan()
+                self._totals = _totals_of(self._rollups)
+                self._checkpoint()
+        return self._totals, self._rollups
+
+    def _notify(self, op, transactions=()):
+        for listener in self.listeners:
+            listener(op, transactions)
+
+    def _mutated(self, op, *transactions):
+        self.generation += 1
+        self._list = None
+        self._notify(op, transactions)
+
+    @contextmanager
+    def batch(self):
+        """Group commit: hold the lock, write every change in place and publish them with one header write on exit."""
+        with locked(self.lock_path):
+            self._batch_depth += 1
+            try:
+                self.refresh()
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._commit()
+
+    def refresh(self):
+        """Map the file again if another process changed it since this one last did."""
+        if self._file_signature() == self._signature:
+            return
+        with locked(self.lock_path, shared=True):
+            self._open()
+        self._totals = self._rollups = self._dates = self._list = None
+        self.generation += 1
+        self._notify("reload")
+
+    def flush(self):
+        """Every change is written before it returns, there is nothing queued."""
+
+    def _slot(self, transaction_id):
+        """Return the slot holding a live transaction id, or None."""
+        slot = bisect_left(_IdColumn(self._map, self._count), transaction_id)
+        if slot == self._count:
+            return None
+        fields = RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size)
+        return slot if fields[0] == transaction_id and not fields[7] & DELETED else None
+
+    def _read(self, slot):
+        return _decode(self._buffer(), self._heap_start,
+                       RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size))
+
+    def _iter(self, transaction_type=None):
+        """Yield the live transactions in id order, optionally of one type only, decoding each as it is reached."""
+        self.refresh()
+        code = None if transaction_type is None else _TYPE_CODES.get(transaction_type, -1)
+        buffer, heap_start = self._buffer(), self._heap_start
+        for fields in self._records():
+            if not fields[7] & DELETED and (code is None or fields[6] == code):
+                yield _decode(buffer, heap_start, fields)
+
+    def all(self):
+        """Return the cached list of transactions. Callers must treat it as read-only."""
+        self.refresh()
+        if self._list is None:
+            self._list = list(self._iter())
+        return self._list
+
+    def stream(self):
+        """Iterate transactions in id order, decoding them from the map one at a time."""
+        return self._iter()
+
+    def _replace_all(self, transactions):
+        """Rewrite the file with ``transactions`` in id order and rebuild everything derived from it."""
+        records = {t.id: t for t in transactions}
+        ordered = [records[transaction_id] for transaction_id in sorted(records)]
+        self._next_id = max(self._next_id, max(records, default=0) + 1)
+        self._write_file(map(_row, ordered), self._next_id, (self._file_generation | 1) + 1)
+        self._open()
+        self._totals = LedgerTotals.from_transactions(ordered)
+        self._rollups = LedgerRollups.from_transactions(ordered)
+        self._dates = None
+        self._checkpoint()
+
+    def replace(self, transactions):
+        """Replace the whole ledger and persist it."""
+        with self.batch():
+            self._replace_all(t if isinstance(t, Transaction) else Transaction.from_dict(t) for t in transactions)
+            self._mutated("replace")
+
+    def import_json(self, json_path):
+        """Replace the ledger with the one stored in a transactions.json file, streamed rather than loaded."""
+        self.replace(stream_transactions(json_path))
+
+    def export_json(self, json_path):
+        """Write the ledger to a transactions.json file, streamed from the map without reading the old file."""
+        with locked(f"{json_path}.lock"), atomic_write(json_path) as file:
+            write_ledger(file, self.stream())
+
+    def get(self, transaction_id):
+        self.refresh()
+        slot = self._slot(int(transaction_id))
+        return None if slot is None else self._read(slot)
+
+    def _insert(self, transaction):
+        type_code = _type_code(transaction.type)
+        totals, rollups = self._aggregates()
+        if self._count == self._capacity:
+            self._compact()
+        flags, entry = _heap_entry(transaction)
+        offset = self._heap_append(entry)
+        self._write_at(HEADER.size + self._count * RECORD.size,
+                       RECORD.pack(transaction.id, transaction.date_ordinal, transaction.cents, offset, len(entry),
+                                   transaction.category_id, type_code, flags))
+        self._count += 1
+        self._live += 1
+        totals.add(transaction)
+        rollups.add(transaction)
+        if self._dates is not None:
+            self._dates.add(transaction)
+
+    def add(self, date, amount, category, remarks, transaction_type="expense"):
+        with self.batch():
+            transaction = Transaction(self._next_id, date, amount, category, remarks, transaction_type)
+            self._insert(transaction)
+            self._next_id += 1
+            self._mutated("add", transaction)
+        return transaction
+
+    def add_many(self, rows):
+        """Add (date, amount, category, remarks, type) rows with a single commit. Returns the count."""
+        added = []
+        with self.batch():
+            for date, amount, category, remarks, transaction_type in rows:
+                transaction = Transaction(self._next_id, date, amount, category, remarks, transaction_type)
+                self._insert(transaction)
+                self._next_id += 1
+                added.append(transaction)
+            if added:
+                self._mutated("add", *added)
+        return len(added)
+
+    def update(self, transaction_id, amount, category, date, remarks):
+        with self.batch():
+            slot = self._slot(int(transaction_id))
+            if slot is None:
+                return None
+            totals, rollups = self._aggregates()
+            previous = self._read(slot)
+            transaction = Transaction(previous.id, date, amount, category, remarks, previous.type)
+            fields = RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size)
+            offset, length = fields[3], fields[4]
+            flags, entry = _heap_entry(transaction)
+            if entry != self._buffer()[self._heap_start + offset:self._heap_start + offset + length]:
+                self._heap_dead += length
+                offset, length = self._heap_append(entry), len(entry)
+            self._overwrite(slot, RECORD.pack(transaction.id, transaction.date_ordinal, transaction.cents, offset,
+                                              length, transaction.category_id, fields[6], flags))
+
+            totals.remove(previous)
+            rollups.remove(previous)
+            totals.add(transaction)
+            rollups.add(transaction)
+            if self._dates is not None:
+                self._dates.remove(previous)
+                self._dates.add(transaction)
+            self._mutated("update", transaction)
+        return transaction
+
+    def delete(self, transaction_id):
+        with self.batch():
+            slot = self._slot(int(transaction_id))
+            if slot is None:
+                return None
+            totals, rollups = self._aggregates()
+            transaction = self._read(slot)
+            fields = list(RECORD.unpack_from(self._map, HEADER.size + slot * RECORD.size))
+            fields[7] |= DELETED
+            self._overwrite(slot, RECORD.pack(*fields))
+            self._live -= 1
+            self._heap_dead += fields[4]
+
+            totals.remove(transaction)
+            rollups.remove(transaction)
+            if self._dates is not None:
+                self._dates.remove(transaction)
+            self._mutated("delete", transaction)
+        return transaction
+
+    def clear(self):
+        with self.batch():
+            self._replace_all([])
+            self._mutated("clear")
+
+    def compact(self):
+        """Rewrite the file without tombstones or unused heap bytes."""
+        with self.batch():
+            self._compact()
+
+    def filter(self, transaction_type="expense"):
+        return list(self._iter(transaction_type))
+
+    def page(self, transaction_type, offset, limit):
+        """Return up to ``limit`` transactions of one type, skipping the first ``offset``."""
+        return list(islice(self._iter(transaction_type), offset, offset + limit))
+
+    def between(self, start=None, end=None):
+        """Return the transactions dated within [start, end] in date order; either bound may be None."""
+        self.refresh()
+        if self._dates is None:
+            self._dates = DateIndex.from_pairs((fields[1], fields[0]) for fields in self._records()
+                                               if not fields[7] & DELETED)
+        return [self._read(self._slot(transaction_id)) for transaction_id in self._dates.between(start, end)]
+
+    def period_totals(self, start=None, end=None):
+        """Return LedgerTotals for the transactions dated within [start, end], summed straight from the map."""
+        self.refresh()
+        low = start.toordinal() if start else 1
+        high = end.toordinal() if end else sys.maxsize
+        cents, counts = {}, {}
+        for _, ordinal, amount, _, _, _, type_code, flags in self._records():
+            if not flags & DELETED and low <= ordinal <= high:
+                transaction_type = TYPES[type_code]
+                cents[transaction_type] = cents.get(transaction_type, 0) + amount
+                counts[transaction_type] = counts.get(transaction_type, 0) + 1
+        return LedgerTotals(cents, counts)
+
+    def totals(self):
+        """Return the running totals, from the checkpoint if it matches the file."""
+        self.refresh()
+        return self._aggregates()[0]
+
+    def rollups(self):
+        """Return the (month, category, type) rollups. Callers must treat them as read-only."""
+        self.refresh()
+        return self._aggregates()[1]
+
+    def total(self, transaction_type="expense"):
+        return self.totals().total(transaction_type)
+
+    def verify_totals(self, rebuild=False):
+        """Recompute the totals in a pass over the map and return any drift from the maintained ones.
+
+        A rebuild also recomputes the rollups if they disagree with the ledger.
+        """
+        with locked(self.lock_path):
+            self.refresh()
+            totals, rollups = self._aggregates()
+            expected_rollups = self._scan()
+            expected = _totals_of(expected_rollups)
+            drift = totals.drift(expected)
+            if rebuild and (drift or expected_rollups != rollups):
+                self._totals, self._rollups = expected, expected_rollups
+                self._checkpoint()
+        return drift
+
+
+def json_to_binary(json_path, binary_path, meta_path=None):
+    """Convert a transactions.json ledger into a binary ledger. Returns the number of transactions."""
+    store = BinaryTransactionStore(binary_path, meta_path)
+    store.import_json(json_path)
+    return sum(store.totals().counts.values())
+
+
+def binary_to_json(binary_path, json_path):
+    """Convert a binary ledger back into a transactions.json file. Returns the number of transactions."""
+    store = BinaryTransactionStore(binary_path)
+    store.export_json(json_path)
+    return sum(store.totals().counts.values())
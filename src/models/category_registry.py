@@ -0,0 +1,215 @@
+"""Process-wide registry of the expense and income categories kept in categories.json."""
+
+import os
+import json
+
+from src.utils.settings import CATEGORIES_FILE
+from src.utils.file_lock import locked, atomic_write
+
+TYPES = ("expense", "income")
+
+
+def _migrate(data):
+    """Convert the old {type: [names]} file into the category table."""
+    entries = [{"id": index, "type": category_type, "name": name}
+               for index, (category_type, name) in enumerate(
+                   ((category_type, name) for category_type in TYPES for name in data.get(category_type, [])), start=1)]
+    return {"next_id": len(entries) + 1, "categories": entries}
+
+
+class CategoryRegistry:
+    """The category table: every category has a stable integer id that transactions refer to.
+
+    categories.json holds {"next_id": n, "categories": [{"id", "type", "name"}, ...]}.
+    Renaming only changes an entry's name, so a rename never touches the
+    ledger. Deleting either marks the entry ``deleted`` (its transactions keep
+    showing the old name but it is no longer offered) or points it at another
+    category with ``merged_into``, which moves all of its transactions at once.
+    Names written to a transaction without an entry get a deleted one.
+
+    The table is parsed on first use and re-read only when the file changes.
+    Every change re-reads the file under its lock and is applied to the latest
+    contents, so several running instances do not overwrite each other's edits.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._table = None
+        self._signature = None
+        self._categories = None
+        self._entries = None
+        self._names = {}
+        self._ids = {}
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self._save({"next_id": 1, "categories": []})
+        with locked(self.lock_path, shared=True):
+            with open(self.path, "r", encoding='utf-8') as file:
+                table = json.load(file)
+            if "categories" not in table:
+                self._save(_migrate(table))
+            else:
+                self._index(table)
+                self._signature = self._file_signature()
+
+    def _save(self, table):
+        with locked(self.lock_path):
+            with atomic_write(self.path) as file:
+                json.dump(table, file, indent=4)
+            self._index(table)
+            self._signature = self._file_signature()
+
+    def _index(self, table):
+        """Rebuild the cached id <-> name maps, following merges to the category that absorbed them."""
+        entries = {entry["id"]: entry for entry in table["categories"]}
+
+        def target(entry):
+            seen = set()
+            while "merged_into" in entry and entry["merged_into"] in entries and entry["id"] not in seen:
+                seen.add(entry["id"])
+                entry = entries[entry["merged_into"]]
+            return entry
+
+        self._table = table
+        self._names = {category_id: target(entry)["name"] for category_id, entry in entries.items()}
+        self._entries = {category_type: [] for category_type in TYPES}
+        self._ids = {}
+        # active names win over deleted ones, and both over the names of merged entries
+        for rank in ("merged", "deleted", "active"):
+            for entry in table["categories"]:
+                state = "merged" if "merged_into" in entry else "deleted" if entry.get("deleted") else "active"
+                if state == rank:
+                    self._ids[(entry["type"], entry["name"])] = target(entry)["id"]
+                    if rank == "active":
+                        self._entries.setdefault(entry["type"], []).append((entry["id"], entry["name"]))
+        self._categories = {category_type: [name for _, name in entries]
+                            for category_type, entries in self._entries.items()}
+
+    def _refresh(self):
+        if self._table is None or self._file_signature() != self._signature:
+            self._load()
+
+    def _entry(self, category_id):
+        return next(entry for entry in self._table["categories"] if entry["id"] == category_id)
+
+    @property
+    def categories(self):
+        """The {type: [names]} mapping of the categories in use. Callers must treat it as read-only."""
+        self._refresh()
+        return self._categories
+
+    def get_category_list(self, category_type):
+        return self.categories[category_type]
+
+    def entries(self, category_type):
+        """The (id, name) pairs of one type in menu order. Callers must treat it as read-only."""
+        self._refresh()
+        return self._entries[category_type]
+
+    def name(self, category_id):
+        """Name of a category id, following merges; ids created by another instance are picked up on demand."""
+        name = self._names.get(category_id)
+        if name is None:
+            self._refresh()
+            name = self._names.get(category_id, "Unknown")
+        return name
+
+    def names(self):
+        """The {id: name} mapping of every id, deleted and merged ones included. Callers must treat it as read-only."""
+        self._refresh()
+        return self._names
+
+    def resolve(self, category_type, category_name):
+        """Return the id for a category name, or None if the name is not in the table. Never writes."""
+        category_id = self._ids.get((category_type, category_name))
+        if category_id is None:
+            self._refresh()
+            category_id = self._ids.get((category_type, category_name))
+        return category_id
+
+    def intern(self, category_type, category_name):
+        """Return the id for a category name, adding a deleted entry if the name is not in the table.
+
+        Only for writes: a name typed into a transaction, an import or converting an old ledger.
+        """
+        category_id = self.resolve(category_type, category_name)
+        if category_id is not None:
+            return category_id
+
+        with locked(self.lock_path):
+            self._load()
+            category_id = self._ids.get((category_type, category_name))
+            if category_id is None:
+                category_id = self._append(category_type, category_name, deleted=True)
+                self._save(self._table)
+        return category_id
+
+    def _append(self, category_type, category_name, deleted=False):
+        category_id = self._table["next_id"]
+        self._table["next_id"] += 1
+        entry = {"id": category_id, "type": category_type, "name": category_name}
+        if deleted:
+            entry["deleted"] = True
+        self._table["categories"].append(entry)
+        return category_id
+
+    def add(self, category_type, category_name):
+        """Add a category, bringing a deleted one of the same name back with its transactions."""
+        with locked(self.lock_path):
+            self._load()
+            if category_name in self._categories[category_type]:
+                return self._ids[(category_type, category_name)]
+
+            category_id = self._ids.get((category_type, category_name))
+            entry = self._entry(category_id) if category_id is not None else None
+            if entry is not None and entry.get("deleted"):
+                del entry["deleted"]
+                # keep the menu order: a revived category goes to the end like a new one
+                self._table["categories"].remove(entry)
+                self._table["categories"].append(entry)
+            else:
+                category_id = self._append(category_type, category_name)
+            self._save(self._table)
+        return category_id
+
+    def rename(self, category_id, new_category_name):
+        """Rename a category. Its transactions refer to the id, so none of them is rewritten."""
+        with locked(self.lock_path):
+            self._load()
+            entry = self._entry(category_id)
+            # a deleted category of the new name is folded into this one so the name stays unique
+            previous = self._ids.get((entry["type"], new_category_name))
+            if previous is not None and previous != category_id:
+                self._entry(previous)["merged_into"] = category_id
+            entry["name"] = new_category_name
+            self._save(self._table)
+
+    def remove(self, category_id, reassign_to=None):
+        """Delete a category. Its transactions move to ``reassign_to`` if given, otherwise they keep the old name."""
+        with locked(self.lock_path):
+            self._load()
+            entry = self._entry(category_id)
+            if reassign_to is not None and reassign_to != category_id:
+                entry["merged_into"] = reassign_to
+            else:
+                entry["deleted"] = True
+            self._save(self._table)
+
+
+# single shared registry, categories.json is parsed once per process
+_registry = None
+
+def get_category_registry():
+    global _registry
+    if _registry is None:
+        _registry = CategoryRegistry(CATEGORIES_FILE)
+    return _registry
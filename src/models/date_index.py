@@ -0,0 +1,59 @@
+"""Transaction ids sorted by date for date-range queries."""
+
+from array import array
+from bisect import bisect_left
+
+# each entry packs (date ordinal, id) into one int64: ordinals need 20 bits, ids get the low 40
+_ID_BITS = 40
+_ID_MASK = (1 << _ID_BITS) - 1
+
+
+def _key(ordinal, transaction_id):
+    return ordinal << _ID_BITS | transaction_id
+
+
+class DateIndex:
+    """Sorted ``array('q')`` of packed (date ordinal, id) keys.
+
+    A range is two bisects and a slice, so a query costs O(log n + k).
+    Transactions are mostly entered around today's date, so an add usually
+    lands at or near the end; otherwise it is a bisect plus a memmove.
+    Undated transactions (ordinal 0) sort first and fall outside every range.
+
+    Like LedgerTotals the index is kept up to date by delta: callers remove a
+    transaction before changing its date and add it back afterwards.
+    """
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else array('q')
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        return cls(array('q', sorted(_key(t.date_ordinal, t.id) for t in transactions)))
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build the index from (date ordinal, id) pairs."""
+        return cls(array('q', sorted(_key(ordinal, transaction_id) for ordinal, transaction_id in pairs)))
+
+    def add(self, transaction):
+        key = _key(transaction.date_ordinal, transaction.id)
+        if not self.keys or self.keys[-1] < key:
+            self.keys.append(key)
+        else:
+            self.keys.insert(bisect_left(self.keys, key), key)
+
+    def remove(self, transaction):
+        key = _key(transaction.date_ordinal, transaction.id)
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            del self.keys[index]
+
+    def between(self, start=None, end=None):
+        """Return the ids dated within [start, end] in date order; either bound (a date) may be None."""
+        low = bisect_left(self.keys, _key(start.toordinal() if start else 1, 0))
+        high = bisect_left(self.keys, _key(end.toordinal() + 1, 0)) if end else len(self.keys)
+        return [key & _ID_MASK for key in self.keys[low:high]]
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,136 @@
+"""Per-month, per-category sums and counts maintained incrementally as the ledger changes."""
+
+import json
+from datetime import date
+
+from src.models.category_registry import get_category_registry
+from src.utils.settings import COLUMNAR_THRESHOLD
+
+UNKNOWN_MONTH = -1
+
+# month key of each date ordinal, ledgers reuse a small set of dates
+_month_keys = {0: UNKNOWN_MONTH}
+
+
+def month_key(ordinal):
+    """Months since year 0 (year * 12 + month - 1) of a date ordinal, or UNKNOWN_MONTH for an unparsed date."""
+    key = _month_keys.get(ordinal)
+    if key is None:
+        day = date.fromordinal(ordinal)
+        key = _month_keys[ordinal] = day.year * 12 + day.month - 1
+    return key
+
+
+def month_label(month_key):
+    if month_key == UNKNOWN_MONTH:
+        return "Unknown"
+    return f"{month_key // 12:04d}-{month_key % 12 + 1:02d}"
+
+
+def _month_order(key):
+    # unparsed dates sort after every real month
+    return (key == UNKNOWN_MONTH, key)
+
+
+class LedgerRollups:
+    """Sums (in cents) and counts keyed by (month, category id, type), updated by delta on every mutation.
+
+    Category ids are resolved to names only when a report is produced, so the
+    rollups stay valid across category renames and merges; ids that now share
+    a name are added together. Cells whose count drops to zero are removed so
+    reports only list categories and months that have transactions.
+
+    They are checkpointed after every change, so the JSON text of each cell
+    is cached and only the cells a change touched are encoded again.
+    """
+
+    def __init__(self, cells=None):
+        self.cells = cells if cells is not None else {}
+        self._encoded = {}
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """Compute the rollups of a sized collection of transactions, through LedgerColumns for large ones."""
+        if len(transactions) >= COLUMNAR_THRESHOLD:
+            from src.models.ledger_columns import LedgerColumns
+            return LedgerColumns.from_transactions(transactions).rollups()
+        rollups = cls()
+        for transaction in transactions:
+            rollups.add(transaction)
+        return rollups
+
+    @staticmethod
+    def _key(transaction):
+        return (month_key(transaction.date_ordinal), transaction.category_id, transaction.type)
+
+    def add(self, transaction):
+        key = self._key(transaction)
+        self._encoded.pop(key, None)
+        cell = self.cells.get(key)
+        if cell is None:
+            self.cells[key] = [transaction.cents, 1]
+        else:
+            cell[0] += transaction.cents
+            cell[1] += 1
+
+    def remove(self, transaction):
+        key = self._key(transaction)
+        self._encoded.pop(key, None)
+        cell = self.cells[key]
+        cell[0] -= transaction.cents
+        cell[1] -= 1
+        if not cell[1]:
+            del self.cells[key]
+
+    def __eq__(self, other):
+        if not isinstance(other, LedgerRollups):
+            return NotImplemented
+        return self.cells == other.cells
+
+    def sum_by_category(self, transaction_type="expense"):
+        """Return {category: cents} for one transaction type."""
+        registry = get_category_registry()
+        totals = {}
+        for (_, category_id, cell_type), (cents, _) in self.cells.items():
+            if cell_type == transaction_type:
+                name = registry.name(category_id)
+                totals[name] = totals.get(name, 0) + cents
+        return totals
+
+    def sum_by_month(self):
+        """Return {month key: {"income": cents, "expense": cents}} across the whole ledger."""
+        months = {}
+        for (month, _, cell_type), (cents, _) in self.cells.items():
+            sums = months.setdefault(month, {"income": 0, "expense": 0})
+            sums[cell_type] = sums.get(cell_type, 0) + cents
+        return months
+
+    def pivot(self, transaction_type="expense"):
+        """Return (categories, month keys, rows of cents) for one type, categories in id order."""
+        registry = get_category_registry()
+        sums = {}
+        months = set()
+        for (month, category_id, cell_type), (cents, _) in sorted(self.cells.items(), key=lambda item: item[0][1]):
+            if cell_type == transaction_type:
+                row = sums.setdefault(registry.name(category_id), {})
+                row[month] = row.get(month, 0) + cents
+                months.add(month)
+
+        months = sorted(months, key=_month_order)
+        return list(sums), months, [[row.get(month, 0) for month in months] for row in sums.values()]
+
+    def to_json(self):
+        """Return the cells as a JSON list of [month, category id, type, cents, count] rows."""
+        encoded = self._encoded
+        rows = []
+        for key, cell in self.cells.items():
+            text = encoded.get(key)
+            if text is None:
+                text = encoded[key] = json.dumps([*key, *cell])
+            rows.append(text)
+        return "[" + ",".join(rows) + "]"
+
+    @classmethod
+    def from_list(cls, rows):
+        return cls({(month, category_id, cell_type): [cents, count]
+                    for month, category_id, cell_type, cents, count in rows})
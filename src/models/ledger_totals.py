@@ -0,0 +1,48 @@
+"""Running income/expense totals maintained incrementally as the ledger changes."""
+
+TRANSACTION_TYPES = ("income", "expense")
+
+
+class LedgerTotals:
+    """Per-type sums (in cents) and counts, updated by delta on every mutation."""
+
+    def __init__(self, cents=None, counts=None):
+        self.cents = dict.fromkeys(TRANSACTION_TYPES, 0)
+        self.counts = dict.fromkeys(TRANSACTION_TYPES, 0)
+        self.cents.update(cents or {})
+        self.counts.update(counts or {})
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        totals = cls()
+        for transaction in transactions:
+            totals.add(transaction)
+        return totals
+
+    def add(self, transaction):
+        self.cents[transaction.type] = self.cents.get(transaction.type, 0) + transaction.cents
+        self.counts[transaction.type] = self.counts.get(transaction.type, 0) + 1
+
+    def remove(self, transaction):
+        self.cents[transaction.type] -= transaction.cents
+        self.counts[transaction.type] -= 1
+
+    def total(self, transaction_type="expense"):
+        return self.cents.get(transaction_type, 0) / 100
+
+    def balance(self):
+        return (self.cents["income"] - self.cents["expense"]) / 100
+
+    def drift(self, other):
+        """Return {type: cents difference} for every type where the two totals disagree."""
+        return {transaction_type: self.cents.get(transaction_type, 0) - other.cents.get(transaction_type, 0)
+                for transaction_type in set(self.cents) | set(other.cents)
+                if self.cents.get(transaction_type, 0) != other.cents.get(transaction_type, 0)
+                or self.counts.get(transaction_type, 0) != other.counts.get(transaction_type, 0)}
+
+    def to_dict(self):
+        return {"cents": self.cents, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["cents"], data["counts"])
@@ -0,0 +1,206 @@
+"""Inverted index over transaction remarks and categories."""
+
+import re
+import json
+from array import array
+from bisect import bisect_left, insort
+
+from src.utils.file_lock import atomic_write
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+# bumped when the tokens change so an index saved by an older version is rebuilt
+FORMAT_VERSION = 2
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _category_token(category_id):
+    # tokens are [0-9a-z]+, so "#<id>" never collides with a word
+    return f"#{category_id}"
+
+
+def _document_tokens(transaction):
+    return set(tokenize(transaction.remarks)) | {_category_token(transaction.category_id)}
+
+
+def _remove_id(posting, transaction_id):
+    index = bisect_left(posting, transaction_id)
+    if index < len(posting) and posting[index] == transaction_id:
+        del posting[index]
+
+
+def _intersect(small, large):
+    """Keep the ids of ``small`` (a set) that are also in the sorted array ``large``."""
+    if len(large) < 8 * len(small):
+        return small.intersection(large)
+    found = set()
+    for transaction_id in small:
+        index = bisect_left(large, transaction_id)
+        if index < len(large) and large[index] == transaction_id:
+            found.add(transaction_id)
+    return found
+
+
+class SearchIndex:
+    """Maps each lowercase word of a remark, and each category id, to the transaction ids containing it.
+
+    Categories are indexed by id and matched by their current name when a
+    query runs, so renaming or merging a category needs no reindexing.
+
+    Posting lists are sorted ``array('q')`` of ids. New transactions always get
+    the highest id so adding is an append, and updates and deletes are a
+    bisect plus a memmove. ``vocabulary`` is the sorted list of tokens so a
+    prefix resolves with a bisect instead of a scan.
+
+    ``generation`` is the store generation the index reflects and
+    ``signature`` the ledger file signature it was saved or loaded for, until
+    a change is applied. ``stale`` is set when a change could not be applied
+    and the index must be rebuilt.
+    """
+
+    def __init__(self, postings=None, generation=None, signature=None):
+        self.postings = postings or {}
+        self.vocabulary = sorted(self.postings)
+        self.generation = generation
+        self.signature = signature
+        self.stale = False
+        self.dirty = False
+        self._documents = None
+
+    @classmethod
+    def from_transactions(cls, transactions, generation=None):
+        lists = {}
+        for transaction in transactions:
+            for token in _document_tokens(transaction):
+                lists.setdefault(token, []).append(transaction.id)
+        return cls({token: array('q', sorted(ids)) for token, ids in lists.items()}, generation)
+
+    @property
+    def documents(self):
+        """id -> tokens, inverted from the postings only once a change needs it."""
+        if self._documents is None:
+            self._documents = {}
+            for token, posting in self.postings.items():
+                for transaction_id in posting:
+                    self._documents.setdefault(transaction_id, []).append(token)
+        return self._documents
+
+    def add(self, transaction):
+        tokens = _document_tokens(transaction)
+        self.documents[transaction.id] = list(tokens)
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                self.postings[token] = array('q', [transaction.id])
+                insort(self.vocabulary, token)
+            elif not posting or posting[-1] < transaction.id:
+                posting.append(transaction.id)
+            else:
+                posting.insert(bisect_left(posting, transaction.id), transaction.id)
+        self.dirty = True
+
+    def remove(self, transaction_id):
+        for token in self.documents.pop(transaction_id, ()):
+            posting = self.postings[token]
+            _remove_id(posting, transaction_id)
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+        self.dirty = True
+
+    def apply(self, op, transactions, generation):
+        """Store listener: apply one change, or mark the index stale if it cannot be applied."""
+        if self.stale:
+            return
+        if op in ("add", "update", "delete"):
+            for transaction in transactions:
+                self.remove(transaction.id)
+                if op != "delete":
+                    self.add(transaction)
+            self.generation = generation
+            self.signature = None
+        else:
+            self.stale = True
+
+    def _term(self, term, categories):
+        """Return the ids matching one query term; a trailing * matches every token with that prefix.
+
+        ``categories`` is a list of (category id, name tokens); rows of every
+        category with a matching name word match as well.
+        """
+        prefix = term[:-1] if term.endswith("*") else None
+        if prefix is not None:
+            ids = set()
+            index = bisect_left(self.vocabulary, prefix)
+            while index < len(self.vocabulary) and self.vocabulary[index].startswith(prefix):
+                ids.update(self.postings[self.vocabulary[index]])
+                index += 1
+        else:
+            ids = self.postings.get(term, ())
+
+        matching = [category_id for category_id, tokens in categories
+                    if (term in tokens if prefix is None else any(token.startswith(prefix) for token in tokens))]
+        if not matching:
+            return ids
+        ids = set(ids)
+        for category_id in matching:
+            ids.update(self.postings.get(_category_token(category_id), ()))
+        return ids
+
+    def search(self, query, categories=()):
+        """Return the sorted ids matching ``query``.
+
+        Words are ANDed and ``OR`` separates alternatives, so
+        ``lunch hawk* OR dinner`` means (lunch AND hawk*) OR dinner.
+        ``categories`` gives the (id, name) of every category so words can
+        match category names.
+        """
+        categories = [(category_id, set(tokenize(name))) for category_id, name in categories]
+        clauses = []
+        for clause in re.split(r"\s+OR\s+", query.strip()):
+            terms = []
+            for word in clause.split():
+                tokens = tokenize(word)
+                if word.endswith("*") and tokens:
+                    tokens[-1] += "*"
+                terms.extend(tokens)
+            if terms:
+                clauses.append(terms)
+
+        if len(clauses) == 1 and len(clauses[0]) == 1:
+            posting = self._term(clauses[0][0], categories)
+            # a single word that names no category is already a sorted posting list
+            return list(posting) if isinstance(posting, array) else sorted(posting)
+
+        found = set()
+        for terms in clauses:
+            postings = sorted((self._term(term, categories) for term in terms), key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                if not matches:
+                    break
+                matches = matches & posting if isinstance(posting, set) else _intersect(matches, posting)
+            found |= matches
+        return sorted(found)
+
+    def save(self, path, signature):
+        with atomic_write(path) as file:
+            json.dump({"version": FORMAT_VERSION, "signature": signature,
+                       "postings": {token: posting.tolist() for token, posting in self.postings.items()}}, file,
+                      separators=(",", ":"))
+        self.signature = signature
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, signature):
+        """Return the index saved at ``path`` if it was saved for ``signature``, otherwise None."""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != FORMAT_VERSION or data.get("signature") != signature:
+            return None
+        return cls({token: array('q', ids) for token, ids in data["postings"].items()}, signature=signature)
@@ -0,0 +1,326 @@
+"""SQLite storage backend exposing the same operations as TransactionStore."""
+
+import sqlite3
+from contextlib import contextmanager
+from src.models.ledger_totals import LedgerTotals
+from src.models.ledger_rollups import LedgerRollups
+from src.models.category_registry import get_category_registry
+from src.models.transaction_record import Transaction
+from src.models.transaction_store import TransactionStore
+from src.utils.dates import DATE_FORMAT, parse_date
+from src.utils.money import to_cents
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    date_iso TEXT,
+    amount TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    remarks TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT 'expense'
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date_iso);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_id ON transactions(category_id);
+
+CREATE TABLE IF NOT EXISTS totals (
+    type TEXT PRIMARY KEY,
+    cents INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals (type) VALUES ('income'), ('expense');
+
+CREATE TRIGGER IF NOT EXISTS totals_after_insert AFTER INSERT ON transactions BEGIN
+    INSERT OR IGNORE INTO totals (type) VALUES (NEW.type);
+    UPDATE totals SET cents = cents + NEW.amount_cents, count = count + 1 WHERE type = NEW.type;
+END;
+CREATE TRIGGER IF NOT EXISTS totals_after_delete AFTER DELETE ON transactions BEGIN
+    UPDATE totals SET cents = cents - OLD.amount_cents, count = count - 1 WHERE type = OLD.type;
+END;
+CREATE TRIGGER IF NOT EXISTS totals_after_update AFTER UPDATE OF amount_cents, type ON transactions BEGIN
+    UPDATE totals SET cents = cents - OLD.amount_cents, count = count - 1 WHERE type = OLD.type;
+    INSERT OR IGNORE INTO totals (type) VALUES (NEW.type);
+    UPDATE totals SET cents = cents + NEW.amount_cents, count = count + 1 WHERE type = NEW.type;
+END;
+"""
+
+# month key (year * 12 + month - 1) of a row, -1 when its date did not parse, as in ledger_rollups
+_MONTH = ("CASE WHEN {row}.date_iso IS NULL THEN -1 ELSE CAST(substr({row}.date_iso, 1, 4) AS INTEGER) * 12 "
+          "+ CAST(substr({row}.date_iso, 6, 2) AS INTEGER) - 1 END")
+
+ROLLUPS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    month INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    cents INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category_id, type)
+);
+
+CREATE TRIGGER IF NOT EXISTS rollups_after_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO rollups (month, category_id, type, cents, count) VALUES ({new}, NEW.category_id, NEW.type, NEW.amount_cents, 1)
+    ON CONFLICT DO UPDATE SET cents = cents + excluded.cents, count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS rollups_after_delete AFTER DELETE ON transactions BEGIN
+    UPDATE rollups SET cents = cents - OLD.amount_cents, count = count - 1
+    WHERE month = {old} AND category_id = OLD.category_id AND type = OLD.type;
+    DELETE FROM rollups WHERE month = {old} AND category_id = OLD.category_id AND type = OLD.type AND count = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS rollups_after_update AFTER UPDATE OF amount_cents, date_iso, category_id, type ON transactions BEGIN
+    UPDATE rollups SET cents = cents - OLD.amount_cents, count = count - 1
+    WHERE month = {old} AND category_id = OLD.category_id AND type = OLD.type;
+    DELETE FROM rollups WHERE month = {old} AND category_id = OLD.category_id AND type = OLD.type AND count = 0;
+    INSERT INTO rollups (month, category_id, type, cents, count) VALUES ({new}, NEW.category_id, NEW.type, NEW.amount_cents, 1)
+    ON CONFLICT DO UPDATE SET cents = cents + excluded.cents, count = count + 1;
+END;
+""".format(new=_MONTH.format(row="NEW"), old=_MONTH.format(row="OLD"))
+
+COLUMNS = "id, date, amount, category_id, remarks, type"
+
+
+def _row_to_transaction(row):
+    return Transaction(*row)
+
+
+def _dates(date):
+    """Return (date as stored, ISO date for the index); dates that parse are stored as DD/MM/YYYY."""
+    try:
+        parsed = parse_date(date)
+    except ValueError:
+        return date, None
+    return parsed.strftime(DATE_FORMAT), parsed.isoformat()
+
+
+def _range(start, end):
+    """WHERE clause and parameters for date_iso within [start, end]; either bound may be None."""
+    clauses, parameters = ["date_iso IS NOT NULL"], []
+    if start is not None:
+        clauses.append("date_iso >= ?")
+        parameters.append(start.isoformat())
+    if end is not None:
+        clauses.append("date_iso <= ?")
+        parameters.append(end.isoformat())
+    return " AND ".join(clauses), parameters
+
+
+class SqliteTransactionStore:
+    """Keeps the ledger in an indexed SQLite table and answers queries with SQL."""
+
+    def __init__(self, path):
+        self.path = path
+        # the API server uses the connection from its ledger thread as well as the main one,
+        # never both at once for a write; sqlite3 serializes the calls themselves
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+        # databases created before the rollups table get it filled from their rows once
+        fill_rollups = not self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollups'").fetchone()
+        self.connection.executescript(SCHEMA + ROLLUPS_SCHEMA)
+        self._batch_depth = 0
+        if fill_rollups:
+            with self._transaction():
+                self._rebuild_rollups()
+        # called with (op, transactions) after each change, like TransactionStore.listeners
+        self.listeners = []
+
+    def _migrate(self):
+        """Databases created before category ids hold a category name column; replace it with ids."""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(transactions)")}
+        if "category" not in columns:
+            return
+        registry = get_category_registry()
+        with self.connection:
+            self.connection.execute("ALTER TABLE transactions ADD COLUMN category_id INTEGER NOT NULL DEFAULT 0")
+            pairs = self.connection.execute("SELECT DISTINCT type, category FROM transactions").fetchall()
+            self.connection.executemany(
+                "UPDATE transactions SET category_id = ? WHERE type = ? AND category = ?",
+                [(registry.intern(transaction_type, name), transaction_type, name) for transaction_type, name in pairs])
+            self.connection.execute("DROP INDEX IF EXISTS idx_transactions_category")
+            self.connection.execute("ALTER TABLE transactions DROP COLUMN category")
+
+    def _notify(self, op, transactions=()):
+        for listener in self.listeners:
+            listener(op, transactions)
+
+    @contextmanager
+    def _transaction(self):
+        """Commit on exit, unless the change is part of an enclosing batch."""
+        if self._batch_depth:
+            yield
+        else:
+            with self.connection:
+                yield
+
+    @contextmanager
+    def batch(self):
+        """Group commit: every change made inside the block is committed in one SQLite transaction."""
+        with self._transaction():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+
+    def refresh(self):
+        """SQLite always reads the committed state, there is nothing to reload."""
+
+    def flush(self):
+        """Every change is committed before it returns, there is nothing queued."""
+
+    @property
+    def generation(self):
+        """Changes by this connection plus commits by any other connection."""
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        return (data_version, self.connection.total_changes)
+
+    def all(self):
+        rows = self.connection.execute(f"SELECT {COLUMNS} FROM transactions ORDER BY id")
+        return [_row_to_transaction(row) for row in rows]
+
+    def stream(self):
+        """Iterate transactions lazily from a cursor instead of materializing the table."""
+        rows = self.connection.execute(f"SELECT {COLUMNS} FROM transactions ORDER BY id")
+        return (_row_to_transaction(row) for row in rows)
+
+    def _insert(self, transactions):
+        transactions = (t if isinstance(t, Transaction) else Transaction.from_dict(t) for t in transactions)
+        self.connection.executemany(
+            "INSERT INTO transactions (id, date, date_iso, amount, amount_cents, category_id, remarks, type) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            ((t.id, t.date, t.date_value.isoformat() if t.date_value else None, t.amount, t.cents,
+              t.category_id, t.remarks, t.type) for t in transactions))
+
+    def replace(self, transactions):
+        with self._transaction():
+            self.connection.execute("DELETE FROM transactions")
+            self._insert(transactions)
+        self._notify("replace")
+
+    def import_json(self, json_path):
+        """Replace the table contents with the ledger stored in a transactions.json file."""
+        self.replace(TransactionStore(json_path).all())
+
+    def get(self, transaction_id):
+        row = self.connection.execute(f"SELECT {COLUMNS} FROM transactions WHERE id = ?",
+                                      (int(transaction_id),)).fetchone()
+        return _row_to_transaction(row) if row else None
+
+    def add(self, date, amount, category, remarks, transaction_type="expense"):
+        with self._transaction():
+            cursor = self.connection.execute(
+                "INSERT INTO transactions (date, date_iso, amount, amount_cents, category_id, remarks, type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*_dates(date), amount, to_cents(amount), get_category_registry().intern(transaction_type, category),
+                 remarks, transaction_type))
+        transaction = self.get(cursor.lastrowid)
+        self._notify("add", (transaction,))
+        return transaction
+
+    def add_many(self, rows):
+        """Insert (date, amount, category, remarks, type) rows in one transaction. Returns the count."""
+        registry = get_category_registry()
+        rows = [(*_dates(date), amount, to_cents(amount), registry.intern(transaction_type, category), remarks,
+                 transaction_type)
+                for date, amount, category, remarks, transaction_type in rows]
+        with self._transaction():
+            self.connection.executemany(
+                "INSERT INTO transactions (date, date_iso, amount, amount_cents, category_id, remarks, type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        # the new ids are not known here, so listeners rebuild
+        self._notify("reload")
+        return len(rows)
+
+    def update(self, transaction_id, amount, category, date, remarks):
+        transaction = self.get(transaction_id)
+        if transaction is None:
+            return None
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE transactions SET amount = ?, amount_cents = ?, category_id = ?, date = ?, date_iso = ?, "
+                "remarks = ? WHERE id = ?",
+                (amount, to_cents(amount), get_category_registry().intern(transaction.type, category),
+                 *_dates(date), remarks, int(transaction_id)))
+        transaction = self.get(transaction_id)
+        self._notify("update", (transaction,))
+        return transaction
+
+    def delete(self, transaction_id):
+        transaction = self.get(transaction_id)
+        if transaction is not None:
+            with self._transaction():
+                self.connection.execute("DELETE FROM transactions WHERE id = ?", (int(transaction_id),))
+            self._notify("delete", (transaction,))
+        return transaction
+
+    def clear(self):
+        with self._transaction():
+            self.connection.execute("DELETE FROM transactions")
+        self._notify("clear")
+
+    def filter(self, transaction_type="expense"):
+        rows = self.connection.execute(
+            f"SELECT {COLUMNS} FROM transactions WHERE type = ? ORDER BY id", (transaction_type,))
+        return [_row_to_transaction(row) for row in rows]
+
+    def page(self, transaction_type, offset, limit):
+        rows = self.connection.execute(
+            f"SELECT {COLUMNS} FROM transactions WHERE type = ? ORDER BY id LIMIT ? OFFSET ?",
+            (transaction_type, limit, offset))
+        return [_row_to_transaction(row) for row in rows]
+
+    def between(self, start=None, end=None):
+        """Return the transactions dated within [start, end] in date order, found through the date index."""
+        where, parameters = _range(start, end)
+        rows = self.connection.execute(
+            f"SELECT {COLUMNS} FROM transactions WHERE {where} ORDER BY date_iso, id", parameters)
+        return [_row_to_transaction(row) for row in rows]
+
+    def period_totals(self, start=None, end=None):
+        """Return LedgerTotals for the transactions dated within [start, end]."""
+        where, parameters = _range(start, end)
+        rows = self.connection.execute(
+            f"SELECT type, SUM(amount_cents), COUNT(*) FROM transactions WHERE {where} GROUP BY type",
+            parameters).fetchall()
+        return LedgerTotals({row[0]: row[1] for row in rows}, {row[0]: row[2] for row in rows})
+
+    def totals(self):
+        """Return the running totals kept up to date by the table triggers."""
+        rows = self.connection.execute("SELECT type, cents, count FROM totals").fetchall()
+        return LedgerTotals({row[0]: row[1] for row in rows}, {row[0]: row[2] for row in rows})
+
+    def total(self, transaction_type="expense"):
+        return self.totals().total(transaction_type)
+
+    def rollups(self):
+        """Return the (month, category, type) rollups kept up to date by the table triggers."""
+        return LedgerRollups.from_list(
+            self.connection.execute("SELECT month, category_id, type, cents, count FROM rollups").fetchall())
+
+    def _rebuild_rollups(self):
+        self.connection.execute("DELETE FROM rollups")
+        self.connection.execute(
+            "INSERT INTO rollups (month, category_id, type, cents, count) "
+            f"SELECT {_MONTH.format(row='transactions')} AS month, category_id, type, SUM(amount_cents), COUNT(*) "
+            "FROM transactions GROUP BY month, category_id, type")
+
+    def verify_totals(self, rebuild=False):
+        """Recompute the totals with SUM() and return any drift from the trigger-maintained ones.
+
+        A rebuild also recomputes the rollups table.
+        """
+        rows = self.connection.execute(
+            "SELECT type, SUM(amount_cents), COUNT(*) FROM transactions GROUP BY type").fetchall()
+        expected = LedgerTotals({row[0]: row[1] for row in rows}, {row[0]: row[2] for row in rows})
+        drift = self.totals().drift(expected)
+        if rebuild:
+            with self._transaction():
+                if drift:
+                    self.connection.execute("UPDATE totals SET cents = 0, count = 0")
+                    self.connection.executemany(
+                        "INSERT INTO totals (type, cents, count) VALUES (?, ?, ?) "
+                        "ON CONFLICT(type) DO UPDATE SET cents = excluded.cents, count = excluded.count", rows)
+                self._rebuild_rollups()
+        return drift
@@ -1,94 +1,286 @@
 import os
-import json
-from src.utils.settings import DATA_FILE
+import sys
+import atexit
+import threading
+from src.utils.settings import (DATA_FILE, STORAGE_BACKEND, JOURNAL_FILE, JOURNAL_COMPACT_EVERY, DATABASE_FILE, META_FILE,
+                                BINARY_FILE, BINARY_META_FILE, INDEX_FILE, WRITE_BEHIND_DELAY, WRITE_BEHIND_MAX_DELAY)
+from src.models.transaction_store import (TransactionStore, JournalTransactionStore, migrate_to_journal,
+                                          migrate_category_ids)
+from src.models.transaction_stream import filter_type, filter_category
+from src.models.search_index import SearchIndex
+from src.models.write_behind import WriteBehind, DeferredFlush
+from src.models.category_registry import get_category_registry
+from src.utils.instrumentation import instrumented
 
-# load all transactions from file
-def load_transactions():
-    if not os.path.exists(DATA_FILE):
-        print("File not found")
-        return []
+# pick the storage backend configured in settings
+def _create_store():
+    if STORAGE_BACKEND == "sqlite":
+        from src.models.sqlite_store import SqliteTransactionStore
+        first_run = not os.path.exists(DATABASE_FILE)
+        store = SqliteTransactionStore(DATABASE_FILE)
+        if first_run and os.path.exists(DATA_FILE):
+            store.import_json(DATA_FILE)
+        return store
+
+    if STORAGE_BACKEND == "binary":
+        from src.models.binary_store import BinaryTransactionStore
+        first_run = not os.path.exists(BINARY_FILE)
+        store = BinaryTransactionStore(BINARY_FILE, BINARY_META_FILE)
+        if first_run and os.path.exists(DATA_FILE):
+            store.import_json(DATA_FILE)
+        return store
+
+    journal_pending = os.path.exists(JOURNAL_FILE)
+    # ledgers from before the category table are converted to ids once, before anything reads them
+    migrate_category_ids(DATA_FILE, JOURNAL_FILE)
+
+    if STORAGE_BACKEND == "journal":
+        if not journal_pending:
+            migrate_to_journal(DATA_FILE, JOURNAL_FILE)
+        return JournalTransactionStore(DATA_FILE, JOURNAL_FILE, JOURNAL_COMPACT_EVERY, META_FILE)
+
+    # switching back from journal mode, fold any pending journal into the data file first
+    if journal_pending:
+        JournalTransactionStore(DATA_FILE, JOURNAL_FILE).compact()
+        os.remove(JOURNAL_FILE)
+    return TransactionStore(DATA_FILE, META_FILE)
 
-    if os.path.getsize(DATA_FILE) == 0:
-        print("File is empty")
-        return []
+# single shared store, the ledger is parsed once per process; it is opened on first use
+# rather than at import, since opening it can convert, migrate or compact the files
+_store = None
+_store_lock = threading.Lock()
 
-    with open(DATA_FILE, 'r', encoding='utf-8') as file:
-        return json.load(file)
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = _create_store()
+                store.listeners.append(_update_search_index)
+                _store = store
+    return _store
+
+# load all transactions (served from memory, reloaded if the file changed)
+@instrumented("load_transactions")
+def load_transactions():
+    return get_store().all()
 
 # save a transaction to file
+@instrumented("save_transactions")
 def save_transactions(transactions):
-    with open(DATA_FILE, 'w', encoding='utf-8') as file:
-        json.dump(transactions, file, indent=4)
+    get_store().replace(transactions)
 
 # add new transaction
+@instrumented("add_transaction")
 def add_transaction(date, amount, category, remarks, transaction_type="expense"):
-    transactions = load_transactions()
-    new_transaction = {
-        "id": transactions[-1]["id"] + 1 if transactions else 1,
-        "date": date,
-        "amount": amount,
-        "category": category,
-        "remarks": remarks,
-        "type": transaction_type
-    }
-    transactions.append(new_transaction)
-    save_transactions(transactions)
+    return get_store().add(date, amount, category, remarks, transaction_type)
+
+# add many (date, amount, category, remarks, type) rows with one persist
+def add_transactions(rows):
+    return get_store().add_many(rows)
+
+# group several changes into one locked commit with a single write
+def transaction_batch():
+    return get_store().batch()
+
+# get a single transaction by id
+def get_transaction(transaction_id):
+    return get_store().get(transaction_id)
 
 # delete transaction
+@instrumented("delete_transaction")
 def delete_transaction(transaction_id):
-    transactions = load_transactions()
-    for transaction in transactions:
-        if transaction["id"] == int(transaction_id):
-            transactions.pop(transactions.index(transaction))
-            break
-    save_transactions(transactions)
+    return get_store().delete(transaction_id)
 
 def delete_all_transactions():
-    transactions = []
-    save_transactions(transactions)
+    get_store().clear()
 
-# view transactions of specified type
-def view_filtered_transactions(transaction_type="expense"):
-    transactions = load_transactions()
+# lazily iterate transactions through optional type, category and date range filters;
+# a date range is read from the date index and comes back in date order
+def iter_transactions(transaction_type=None, category=None, start=None, end=None):
+    if start is not None or end is not None:
+        transactions = iter(get_store().between(start, end))
+    else:
+        transactions = get_store().stream()
+    if transaction_type is not None:
+        transactions = filter_type(transactions, transaction_type)
+    if category is not None:
+        transactions = filter_category(transactions, category)
+    return transactions
 
-    if not transactions:
-        print(f"No {transaction_type} transactions found.")
-        return []
-
-    filtered_transactions = [t for t in transactions if t.get('type', 'expense') == transaction_type]
-    for transaction in filtered_transactions:
-        print(f"ID: {transaction['id']}")
-        print(f"Amount: ${transaction['amount']}")
-        print(f"Date: {transaction['date']}")
-        print(f"Category: {transaction['category']}")
-        print(f"Remark: {transaction['remarks']}")
+# transactions dated within [start, end] in date order, in O(log n + k) through the date index
+def get_transactions_between(start=None, end=None):
+    return get_store().between(start, end)
+
+# whether a date range can be summed without parsing the whole ledger first, which only
+# a JSON or journal ledger that this process has not loaded yet would need
+def ledger_in_memory():
+    store = get_store()
+    return not isinstance(store, TransactionStore) or store.loaded
+
+# income and expense totals for transactions dated within [start, end]
+def get_range_totals(start=None, end=None):
+    return get_store().period_totals(start, end)
+
+# one page of transactions of a type plus the total count of that type
+def get_transactions_page(transaction_type="expense", page=0, page_size=20):
+    store = get_store()
+    count = store.totals().counts.get(transaction_type, 0)
+    return store.page(transaction_type, page * page_size, page_size), count
+
+# view transactions of specified type, printing each one as soon as it is read
+@instrumented("view_filtered_transactions")
+def view_filtered_transactions(transaction_type="expense"):
+    count = 0
+    for transaction in iter_transactions(transaction_type):
+        print(f"ID: {transaction.id}")
+        print(f"Amount: ${transaction.amount}")
+        print(f"Date: {transaction.date}")
+        print(f"Category: {transaction.category}")
+        print(f"Remark: {transaction.remarks}")
         print("")
+        count += 1
 
-    return filtered_transactions
+    if not count:
+        print(f"No {transaction_type} transactions found.")
+    return count
 
 # wrapper function for backward compatibility
 def view_transactions():
     return view_filtered_transactions("expense")
 
 # update transaction
+@instrumented("update_transaction")
 def update_transaction(transaction_id, amount, category, date, remarks):
-    transactions = load_transactions()
-    for transaction in transactions:
-        if transaction["id"] == int(transaction_id):
-            transaction["amount"] = amount
-            transaction["date"] = date
-            transaction["category"] = category
-            transaction["remarks"] = remarks
-            break
-    save_transactions(transactions)
+    return get_store().update(transaction_id, amount, category, date, remarks)
 
 # get total for a transaction type
+@instrumented("get_total")
 def get_total(transaction_type="expense"):
-    transactions = load_transactions()
-    total = sum(float(transaction["amount"]) for transaction in transactions
-                if transaction.get("type", "expense") == transaction_type)
+    total = get_store().total(transaction_type)
     return f"{total:.2f}"
 
+# running totals, maintained incrementally instead of scanning the ledger
+@instrumented("get_totals")
+def get_totals():
+    return get_store().totals()
+
+# recompute the totals from scratch, report drift and optionally fix it
+def verify_totals(rebuild=False):
+    return get_store().verify_totals(rebuild)
+
+# (month, category, type) sums and counts, maintained with every change and
+# checkpointed with the ledger so reports need no pass over the transactions
+@instrumented("get_rollups")
+def get_rollups():
+    return get_store().rollups()
+
+# stat signature of the files backing the ledger, comparable across processes
+def get_ledger_signature():
+    # changes still queued by write-behind would not be described by the files yet
+    get_store().flush()
+    signature = []
+    for path in (DATA_FILE, JOURNAL_FILE, DATABASE_FILE, BINARY_FILE):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        signature.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+    return signature
+
+# full-text index over remarks and category ids, updated by a store listener as the ledger changes
+_search_index = None
+
+def _update_search_index(op, transactions):
+    index = _search_index
+    if index is None:
+        return
+    # a ledger loaded from the same files the saved index was built from needs no rebuild
+    if op == "reload" and index.signature is not None and index.signature == get_ledger_signature():
+        index.generation = get_store().generation
+        return
+    index.apply(op, transactions, get_store().generation)
+
+def get_search_index():
+    """Return the search index, loading the saved copy or rebuilding it if the ledger changed."""
+    global _search_index
+    index = _search_index
+    if index is not None:
+        if index.signature is not None:
+            if index.signature == get_ledger_signature():
+                return index
+        else:
+            store = get_store()
+            store.refresh()
+            if not index.stale and index.generation == store.generation:
+                return index
+
+    index = SearchIndex.load(INDEX_FILE, get_ledger_signature())
+    if index is None:
+        store = get_store()
+        index = SearchIndex.from_transactions(store.all(), store.generation)
+        index.save(INDEX_FILE, get_ledger_signature())
+    _search_index = index
+    return index
+
+# matching transactions, oldest first, plus the total number of matches
+@instrumented("search_transactions")
+def search_transactions(query, limit=None):
+    ids = get_search_index().search(query, get_category_registry().names().items())
+    transactions = (get_store().get(transaction_id) for transaction_id in ids[:limit])
+    return [t for t in transactions if t is not None], len(ids)
+
+# save index changes made this session so the next start does not rebuild it
+@atexit.register
+def _save_search_index():
+    index = _search_index
+    if index is None or not index.dirty or index.stale:
+        return
+    # an index is only built once the store is open
+    store = get_store()
+    store.refresh()
+    try:
+        signature = get_ledger_signature()
+    except OSError:
+        # the ledger itself could not be saved, which _flush_on_exit has reported
+        return
+    if not index.stale and index.generation == store.generation:
+        index.save(INDEX_FILE, signature)
+
+# save changes from a background thread instead of before each change returns; the
+# SQLite and binary backends commit every change themselves and keep doing so
+def enable_write_behind(delay=WRITE_BEHIND_DELAY, max_delay=WRITE_BEHIND_MAX_DELAY):
+    store = get_store()
+    if delay > 0 and isinstance(store, TransactionStore):
+        store.write_behind = WriteBehind(store.flush, delay, max_delay)
+
+# why write-behind last failed to save, reported once; None while saving works
+def take_save_error():
+    # a store that was never opened has nothing to report, and is not opened to find that out
+    write_behind = getattr(_store, "write_behind", None)
+    return write_behind.take_error() if isinstance(write_behind, WriteBehind) else None
+
+# keep changes queued in memory until flush_transactions() is called, for a caller that
+# schedules the save itself; as with write-behind, only the JSON and journal stores queue
+def defer_writes():
+    store = get_store()
+    if isinstance(store, TransactionStore):
+        store.write_behind = DeferredFlush()
+
+# write any changes write-behind still has queued, raising OSError if they cannot be saved
+def flush_transactions():
+    get_store().flush()
+
+# registered after _save_search_index so it runs first
+@atexit.register
+def _flush_on_exit():
+    if _store is None:
+        return
+    try:
+        _store.flush()
+    except OSError as error:
+        print(f"Could not save the latest changes: {error}", file=sys.stderr)
+
 # wrapper functions for backward compatibility
 def get_total_expenses():
     return get_total("expense")
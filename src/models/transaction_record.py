@@ -0,0 +1,132 @@
+"""Compact transaction record with integer cents, a parsed date and a category id."""
+
+import sys
+from datetime import date as Date
+from functools import lru_cache
+
+from src.utils.dates import DATE_FORMAT, parse_date
+from src.models.category_registry import get_category_registry
+from src.utils.money import to_cents, format_cents
+
+
+# ledgers reuse a small set of dates, so parsing and formatting are memoized
+@lru_cache(maxsize=8192)
+def _parse_date(text):
+    """Return (ordinal, None), or (0, original text) if the date does not parse."""
+    try:
+        return parse_date(text).toordinal(), None
+    except ValueError:
+        return 0, text
+
+
+@lru_cache(maxsize=8192)
+def _format_ordinal(ordinal):
+    return Date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+class Transaction:
+    """A single ledger row.
+
+    The amount is held as integer cents and the date as a proleptic ordinal,
+    both parsed once when the record is created. The category is held as its
+    id in the category table and ``category`` resolves the current name, so a
+    renamed or merged category shows up on every row at once. The type string
+    is interned so rows share a single copy. Dates are normalized
+    to zero-padded DD/MM/YYYY as they are loaded or entered; a date that does
+    not parse keeps its original text so converting back to JSON is lossless.
+    Amounts always round-trip as two-decimal strings.
+    """
+
+    __slots__ = ("id", "cents", "date_ordinal", "_date_text", "category_id", "remarks", "type")
+
+    def __init__(self, id, date, amount, category, remarks="", type="expense"):
+        """``category`` is a category name or an id from the category table."""
+        self.id = int(id)
+        self.date = date
+        self.amount = amount
+        self.type = sys.intern(type)
+        if isinstance(category, int):
+            self.category_id = category
+        else:
+            self.category = category
+        self.remarks = remarks
+
+    @property
+    def amount(self):
+        return format_cents(self.cents)
+
+    @amount.setter
+    def amount(self, amount):
+        self.cents = to_cents(amount)
+
+    @property
+    def date(self):
+        if self._date_text is not None:
+            return self._date_text
+        return _format_ordinal(self.date_ordinal)
+
+    @date.setter
+    def date(self, text):
+        self.date_ordinal, self._date_text = _parse_date(text)
+
+    @property
+    def category(self):
+        return get_category_registry().name(self.category_id)
+
+    @category.setter
+    def category(self, name):
+        self.category_id = get_category_registry().intern(self.type, name)
+
+    @property
+    def date_value(self):
+        """The date as a datetime.date, or None if it did not parse."""
+        return Date.fromordinal(self.date_ordinal) if self.date_ordinal else None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from to_dict() or to_record() output; ledgers written before ids carry names."""
+        category = data["category_id"] if "category_id" in data else data["category"]
+        return cls(data["id"], data["date"], data["amount"], category,
+                   data.get("remarks", ""), data.get("type", "expense"))
+
+    @classmethod
+    def from_values(cls, id, date_ordinal, date_text, cents, category_id, remarks, type):
+        """Build a record from already parsed fields, such as a binary ledger record, without parsing anything."""
+        transaction = cls.__new__(cls)
+        transaction.id = id
+        transaction.date_ordinal = date_ordinal
+        transaction._date_text = date_text
+        transaction.cents = cents
+        transaction.category_id = category_id
+        transaction.remarks = remarks
+        transaction.type = type
+        return transaction
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "date": self.date,
+            "amount": self.amount,
+            "category": self.category,
+            "remarks": self.remarks,
+            "type": self.type
+        }
+
+    def to_record(self):
+        """The stored form, which refers to the category by id."""
+        return {
+            "id": self.id,
+            "date": self.date,
+            "amount": self.amount,
+            "category_id": self.category_id,
+            "remarks": self.remarks,
+            "type": self.type
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Transaction({self.to_dict()!r})"
@@ -0,0 +1,636 @@
+"""In-memory transaction store with write-through persistence."""
+
+import os
+import json
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from json.encoder import encode_basestring_ascii
+from src.models.date_index import DateIndex
+from src.models.ledger_totals import LedgerTotals
+from src.models.ledger_rollups import LedgerRollups
+from src.models.transaction_record import Transaction
+from src.models.transaction_stream import stream_transactions, filter_type
+from src.utils.file_lock import locked, atomic_write, hold, release
+from src.utils.instrumentation import instrumented, count_bytes
+
+
+_RECORD_TEMPLATE = (
+    '    {{\n'
+    '        "id": {id},\n'
+    '        "date": {date},\n'
+    '        "amount": {amount},\n'
+    '        "category_id": {category_id},\n'
+    '        "remarks": {remarks},\n'
+    '        "type": {type}\n'
+    '    }}'
+)
+
+
+def _format_record(transaction):
+    """Render a transaction's to_record() exactly as json.dump(..., indent=4) would.
+
+    json falls back to its pure-Python encoder whenever indent is set, which
+    dominates the cost of saving a large ledger; filling a fixed template with
+    C-escaped strings produces the same bytes several times faster.
+    """
+    return _RECORD_TEMPLATE.format(
+        id=transaction.id,
+        date=encode_basestring_ascii(transaction.date),
+        amount=encode_basestring_ascii(transaction.amount),
+        category_id=transaction.category_id,
+        remarks=encode_basestring_ascii(transaction.remarks),
+        type=encode_basestring_ascii(transaction.type)
+    )
+
+
+def write_ledger(file, transactions):
+    """Write transactions to an open text file in the transactions.json layout, one record at a time."""
+    separator = "[\n"
+    for transaction in transactions:
+        file.write(separator + _format_record(transaction))
+        separator = ",\n"
+    file.write("[]" if separator == "[\n" else "\n]")
+
+
+def _exclusive(method):
+    """Run a mutating method as a group commit of one under the store lock."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class TransactionStore:
+    """Holds the ledger in memory and writes every change straight back to disk.
+
+    The file is parsed once and re-read only when its mtime or size changes,
+    so edits made by another process are still picked up. Records are indexed
+    by id in an insertion-ordered dict, so id lookups, updates and deletes are
+    O(1) while listings keep the file order. A date index, built on the first
+    range query and then maintained by delta, answers date ranges with two
+    bisects.
+
+    Income and expense totals and the (month, category, type) rollups are kept
+    up to date by delta and, together with the next-id counter, checkpointed
+    to ``meta_path`` so the summary and the monthly and category reports can
+    be answered without loading the ledger at all.
+
+    Several processes may share the files. Every change is made under an
+    exclusive fcntl lock on ``<path>.lock`` after re-reading anything another
+    process wrote, every write replaces the file atomically, and the
+    changes made inside ``batch()`` are persisted together as one group commit.
+
+    With ``write_behind`` set, a group commit is only queued and the
+    WriteBehind thread persists it shortly after. The exclusive lock is kept
+    until the queue is flushed, so other processes never read or overwrite a
+    file that is behind this process's memory.
+    """
+
+    def __init__(self, path, meta_path=None):
+        self.path = path
+        self.meta_path = meta_path
+        self._records = {}
+        self._list = None
+        self._totals = LedgerTotals()
+        self._rollups = LedgerRollups()
+        self._dates = None
+        self._next_id = 1
+        self._signature = None
+        self._loaded = False
+        self.lock_path = f"{path}.lock"
+        self._batch_depth = 0
+        self._pending = []
+        # a WriteBehind that saves queued changes in the background, None to save before each change returns
+        self.write_behind = None
+        self._held = False
+        # bumped on every change so derived views know when to rebuild
+        self.generation = 0
+        # called with (op, transactions) after each change, or ("reload", ()) when the file is re-read
+        self.listeners = []
+
+    def _file_signature(self):
+        """Return the (inode, mtime, size) of the data file, or None if it is missing.
+
+        The inode changes on every atomic replace, so two rewrites within one
+        mtime tick are still told apart.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @instrumented("store.read")
+    def _read(self):
+        if not os.path.exists(self.path):
+            print("File not found")
+            return []
+
+        size = os.path.getsize(self.path)
+        if size == 0:
+            print("File is empty")
+            return []
+
+        count_bytes("store.read", read=size)
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @instrumented("store.write")
+    def _write(self):
+        with atomic_write(self.path) as file:
+            write_ledger(file, self._records.values())
+            count_bytes("store.write", written=file.tell())
+        self._signature = self._file_signature()
+        self._loaded = True
+
+    @instrumented("store.append")
+    def _append(self, transactions):
+        """Replace the file with a copy that has the new records spliced in before the closing bracket.
+
+        The existing records are copied as bytes rather than formatted again,
+        which is most of the cost of a whole-file write, and the copy is
+        swapped in atomically, so a crash mid-append leaves the old file whole.
+        """
+        if self._signature is None or self._file_signature() != self._signature:
+            return self._write()
+
+        with open(self.path, 'rb') as source:
+            size = source.seek(0, os.SEEK_END)
+            tail_start = source.seek(max(0, size - 64))
+            tail = source.read()
+            close = tail.rfind(b"]")
+            if close == -1:
+                return self._write()
+
+            head = tail[:close].rstrip()
+            body = ",\n".join(map(_format_record, transactions))
+            source.seek(0)
+            with atomic_write(self.path, encoding=None) as file:
+                remaining = tail_start + len(head)
+                while remaining:
+                    chunk = source.read(min(remaining, 1 << 20))
+                    if not chunk:
+                        raise OSError(f"{self.path} changed while it was being appended to")
+                    file.write(chunk)
+                    remaining -= len(chunk)
+                written = file.write((b"\n" if head.endswith(b"[") else b",\n") + body.encode('utf-8') + b"\n]")
+                count_bytes("store.append", read=file.tell() - written + len(tail), written=file.tell())
+
+        self._signature = self._file_signature()
+
+    def _persist(self, pending):
+        """Persist a group of (op, transactions) changes.
+
+        A group made only of adds is spliced onto a byte copy of the file, anything else rewrites the whole file once.
+        """
+        if all(op == "add" for op, _ in pending):
+            self._append([t for _, transactions in pending for t in transactions])
+        else:
+            self._write()
+
+    def _read_meta(self):
+        if not self.meta_path or not os.path.exists(self.meta_path):
+            return {}
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _read_checkpoint(self, meta=None):
+        """Return the checkpointed (totals, rollups) if they were taken for the current file contents."""
+        meta = self._read_meta() if meta is None else meta
+        if ("totals" not in meta or "rollups" not in meta
+                or meta.get("signature") != json.loads(json.dumps(self._file_signature()))):
+            return None
+        return LedgerTotals.from_dict(meta["totals"]), LedgerRollups.from_list(meta["rollups"])
+
+    def _checkpoint(self):
+        if not self.meta_path:
+            return
+        with atomic_write(self.meta_path) as file:
+            # the rollups are spliced in as text, they cache the encoding of the cells that did not change
+            file.write(f'{{"signature": {json.dumps(self._signature)}, "totals": {json.dumps(self._totals.to_dict())}, '
+                       f'"rollups": {self._rollups.to_json()}, "next_id": {self._next_id}}}')
+
+    def _mutated(self, op, *transactions):
+        """Queue a change made in memory; it is written when the outermost batch ends."""
+        self.generation += 1
+        self._pending.append((op, transactions))
+        self._notify(op, transactions)
+
+    def _notify(self, op, transactions=()):
+        for listener in self.listeners:
+            listener(op, transactions)
+
+    @contextmanager
+    def batch(self):
+        """Group commit: hold the lock, apply every change in memory and persist them together on exit."""
+        with locked(self.lock_path):
+            self._batch_depth += 1
+            try:
+                self.refresh()
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._pending:
+                    if self.write_behind is None:
+                        self.flush()
+                    else:
+                        if not self._held:
+                            hold(self.lock_path)
+                            self._held = True
+                        self.write_behind.schedule()
+
+    def flush(self):
+        """Persist the queued changes now and let other processes back in. Raises if they cannot be written."""
+        if not self._pending and not self._held:
+            return
+        with locked(self.lock_path):
+            if self._pending:
+                pending, self._pending = self._pending, []
+                try:
+                    self._persist(pending)
+                except BaseException:
+                    self._pending[:0] = pending
+                    raise
+                self._checkpoint()
+            if self._held:
+                self._held = False
+                release(self.lock_path)
+
+    def refresh(self):
+        """Reload the ledger if the file changed since it was last read or written."""
+        if self._loaded and self._file_signature() == self._signature:
+            return
+        with locked(self.lock_path, shared=True):
+            self._reload()
+
+    def _reload(self):
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return
+        self._records = {t.id: t for t in map(Transaction.from_dict, self._read())}
+        self._list = None
+        self._dates = None
+        self.generation += 1
+        self._signature = signature
+        self._loaded = True
+
+        # the counter only moves forward, so ids of deleted records are never reused
+        meta = self._read_meta()
+        self._next_id = max(meta.get("next_id", 1), max(self._records, default=0) + 1)
+
+        checkpoint = self._read_checkpoint(meta)
+        if checkpoint is not None:
+            self._totals, self._rollups = checkpoint
+        else:
+            self._totals = LedgerTotals.from_transactions(self._records.values())
+            self._rollups = LedgerRollups.from_transactions(self._records.values())
+            self._checkpoint()
+        self._notify("reload")
+
+    @property
+    def loaded(self):
+        """True once the ledger has been read into memory."""
+        return self._loaded
+
+    def all(self):
+        """Return the cached list of transactions. Callers must treat it as read-only."""
+        self.refresh()
+        if self._list is None:
+            self._list = list(self._records.values())
+        return self._list
+
+    def stream(self):
+        """Iterate transactions in file order, streaming from disk if the ledger is not cached yet."""
+        if not self._loaded:
+            return stream_transactions(self.path)
+        return iter(self.all())
+
+    @_exclusive
+    def replace(self, transactions):
+        """Replace the whole ledger and persist it."""
+        transactions = (t if isinstance(t, Transaction) else Transaction.from_dict(t) for t in transactions)
+        self._records = {t.id: t for t in transactions}
+        self._list = None
+        self._dates = None
+        self.generation += 1
+        self._totals = LedgerTotals.from_transactions(self._records.values())
+        self._rollups = LedgerRollups.from_transactions(self._records.values())
+        self._next_id = max(self._next_id, max(self._records, default=0) + 1)
+        self._mutated("replace")
+
+    def get(self, transaction_id):
+        self.refresh()
+        return self._records.get(int(transaction_id))
+
+    @_exclusive
+    def add(self, date, amount, category, remarks, transaction_type="expense"):
+        new_transaction = Transaction(self._next_id, date, amount, category, remarks, transaction_type)
+        self._next_id += 1
+        self._records[new_transaction.id] = new_transaction
+        self._list = None
+        self._totals.add(new_transaction)
+        self._rollups.add(new_transaction)
+        if self._dates is not None:
+            self._dates.add(new_transaction)
+        self._mutated("add", new_transaction)
+        return new_transaction
+
+    @_exclusive
+    def add_many(self, rows):
+        """Add (date, amount, category, remarks, type) rows with a single persist. Returns the count."""
+        added = []
+        for date, amount, category, remarks, transaction_type in rows:
+            transaction = Transaction(self._next_id, date, amount, category, remarks, transaction_type)
+            self._next_id += 1
+            self._records[transaction.id] = transaction
+            self._totals.add(transaction)
+            self._rollups.add(transaction)
+            if self._dates is not None:
+                self._dates.add(transaction)
+            added.append(transaction)
+
+        if added:
+            self._list = None
+            self._mutated("add", *added)
+        return len(added)
+
+    @_exclusive
+    def update(self, transaction_id, amount, category, date, remarks):
+        previous = self.get(transaction_id)
+        if previous is None:
+            return None
+        # the record is replaced rather than changed in place, so a list of records
+        # taken before the update can still be read safely while it is applied
+        transaction = Transaction(previous.id, date, amount, category, remarks, previous.type)
+        self._records[transaction.id] = transaction
+        self._list = None
+        self._totals.remove(previous)
+        self._rollups.remove(previous)
+        if self._dates is not None:
+            self._dates.remove(previous)
+        self._totals.add(transaction)
+        self._rollups.add(transaction)
+        if self._dates is not None:
+            self._dates.add(transaction)
+        self._mutated("update", transaction)
+        return transaction
+
+    @_exclusive
+    def delete(self, transaction_id):
+        transaction = self._records.pop(int(transaction_id), None)
+        if transaction is None:
+            return None
+        self._list = None
+        self._totals.remove(transaction)
+        self._rollups.remove(transaction)
+        if self._dates is not None:
+            self._dates.remove(transaction)
+        self._mutated("delete", transaction)
+        return transaction
+
+    @_exclusive
+    def clear(self):
+        self._records = {}
+        self._list = None
+        self._dates = None
+        self._totals = LedgerTotals()
+        self._rollups = LedgerRollups()
+        self._mutated("clear")
+
+    def filter(self, transaction_type="expense"):
+        return [t for t in self.all() if t.type == transaction_type]
+
+    def page(self, transaction_type, offset, limit):
+        """Return up to ``limit`` transactions of one type, skipping the first ``offset``."""
+        return list(islice(filter_type(self.stream(), transaction_type), offset, offset + limit))
+
+    def between(self, start=None, end=None):
+        """Return the transactions dated within [start, end] in date order; either bound may be None."""
+        self.refresh()
+        if self._dates is None:
+            self._dates = DateIndex.from_transactions(self._records.values())
+        return [self._records[transaction_id] for transaction_id in self._dates.between(start, end)]
+
+    def period_totals(self, start=None, end=None):
+        """Return LedgerTotals for the transactions dated within [start, end]."""
+        return LedgerTotals.from_transactions(self.between(start, end))
+
+    def totals(self):
+        """Return the running totals, straight from the checkpoint if the ledger is not loaded yet."""
+        if not self._loaded:
+            checkpoint = self._read_checkpoint()
+            if checkpoint is not None:
+                return checkpoint[0]
+        self.refresh()
+        return self._totals
+
+    def rollups(self):
+        """Return the (month, category, type) rollups, straight from the checkpoint if the ledger is not loaded yet.
+
+        Callers must treat them as read-only.
+        """
+        if not self._loaded:
+            checkpoint = self._read_checkpoint()
+            if checkpoint is not None:
+                return checkpoint[1]
+        self.refresh()
+        return self._rollups
+
+    def total(self, transaction_type="expense"):
+        return self.totals().total(transaction_type)
+
+    def verify_totals(self, rebuild=False):
+        """Recompute the totals from scratch and return any drift from the maintained ones.
+
+        A rebuild also recomputes the rollups if they disagree with the ledger.
+        """
+        with locked(self.lock_path):
+            # the checkpoint below must not get ahead of the file
+            self.flush()
+            self.refresh()
+            expected = LedgerTotals.from_transactions(self._records.values())
+            drift = self._totals.drift(expected)
+            rollups = LedgerRollups.from_transactions(self._records.values()) if rebuild else None
+            if rebuild and (drift or rollups != self._rollups):
+                self._totals = expected
+                self._rollups = rollups
+                self._checkpoint()
+        return drift
+
+
+class JournalTransactionStore(TransactionStore):
+    """Store that appends each mutation to a JSON-lines journal instead of rewriting the ledger.
+
+    The data file acts as the snapshot. On load the snapshot is read and the
+    journal is replayed on top of it; once the journal reaches
+    ``compact_every`` records it is folded back into a fresh snapshot.
+    """
+
+    def __init__(self, path, journal_path, compact_every=1000, meta_path=None):
+        super().__init__(path, meta_path)
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self._journal_length = 0
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.journal_path)
+            journal_signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            journal_signature = None
+        return (super()._file_signature(), journal_signature)
+
+    @instrumented("journal.replay")
+    def _read(self):
+        transactions = super()._read()
+        self._journal_length = 0
+        if not os.path.exists(self.journal_path):
+            return transactions
+
+        # Replay is idempotent so a crash between writing a snapshot and
+        # truncating the journal only re-applies changes already in the snapshot.
+        records = {t["id"]: t for t in transactions}
+        committed = 0
+        with open(self.journal_path, 'rb') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line) if line.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    entry = None
+                if entry is None:
+                    # a torn last line from an interrupted append, nothing after it was committed
+                    break
+                committed += len(line)
+                self._journal_length += 1
+
+                if entry["op"] == "clear":
+                    records.clear()
+                elif entry["op"] == "delete":
+                    records.pop(entry["transaction"]["id"], None)
+                else:
+                    records[entry["transaction"]["id"]] = entry["transaction"]
+
+        count_bytes("journal.replay", read=committed)
+        if committed < os.path.getsize(self.journal_path):
+            os.truncate(self.journal_path, committed)
+        return list(records.values())
+
+    @instrumented("journal.snapshot")
+    def _write(self):
+        with atomic_write(self.path) as file:
+            json.dump([t.to_record() for t in self._records.values()], file, separators=(",", ":"))
+            count_bytes("journal.snapshot", written=file.tell())
+        open(self.journal_path, 'w', encoding='utf-8').close()
+        self._journal_length = 0
+        self._signature = self._file_signature()
+        self._loaded = True
+
+    @instrumented("journal.append")
+    def _persist(self, pending):
+        """Append one journal record per transaction, compacting once the journal grows too long."""
+        if any(op == "replace" for op, _ in pending):
+            return self._write()
+
+        entries = [{"op": op, "transaction": record}
+                   for op, transactions in pending
+                   for record in ([t.to_record() for t in transactions] or [None])]
+        with open(self.journal_path, 'a', encoding='utf-8') as file:
+            written = file.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+            count_bytes("journal.append", written=written)
+            file.flush()
+            os.fsync(file.fileno())
+        self._journal_length += len(entries)
+
+        # compacting only once the journal is as long as the ledger keeps the amortized cost per change O(1)
+        if self._journal_length >= max(self.compact_every, len(self._records)):
+            self._write()
+        else:
+            self._signature = self._file_signature()
+
+    def stream(self):
+        # the snapshot alone is stale until the journal is replayed
+        return iter(self.all())
+
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal."""
+        with locked(self.lock_path):
+            self.flush()
+            self.refresh()
+            self._write()
+
+
+def _first_row(path):
+    """Parse the first row of a JSON ledger without reading the rest of the file; None if it has none."""
+    decoder = json.JSONDecoder()
+    text = ""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            while True:
+                chunk = file.read(4096)
+                text += chunk
+                start = text.find("{")
+                if start >= 0:
+                    try:
+                        return decoder.raw_decode(text, start)[0]
+                    except json.JSONDecodeError:
+                        pass
+                if not chunk:
+                    return None
+    except FileNotFoundError:
+        return None
+
+
+def _first_journal_row(journal_path):
+    """The transaction of the first journal entry that has one, or None."""
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    return None
+                if entry["transaction"] is not None:
+                    return entry["transaction"]
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def _names_categories(path, journal_path):
+    rows = (_first_row(path), _first_journal_row(journal_path) if journal_path else None)
+    return any(row is not None and "category_id" not in row for row in rows)
+
+
+def migrate_category_ids(path, journal_path=None):
+    """Convert a ledger written before the category table to category ids. Returns True if it had to.
+
+    Rows of such ledgers name their category. They are converted once, when
+    the store is opened and before anything reads them: names missing from
+    the table get a deleted entry, and the ledger, with any pending journal,
+    is written back under the store lock. Loading a ledger never writes.
+    Only the first row is parsed to tell, since every write stores ids.
+    """
+    if not _names_categories(path, journal_path):
+        return False
+    pending = journal_path is not None and os.path.exists(journal_path)
+    store = JournalTransactionStore(path, journal_path) if pending else TransactionStore(path)
+    with locked(store.lock_path):
+        # another instance may have converted it while this one waited for the lock
+        if not _names_categories(path, journal_path):
+            return False
+        store.refresh()
+        store._write()
+    return True
+
+
+def migrate_to_journal(path, journal_path):
+    """Convert an indented transactions.json into a compact journal snapshot."""
+    transactions = TransactionStore(path).all()
+    store = JournalTransactionStore(path, journal_path)
+    store.replace(transactions)
+    return store
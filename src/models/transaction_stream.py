@@ -0,0 +1,103 @@
+"""Streaming reader and composable generator stages for transaction listings."""
+
+import os
+import re
+import json
+
+from src.models.transaction_record import Transaction
+from src.utils.instrumentation import count_bytes
+
+# whitespace and element separators between array items
+_SEPARATOR = re.compile(r'[\s,]*')
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    The file is read in ``chunk_size`` pieces and each element is decoded
+    with ``JSONDecoder.raw_decode`` as soon as it is complete, so memory
+    stays bounded by the largest element rather than the whole file.
+    """
+    if not os.path.exists(path):
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as file:
+        buffer = ""
+        position = 0
+        eof = False
+        started = False
+
+        while True:
+            position = _SEPARATOR.match(buffer, position).end()
+            if position >= len(buffer):
+                if eof:
+                    if started:
+                        raise ValueError(f"Unterminated JSON array in {path}")
+                    return
+                chunk = file.read(chunk_size)
+                count_bytes("store.stream", read=len(chunk))
+                buffer = buffer[position:] + chunk
+                position = 0
+                eof = len(chunk) < chunk_size
+                continue
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                element, end = None, None
+
+            # an element cut off at the chunk boundary, or one that may continue in the next chunk
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise ValueError(f"Malformed JSON array element in {path}")
+                chunk = file.read(chunk_size)
+                count_bytes("store.stream", read=len(chunk))
+                buffer = buffer[position:] + chunk
+                position = 0
+                eof = len(chunk) < chunk_size
+                continue
+
+            yield element
+            position = end
+            if position > chunk_size:
+                buffer = buffer[position:]
+                position = 0
+
+
+def stream_transactions(path):
+    """Yield Transaction records straight from a transactions.json file."""
+    for data in iter_json_array(path):
+        yield Transaction.from_dict(data)
+
+
+def filter_type(transactions, transaction_type):
+    return (t for t in transactions if t.type == transaction_type)
+
+
+def filter_category(transactions, category):
+    return (t for t in transactions if t.category == category)
+
+
+def filter_dates(transactions, start=None, end=None):
+    """Keep transactions dated within [start, end]; either bound may be None."""
+    start = start.toordinal() if start else None
+    end = end.toordinal() if end else None
+    for transaction in transactions:
+        if not transaction.date_ordinal:
+            continue
+        if start is not None and transaction.date_ordinal < start:
+            continue
+        if end is not None and transaction.date_ordinal > end:
+            continue
+        yield transaction
@@ -0,0 +1,70 @@
+"""Schedulers that decide when queued ledger changes are saved."""
+
+import threading
+from time import monotonic
+
+
+class WriteBehind:
+    """Calls ``flush`` on a daemon thread ``delay`` seconds after the last change.
+
+    ``schedule()`` is called after every change. Bursts of changes are saved
+    together, but never later than ``max_delay`` seconds after the first one,
+    which bounds how much a crash can lose. A failed flush leaves the changes
+    queued and is retried after another delay; the failure is kept in
+    ``error`` until a flush succeeds, so the caller can tell the user that
+    changes are piling up unsaved instead of finding out at exit.
+    """
+
+    def __init__(self, flush, delay, max_delay):
+        self._flush = flush
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self._condition = threading.Condition()
+        self._first = None # monotonic time of the oldest change not handed to flush yet
+        self._last = None
+        self._thread = None
+        self.error = None # why the last flush failed, None once one succeeds
+
+    def take_error(self):
+        """Return the last flush failure, once; None if there was none since the last call or success."""
+        error, self.error = self.error, None
+        return error
+
+    def schedule(self):
+        with self._condition:
+            now = monotonic()
+            if self._first is None:
+                self._first = now
+            self._last = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._first is None:
+                    self._condition.wait()
+                while True:
+                    remaining = min(self._last + self.delay, self._first + self.max_delay) - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._first = self._last = None
+
+            try:
+                self._flush()
+            except Exception as error:
+                # the changes are still queued, try again after another delay
+                self.error = error
+                self.schedule()
+            else:
+                self.error = None
+
+
+class DeferredFlush:
+    """Leaves queued changes alone; whoever installed it calls the store's ``flush()`` itself."""
+
+    def schedule(self):
+        pass
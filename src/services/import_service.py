@@ -0,0 +1,117 @@
+"""Module for bulk importing transactions from CSV bank statements."""
+
+import csv
+import time
+from datetime import datetime
+
+from src.models.transaction import add_transactions
+from src.utils.dates import DATE_FORMAT, validate_date
+from src.utils.settings import IMPORT_BATCH_SIZE
+
+DEFAULT_COLUMNS = {
+    "date": "date",
+    "amount": "amount",
+    "category": "category",
+    "remarks": "remarks",
+    "type": "type"
+}
+
+
+def parse_column_map(text):
+    """Parse "date=Posted,amount=Value" into a column mapping, filling the rest with defaults."""
+    columns = dict(DEFAULT_COLUMNS)
+    for pair in filter(None, (part.strip() for part in text.split(","))):
+        field, _, header = pair.partition("=")
+        if field.strip() not in DEFAULT_COLUMNS or not header.strip():
+            raise ValueError(f"Invalid column mapping: {pair}")
+        columns[field.strip()] = header.strip()
+    return columns
+
+
+def validate_row(row, columns, date_format, categories, default_type, date_cache):
+    """Return a (date, amount, category, remarks, type) tuple, or raise ValueError with the reason."""
+    transaction_type = (row.get(columns["type"]) or default_type).strip().lower()
+    if transaction_type not in categories:
+        raise ValueError(f"unknown type \"{transaction_type}\"")
+
+    amount = (row.get(columns["amount"]) or "").strip().replace(",", "")
+    if not amount.replace(".", "", 1).isdigit():
+        raise ValueError(f"invalid amount \"{amount}\"")
+
+    category = (row.get(columns["category"]) or "").strip()
+    if category not in categories[transaction_type]:
+        raise ValueError(f"unknown {transaction_type} category \"{category}\"")
+
+    raw_date = (row.get(columns["date"]) or "").strip()
+    date = date_cache.get(raw_date)
+    if date is None:
+        try:
+            # DD/MM/YYYY is checked like every other date the app reads; other formats are strptime formats
+            if date_format == DATE_FORMAT:
+                date = validate_date(raw_date)
+            else:
+                date = datetime.strptime(raw_date, date_format).strftime(DATE_FORMAT)
+        except ValueError:
+            raise ValueError(f"invalid date \"{raw_date}\"") from None
+        date_cache[raw_date] = date
+
+    return date, f"{float(amount):.2f}", category, (row.get(columns["remarks"]) or "").strip(), transaction_type
+
+
+def import_csv(path, categories, columns=None, date_format=DATE_FORMAT, default_type="expense",
+               batch_size=IMPORT_BATCH_SIZE):
+    """Stream a CSV file into the ledger, committing valid rows in batches.
+
+    ``categories`` is the {type: [names]} list rows are validated against.
+    Returns a summary dict with imported/skipped counts, the first errors and rows per second.
+    """
+    columns = columns or DEFAULT_COLUMNS
+    started = time.perf_counter()
+    imported = 0
+    skipped = 0
+    errors = []
+    date_cache = {}
+    batch = []
+
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.DictReader(file)
+        missing = [columns[field] for field in ("date", "amount", "category")
+                   if columns[field] not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV file is missing column(s): {', '.join(missing)}")
+
+        for line_number, row in enumerate(reader, start=2):
+            try:
+                batch.append(validate_row(row, columns, date_format, categories, default_type, date_cache))
+            except ValueError as error:
+                skipped += 1
+                if len(errors) < 10:
+                    errors.append(f"Line {line_number}: {error}")
+                continue
+
+            if len(batch) >= batch_size:
+                imported += add_transactions(batch)
+                batch = []
+
+    if batch:
+        imported += add_transactions(batch)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "skipped": skipped,
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_second": (imported + skipped) / elapsed if elapsed else 0.0
+    }
+
+
+def display_import_summary(summary):
+    """Display the outcome of a CSV import."""
+    print("\nImport Summary")
+    print("-----------------")
+    print(f"Imported: {summary['imported']}")
+    print(f"Skipped: {summary['skipped']}")
+    for error in summary["errors"]:
+        print(f"  {error}")
+    print(f"Time: {summary['seconds']:.2f}s ({summary['rows_per_second']:,.0f} rows/sec)")
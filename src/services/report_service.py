@@ -1,16 +1,27 @@
 """Module for handling report generation and display in the budget tracking application."""
 
-from src.models.transaction import get_total, view_filtered_transactions
+from src.models.transaction import get_totals, verify_totals, get_rollups, get_range_totals, ledger_in_memory
+from src.models.ledger_rollups import month_label, UNKNOWN_MONTH
+from src.utils.settings import PARALLEL_THRESHOLD
+
+def _use_shards():
+    """Large ledgers not read into memory yet are aggregated across monthly shards in worker processes.
+
+    Once the ledger is loaded the date index sums a range without touching the disk.
+    """
+    return not ledger_in_memory() and sum(get_totals().counts.values()) > PARALLEL_THRESHOLD
+
+def _aggregate_shards(start=None, end=None):
+    from src.services.shard_service import ensure_shards, prune_shards, aggregate_shards
+    return aggregate_shards(prune_shards(ensure_shards(), start, end), start, end)
 
 def get_financial_summary():
     """Calculate and return financial summary data."""
-    income = float(get_total("income"))
-    expenses = float(get_total("expense"))
-    balance = income - expenses
+    totals = get_totals()
     return {
-        "income": income,
-        "expenses": expenses,
-        "balance": balance
+        "income": totals.total("income"),
+        "expenses": totals.total("expense"),
+        "balance": totals.balance()
     }
 
 def display_financial_summary():
@@ -21,3 +32,88 @@ def display_financial_summary():
     print(f"Total Income: ${summary['income']:.2f}")
     print(f"Total Expenses: ${summary['expenses']:.2f}")
     print(f"Net Balance: ${summary['balance']:.2f}")
+
+def display_totals_check(rebuild=False):
+    """Recompute the running totals from the ledger and display any drift."""
+    drift = verify_totals(rebuild)
+    print("\nTotals Check")
+    print("-----------------")
+    if not drift:
+        print("Running totals match the ledger.")
+        return drift
+
+    for transaction_type, cents in drift.items():
+        print(f"{transaction_type.capitalize()} total is off by ${cents / 100:.2f}")
+    print("Totals rebuilt from the ledger." if rebuild else "Run the check again with rebuild to fix them.")
+    return drift
+
+def get_period_totals(start=None, end=None):
+    """Return {"income": amount, "expense": amount} for transactions dated within [start, end]."""
+    if _use_shards():
+        cents = _aggregate_shards(start, end)
+    else:
+        cents = get_range_totals(start, end).cents
+    return {transaction_type: cents.get(transaction_type, 0) / 100 for transaction_type in ("income", "expense")}
+
+def get_category_breakdown(transaction_type="expense"):
+    """Return (category, amount) pairs for one transaction type, largest first."""
+    sums = get_rollups().sum_by_category(transaction_type)
+    return [(category, cents / 100) for category, cents in sorted(sums.items(), key=lambda item: -item[1])]
+
+def get_monthly_breakdown():
+    """Return per-month income, expenses and balance, oldest month first."""
+    months = get_rollups().sum_by_month()
+    return [{
+        "month": month_label(key),
+        "income": sums["income"] / 100,
+        "expenses": sums["expense"] / 100,
+        "balance": (sums["income"] - sums["expense"]) / 100
+    } for key, sums in sorted(months.items(), key=lambda item: (item[0] == UNKNOWN_MONTH, item[0]))]
+
+def get_category_month_pivot(transaction_type="expense"):
+    """Return (categories, months, rows of amounts) for a category x month table."""
+    categories, month_keys, rows = get_rollups().pivot(transaction_type)
+    return categories, [month_label(key) for key in month_keys], [[cents / 100 for cents in row] for row in rows]
+
+def display_category_breakdown(transaction_type="expense"):
+    """Display totals per category for one transaction type."""
+    breakdown = get_category_breakdown(transaction_type)
+    print(f"\n{transaction_type.capitalize()} by Category")
+    print("-----------------")
+    if not breakdown:
+        print(f"No {transaction_type} transactions found.")
+        return breakdown
+
+    width = max(len(category) for category, _ in breakdown)
+    for category, amount in breakdown:
+        print(f"{category:<{width}}  {amount:>12.2f}")
+    return breakdown
+
+def display_monthly_breakdown():
+    """Display income, expenses and balance per month."""
+    breakdown = get_monthly_breakdown()
+    print("\nMonthly Breakdown")
+    print("-----------------")
+    if not breakdown:
+        print("No transactions found.")
+        return breakdown
+
+    print(f"{'Month':<8}  {'Income':>12}  {'Expenses':>12}  {'Balance':>12}")
+    for row in breakdown:
+        print(f"{row['month']:<8}  {row['income']:>12.2f}  {row['expenses']:>12.2f}  {row['balance']:>12.2f}")
+    return breakdown
+
+def display_category_month_pivot(transaction_type="expense"):
+    """Display a category x month table for one transaction type."""
+    categories, months, rows = get_category_month_pivot(transaction_type)
+    print(f"\n{transaction_type.capitalize()} by Category and Month")
+    print("-----------------")
+    if not categories:
+        print(f"No {transaction_type} transactions found.")
+        return categories, months, rows
+
+    width = max(len(category) for category in categories)
+    print(f"{'Category':<{width}}" + "".join(f"  {month:>10}" for month in months))
+    for category, row in zip(categories, rows):
+        print(f"{category:<{width}}" + "".join(f"  {amount:>10.2f}" for amount in row))
+    return categories, months, rows
@@ -0,0 +1,112 @@
+"""Module for splitting the ledger into monthly shards and aggregating them in parallel."""
+
+import os
+import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils.settings import SHARD_DIR, SHARD_WORKERS
+from src.utils.file_lock import atomic_write
+from src.models.transaction import load_transactions, get_ledger_signature
+
+MANIFEST = "manifest.json"
+UNKNOWN_SHARD = "unknown"
+# bumped when the row layout changes so shards cut by an older version are re-cut
+SHARD_VERSION = 4
+
+
+def _shard_name(transaction):
+    value = transaction.date_value
+    return f"{value.year:04d}-{value.month:02d}" if value else UNKNOWN_SHARD
+
+
+def write_shards(transactions, signature, shard_dir=SHARD_DIR):
+    """Split transactions into one file per month and record the ledger signature they were cut from.
+
+    Shard rows are compact [date ordinal, cents, type] lists, only what a range total
+    needs, so workers can reduce them without re-parsing amounts or dates. The manifest keeps
+    a CRC of every shard, and only the months whose rows changed are written again.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = {}
+    for transaction in transactions:
+        shards.setdefault(_shard_name(transaction), []).append(
+            [transaction.date_ordinal, transaction.cents, transaction.type])
+
+    manifest = read_manifest(shard_dir)
+    previous = manifest["shards"] if manifest is not None and manifest.get("version") == SHARD_VERSION else {}
+
+    for name in os.listdir(shard_dir):
+        if name.endswith(".json") and name != MANIFEST and name[:-5] not in shards:
+            os.remove(os.path.join(shard_dir, name))
+
+    checksums = {}
+    for name, rows in shards.items():
+        data = json.dumps(rows, separators=(",", ":")).encode('utf-8')
+        checksums[name] = zlib.crc32(data)
+        path = os.path.join(shard_dir, f"{name}.json")
+        if previous.get(name) != checksums[name] or not os.path.exists(path):
+            with atomic_write(path, encoding=None) as file:
+                file.write(data)
+
+    with atomic_write(os.path.join(shard_dir, MANIFEST)) as file:
+        json.dump({"version": SHARD_VERSION, "signature": signature, "shards": checksums}, file)
+    return sorted(shards)
+
+
+def read_manifest(shard_dir=SHARD_DIR):
+    try:
+        with open(os.path.join(shard_dir, MANIFEST), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def ensure_shards(shard_dir=SHARD_DIR):
+    """Return the shard names, re-cutting them first if the ledger changed since they were written."""
+    signature = get_ledger_signature()
+    manifest = read_manifest(shard_dir)
+    if manifest is not None and manifest.get("version") == SHARD_VERSION and manifest["signature"] == signature:
+        return sorted(manifest["shards"])
+    return write_shards(load_transactions(), signature, shard_dir)
+
+
+def prune_shards(names, start=None, end=None):
+    """Keep only the monthly shards that can contain dates within [start, end]."""
+    if start is None and end is None:
+        return list(names)
+
+    first = f"{start.year:04d}-{start.month:02d}" if start else None
+    last = f"{end.year:04d}-{end.month:02d}" if end else None
+    return [name for name in names
+            if name != UNKNOWN_SHARD and (first is None or name >= first) and (last is None or name <= last)]
+
+
+def _reduce_shard(path, start_ordinal, end_ordinal):
+    """Worker: sum cents per type for one shard."""
+    with open(path, 'r', encoding='utf-8') as file:
+        rows = json.load(file)
+
+    totals = {}
+    for ordinal, cents, transaction_type in rows:
+        if (start_ordinal and ordinal < start_ordinal) or (end_ordinal and ordinal > end_ordinal):
+            continue
+        totals[transaction_type] = totals.get(transaction_type, 0) + cents
+    return totals
+
+
+def aggregate_shards(names, start=None, end=None, shard_dir=SHARD_DIR, workers=SHARD_WORKERS):
+    """Reduce each shard in a worker process and merge the partial sums into {type: cents} in the parent."""
+    start_ordinal = start.toordinal() if start else 0
+    end_ordinal = end.toordinal() if end else 0
+    paths = [os.path.join(shard_dir, f"{name}.json") for name in names]
+
+    merged = {}
+    if not paths:
+        return merged
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for totals in executor.map(_reduce_shard, paths, [start_ordinal] * len(paths), [end_ordinal] * len(paths)):
+            for transaction_type, cents in totals.items():
+                merged[transaction_type] = merged.get(transaction_type, 0) + cents
+    return merged
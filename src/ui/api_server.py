@@ -0,0 +1,473 @@
+"""Local HTTP/JSON API over the shared in-memory ledger, built on asyncio streams.
+
+Endpoints (request and response bodies are JSON):
+
+    GET    /transactions             ?type= &category= &from= &to= &offset= &limit=
+    POST   /transactions             {"date", "amount", "category", "remarks", "type"}
+    GET    /transactions/<id>
+    PATCH  /transactions/<id>        the fields to change (PUT is accepted too)
+    DELETE /transactions/<id>
+    POST   /batch                    [operations as for main.py --batch], one commit
+    GET    /summary                  ?from= &to=
+    GET    /reports/<categories|monthly|pivot>   ?type=
+    GET    /search                   ?q= &limit=
+    GET    /categories               ?type=
+
+Dates are DD/MM/YYYY. Errors come back as {"error": message} with a 4xx or
+5xx status. A write that was applied but could not be saved yet is answered
+202 Accepted with its usual body; it stays applied and saving is retried with
+the next write and at shutdown.
+"""
+
+import sys
+import json
+import signal
+import asyncio
+import threading
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs
+
+from src.ui.cli import CommandError, NotFoundError, apply_operation
+from src.utils.dates import parse_date
+from src.utils.settings import API_HOST, API_PORT
+from src.models.category_registry import get_category_registry
+from src.models.ledger_totals import TRANSACTION_TYPES
+
+MAX_BODY_BYTES = 1 << 24
+READ_THREADS = 4
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _query_value(query, name, choices=None):
+    value = query.get(name, [None])[0]
+    if value is not None and choices is not None and value not in choices:
+        raise HttpError(400, f"{name} must be one of {', '.join(choices)}")
+    return value
+
+
+def _query_int(query, name):
+    value = _query_value(query, name)
+    if value is None:
+        return None
+    if not value.isdigit():
+        raise HttpError(400, f"{name} must be a non-negative integer")
+    return int(value)
+
+
+def _query_date(query, name):
+    value = _query_value(query, name)
+    if value is None:
+        return None
+    try:
+        return parse_date(value)
+    except ValueError as error:
+        raise HttpError(400, str(error)) from None
+
+
+def _json_body(body):
+    try:
+        return json.loads(body or b"null")
+    except ValueError:
+        raise HttpError(400, "request body is not valid JSON") from None
+
+
+def _records_json(transactions):
+    return [transaction.to_dict() for transaction in transactions]
+
+
+class _LedgerLock:
+    """Readers-writer lock over the in-memory ledger.
+
+    Any number of reads hold it together; a write waits for them and then
+    holds it alone. A waiting write goes ahead of reads that arrive after it,
+    so a steady stream of reads cannot keep writes out.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+def _search_json(found):
+    transactions, count = found
+    return {"count": count, "transactions": _records_json(transactions)}
+
+
+def _object_body(body):
+    document = _json_body(body)
+    if not isinstance(document, dict):
+        raise HttpError(400, "expected a JSON object")
+    return document
+
+
+class ApiServer:
+    """Serves the ledger held by this process to local tools.
+
+    Everything is answered from the in-memory store, so nothing is re-parsed
+    per request. Writes are queued to a single writer task, which applies
+    every write waiting at that moment as one group commit on the ledger
+    thread and then saves it on a worker thread; each write is answered once
+    it is on disk, or with 202 if it is applied but saving failed.
+
+    Lookups that take constant time (a transaction by id, the running
+    totals, the categories) are answered on the event loop unless a write is
+    being applied. Reads that may walk much of the ledger (listings, date
+    ranges, reports, searches) run on a pool of reader threads under the
+    shared side of the ledger lock, which the writer takes exclusively only
+    while it applies a commit, so reads run side by side and never see a
+    write half applied. Records are replaced rather than changed in place,
+    so listings pick their rows under the lock and turn them into JSON after
+    letting it go; a long listing holds up writes only while it picks rows.
+    """
+
+    def __init__(self):
+        self._writes = None
+        self._writer = None
+        self._server = None
+        self._connections = set()
+        # the one thread that changes the ledger, and the threads that reads too expensive for the loop run on
+        self._ledger = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger")
+        self._readers = ThreadPoolExecutor(max_workers=READ_THREADS, thread_name_prefix="reader")
+        self._lock = _LedgerLock()
+        self._applying = False
+
+    async def start(self, host=API_HOST, port=API_PORT):
+        """Load the ledger, start listening and return the bound (host, port)."""
+        from src.models.transaction import defer_writes, load_transactions, get_search_index
+        defer_writes()
+        # parse once up front rather than on the event loop under the first requests
+        load_transactions()
+        get_search_index()
+        self._writes = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stop accepting requests, answer the writes already queued and save them."""
+        from src.models.transaction import flush_transactions
+        self._server.close()
+        for connection in list(self._connections):
+            connection.close()
+        await self._writes.join()
+        self._writer.cancel()
+        self._ledger.shutdown()
+        self._readers.shutdown()
+        flush_transactions()
+
+    async def _write_loop(self):
+        from src.models.transaction import flush_transactions
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self._writes.get()]
+            while not self._writes.empty():
+                requests.append(self._writes.get_nowait())
+            try:
+                # the SQLite and binary stores commit inside the batch, so it runs off the loop as well
+                self._applying = True
+                try:
+                    outcomes = await loop.run_in_executor(
+                        self._ledger, self._apply_all, [operations for operations, _ in requests])
+                finally:
+                    self._applying = False
+            except Exception as error:
+                # the commit itself failed, so none of it was applied
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(error)
+                for _ in requests:
+                    self._writes.task_done()
+                continue
+
+            try:
+                # saving only reads the ledger, so reads carry on meanwhile
+                await loop.run_in_executor(None, flush_transactions)
+                saved = True
+            except Exception as error:
+                # the writes are applied and stay queued for saving, so they are not reported as failed
+                print(f"Could not save the latest changes, retrying with the next write: {error}", file=sys.stderr)
+                saved = False
+            for (_, future), outcome in zip(requests, outcomes):
+                if not future.done():
+                    future.set_result((outcome, saved))
+            for _ in requests:
+                self._writes.task_done()
+
+    def _apply_all(self, requests):
+        """Apply the operations of every request as one group commit and return their outcomes per request."""
+        from src.models.transaction import transaction_batch
+        date_cache = {}
+        with self._lock.exclusive(), transaction_batch():
+            return [[self._apply(operation, date_cache) for operation in operations] for operations in requests]
+
+    @staticmethod
+    def _apply(operation, date_cache):
+        """Return the operation's result document, or the exception it raised."""
+        try:
+            if not isinstance(operation, dict):
+                raise CommandError("expected a JSON object")
+            return apply_operation(operation, date_cache)
+        except Exception as error:
+            return error
+
+    async def _write(self, operations):
+        """Queue operations for the writer task and return (their outcomes, whether they were saved)."""
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operations, future))
+        return await future
+
+    async def _read(self, read, *args, render=None):
+        """Run a read that may walk much of the ledger on a reader thread; ``render`` runs after the lock is let go."""
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._shared, read, args, render)
+
+    def _shared(self, read, args, render):
+        with self._lock.shared():
+            result = read(*args)
+        return result if render is None else render(result)
+
+    async def _lookup(self, read, *args):
+        """Answer a constant-time read on the event loop, or after the write being applied."""
+        if self._applying:
+            return await self._read(read, *args)
+        return read(*args)
+
+    async def _write_one(self, operation, status=200):
+        outcomes, saved = await self._write([operation])
+        outcome = outcomes[0]
+        if isinstance(outcome, NotFoundError):
+            raise HttpError(404, str(outcome))
+        if isinstance(outcome, CommandError):
+            raise HttpError(400, str(outcome))
+        if isinstance(outcome, Exception):
+            raise outcome
+        return status if saved else 202, outcome
+
+    async def _write_batch(self, body):
+        operations = _json_body(body)
+        if not isinstance(operations, list):
+            raise HttpError(400, "expected a JSON array of operations")
+        results, errors = [], []
+        outcomes, saved = await self._write(operations)
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, CommandError):
+                errors.append({"index": index, "error": str(outcome)})
+            elif isinstance(outcome, Exception):
+                raise outcome
+            else:
+                results.append(outcome)
+        return 200 if saved else 202, {"applied": len(results), "errors": errors, "results": results}
+
+    def _list(self, query):
+        from src.models.transaction import iter_transactions
+        transactions = iter_transactions(_query_value(query, "type", TRANSACTION_TYPES),
+                                         _query_value(query, "category"),
+                                         _query_date(query, "from"), _query_date(query, "to"))
+        offset = _query_int(query, "offset") or 0
+        limit = _query_int(query, "limit")
+        return list(islice(transactions, offset, None if limit is None else offset + limit))
+
+    def _get(self, transaction_id):
+        from src.models.transaction import get_transaction
+        transaction = get_transaction(transaction_id)
+        if transaction is None:
+            raise HttpError(404, f"transaction {transaction_id} not found")
+        return transaction.to_dict()
+
+    async def _summary(self, query):
+        from src.services.report_service import get_financial_summary
+        from src.models.transaction import get_range_totals
+        start, end = _query_date(query, "from"), _query_date(query, "to")
+        if start is None and end is None:
+            return await self._lookup(get_financial_summary)
+        # the ledger is in memory, so a range is summed through the date index rather than the shards
+        totals = await self._read(get_range_totals, start, end)
+        return {"income": totals.total("income"), "expenses": totals.total("expense"), "balance": totals.balance()}
+
+    def _report(self, name, query):
+        from src.services import report_service
+        transaction_type = _query_value(query, "type", TRANSACTION_TYPES) or "expense"
+        if name == "categories":
+            return [{"category": category, "amount": amount}
+                    for category, amount in report_service.get_category_breakdown(transaction_type)]
+        if name == "monthly":
+            return report_service.get_monthly_breakdown()
+        categories, months, rows = report_service.get_category_month_pivot(transaction_type)
+        return {"categories": categories, "months": months, "amounts": rows}
+
+    def _search(self, query):
+        from src.models.transaction import search_transactions
+        text = _query_value(query, "q")
+        if not text:
+            raise HttpError(400, "q is required")
+        return search_transactions(text, _query_int(query, "limit"))
+
+    def _categories(self, query):
+        categories = get_category_registry().categories
+        transaction_type = _query_value(query, "type", TRANSACTION_TYPES)
+        return categories[transaction_type] if transaction_type else categories
+
+    async def _dispatch(self, method, target, body):
+        """Route one request and return (status, document)."""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+        allowed = ()
+
+        if parts == ["transactions"]:
+            allowed = ("GET", "POST")
+            if method == "GET":
+                return 200, await self._read(self._list, query, render=_records_json)
+            if method == "POST":
+                return await self._write_one({**_object_body(body), "op": "add"}, 201)
+        elif len(parts) == 2 and parts[0] == "transactions" and parts[1].isdigit():
+            allowed = ("GET", "PATCH", "PUT", "DELETE")
+            if method == "GET":
+                return 200, await self._lookup(self._get, int(parts[1]))
+            if method in ("PATCH", "PUT"):
+                return await self._write_one({**_object_body(body), "op": "update", "id": int(parts[1])})
+            if method == "DELETE":
+                return await self._write_one({"op": "delete", "id": int(parts[1])})
+        elif parts == ["batch"]:
+            allowed = ("POST",)
+            if method == "POST":
+                return await self._write_batch(body)
+        elif len(parts) == 2 and parts[0] == "reports" and parts[1] in ("categories", "monthly", "pivot"):
+            allowed = ("GET",)
+            if method == "GET":
+                return 200, await self._read(self._report, parts[1], query)
+        elif parts == ["summary"]:
+            allowed = ("GET",)
+            if method == "GET":
+                return 200, await self._summary(query)
+        elif parts == ["search"]:
+            allowed = ("GET",)
+            if method == "GET":
+                return 200, await self._read(self._search, query, render=_search_json)
+        elif parts == ["categories"]:
+            allowed = ("GET",)
+            if method == "GET":
+                return 200, self._categories(query)
+
+        if allowed:
+            raise HttpError(405, f"{method} is not allowed on {url.path}, use {', '.join(allowed)}")
+        raise HttpError(404, f"no endpoint at {url.path}")
+
+    async def _serve_connection(self, reader, writer):
+        """Answer requests on one keep-alive connection until the client closes it."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = headers.get("content-length", "0")
+                if not length.isdigit() or int(length) > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "missing or oversized request body"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(int(length))
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                try:
+                    status, document = await self._dispatch(method.upper(), target, body)
+                except HttpError as error:
+                    status, document = error.status, {"error": str(error)}
+                except Exception as error:
+                    traceback.print_exc()
+                    status, document = 500, {"error": str(error) or type(error).__name__}
+                await self._respond(writer, status, document, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, document, keep_alive=True):
+        payload = json.dumps(document).encode('utf-8')
+        connection = "" if keep_alive else "Connection: close\r\n"
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"{connection}\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+
+def run_server(host=API_HOST, port=API_PORT):
+    """Serve until SIGINT or SIGTERM, then save any queued writes and return."""
+    async def serve():
+        server = ApiServer()
+        bound_host, bound_port = await server.start(host, port)
+        print(json.dumps({"listening": f"http://{bound_host}:{bound_port}"}), flush=True)
+
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for stop_signal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(stop_signal, stopped.set)
+            except (NotImplementedError, RuntimeError):
+                # no signal handlers on Windows event loops, Ctrl-C interrupts asyncio.run instead
+                pass
+        await stopped.wait()
+        await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Server stopped.", file=sys.stderr)
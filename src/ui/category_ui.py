@@ -1,135 +1,148 @@
-import json
-import os
 import time
-from src.utils.settings import CATEGORIES_FILE, IDLE_TIME
+from src.utils.settings import IDLE_TIME
+from src.models.category_registry import get_category_registry
 
 class CategoryUI:
     def __init__(self, display_manager):
         self.display = display_manager
-        self.CATEGORIES_FILE = CATEGORIES_FILE
-        print(f"File path: {self.CATEGORIES_FILE}")
-        self._load_categories()
+        self.registry = get_category_registry()
 
-    def _load_categories(self):
-        if not os.path.exists(self.CATEGORIES_FILE):
-            self._save_categories({"expense": [], "income": []})
-        with open(self.CATEGORIES_FILE, "r", encoding='utf-8') as file:
-            self.categories = json.load(file)
-
-    def _save_categories(self, categories):
-        with open(self.CATEGORIES_FILE, "w", encoding='utf-8') as file:
-            json.dump(categories, file, indent=4)
+    @property
+    def categories(self):
+        return self.registry.categories
 
     def get_category_list(self, category_type):
-        return self.categories[category_type]
+        return self.registry.get_category_list(category_type)
 
     def add_category_ui(self, category_type="expense"):
         """Handle UI for adding a category."""
-        self.display.clear()
-        print(f"Add {category_type} Category")
-        print("----------------------")
+        while True:
+            self.display.clear()
+            print(f"Add {category_type} Category")
+            print("----------------------")
 
-        category_list = self.categories[category_type]
+            category_list = self.categories[category_type]
 
-        # Display existing categories
-        print(f"Existing {category_type} categories:")
-        for category in category_list:
-            print(f"- {category}")
-        print("")
+            # Display existing categories
+            print(f"Existing {category_type} categories:")
+            for category in category_list:
+                print(f"- {category}")
+            print("")
 
-        category_name = input(f"Enter the {category_type} category name (type \"cancel\" to go back): ")
+            category_name = input(f"Enter the {category_type} category name (type \"cancel\" to go back): ")
 
-        # Validate input
-        if not self._validate_category_name(category_type, category_name):
-            return self.add_category_ui(category_type)
+            # Validate input
+            if not self._validate_category_name(category_type, category_name):
+                continue
 
-        # Check if the user wants to cancel the operation
-        if category_name in ["cancel"]:
-            return "manage_categories"
+            # Check if the user wants to cancel the operation
+            if category_name in ["cancel"]:
+                return "manage_categories"
 
-        category_list.append(category_name)
-        self._save_categories(self.categories)
+            self.registry.add(category_type, category_name)
 
-        print(f"\n{category_name} added to {category_type} categories.")
+            print(f"\n{category_name} added to {category_type} categories.")
 
-        input("\nPress Enter to continue...")
-        return "manage_categories"
+            input("\nPress Enter to continue...")
+            return "manage_categories"
 
     def edit_category_ui(self, category_type="expense"):
         """Handle UI for editing a category."""
-        self.display.clear()
-        print(f"Edit {category_type.capitalize()} Category")
-        print("----------------------")
+        while True:
+            self.display.clear()
+            print(f"Edit {category_type.capitalize()} Category")
+            print("----------------------")
 
-        category_list = self.categories[category_type]
+            entries = self.registry.entries(category_type)
+            category_list = [name for _, name in entries]
 
-        # Check if there are any existing categories to edit.
-        if not category_list:
-            print(f"No {category_type} categories exist!.")
-            input("\nPress Enter to continue...")
-            return "manage_categories"
+            # Check if there are any existing categories to edit.
+            if not category_list:
+                print(f"No {category_type} categories exist!.")
+                input("\nPress Enter to continue...")
+                return "manage_categories"
 
-        self.display.show_category_menu(category_list)
-        edit_choice = input(f"Enter the number of the category to edit (1-{len(category_list) + 1}): ")
+            self.display.show_category_menu(category_list)
+            edit_choice = input(f"Enter the number of the category to edit (1-{len(category_list) + 1}): ")
 
-        # Validate input
-        if not self._validate_category_index(category_list, edit_choice):
-            return self.edit_category_ui(category_type)
+            # Validate input
+            if not self._validate_category_index(category_list, edit_choice):
+                continue
 
-        # Check if user wants to go back
-        if int(edit_choice) == len(category_list) + 1:
-            return "manage_categories"
+            # Check if user wants to go back
+            if int(edit_choice) == len(category_list) + 1:
+                return "manage_categories"
 
-        new_category_name = input(f"Enter the new {category_type} category name for \"{category_list[int(edit_choice) - 1]}\". (type \"cancel\" to go back): ")
+            new_category_name = input(f"Enter the new {category_type} category name for \"{category_list[int(edit_choice) - 1]}\". (type \"cancel\" to go back): ")
 
-        # Validate input
-        if not self._validate_category_name(edit_choice, category_type, new_category_name):
-            return self.edit_category_ui(category_type)
+            # Validate input
+            if not self._validate_category_name(category_type, new_category_name, edit_choice):
+                continue
 
-        # Get the old category name for feedback
-        old_category_name = category_list[int(edit_choice) - 1]
-        category_list[int(edit_choice) - 1] = new_category_name
-        self._save_categories(self.categories)
+            # Get the old category name for feedback
+            category_id, old_category_name = entries[int(edit_choice) - 1]
+            self.registry.rename(category_id, new_category_name)
 
-        print(f"\nCategory updated successfully!")
-        print(f"{old_category_name} updated to {new_category_name} in {category_type} categories.")
+            print(f"\nCategory updated successfully!")
+            print(f"{old_category_name} updated to {new_category_name} in {category_type} categories.")
 
-        input("\nPress Enter to continue...")
-        return "manage_categories"
+            input("\nPress Enter to continue...")
+            return "manage_categories"
 
     def delete_category_ui(self, category_type="expense"):
         """Handle UI for deleting a category."""
-        self.display.clear()
-        print(f"Delete {category_type.capitalize()} Category")
-        print("----------------------")
-
-        category_list = self.categories[category_type]
-
-        # Check if there are any existing categories to delete.
-        if not self.categories[category_type]:
-            print(f"No {category_type} categories exist!.")
+        while True:
+            self.display.clear()
+            print(f"Delete {category_type.capitalize()} Category")
+            print("----------------------")
+
+            entries = self.registry.entries(category_type)
+            category_list = [name for _, name in entries]
+
+            # Check if there are any existing categories to delete.
+            if not self.categories[category_type]:
+                print(f"No {category_type} categories exist!.")
+                input("\nPress Enter to continue...")
+                return "manage_categories"
+
+            self.display.show_category_menu(category_list)
+            delete_choice = input(f"Enter the number of the category to delete (1-{len(category_list) + 1}): ")
+
+            # Input validation
+            if not self._validate_category_index(category_list, delete_choice):
+                continue
+
+            # Check if user wants to go back
+            if int(delete_choice) == len(category_list) + 1:
+                return "manage_categories"
+
+            # Get the category name for feedback
+            category_id, category_name = entries[int(delete_choice) - 1]
+            others = [entry for entry in entries if entry[0] != category_id]
+            reassign_to = self._choose_reassignment(category_name, others)
+            self.registry.remove(category_id, reassign_to)
+
+            print(f"\nCategory deleted successfully!")
+            print(f"{category_name} removed from {category_type} categories.")
+            if reassign_to is not None:
+                print(f"Its transactions now belong to {dict(others)[reassign_to]}.")
             input("\nPress Enter to continue...")
             return "manage_categories"
 
-        self.display.show_category_menu(category_list)
-        delete_choice = input(f"Enter the number of the category to delete (1-{len(category_list) + 1}): ")
-
-        # Input validation
-        if not self._validate_category_index(category_list, delete_choice):
-            return self.delete_category_ui(category_type)
-
-        # Check if user wants to go back
-        if int(delete_choice) == len(category_list) + 1:
-            return "manage_categories"
-
-        # Get the category name for feedback
-        category_name = category_list.pop(int(delete_choice) - 1)
-        self._save_categories(self.categories)
-
-        print(f"\nCategory deleted successfully!")
-        print(f"{category_name} removed from {category_type} categories.")
-        input("\nPress Enter to continue...")
-        return "manage_categories"
+    def _choose_reassignment(self, category_name, others):
+        """Ask which category takes over the transactions of a deleted one; None keeps them under the old name."""
+        if not others:
+            return None
+        print(f"\nMove the transactions of {category_name} to:")
+        for index, (_, name) in enumerate(others, start=1):
+            print(f"{index}. {name}")
+        while True:
+            choice = input(f"Enter a number (1-{len(others)}), or leave blank to keep them as {category_name}: ")
+            if not choice:
+                return None
+            if choice.isdigit() and 1 <= int(choice) <= len(others):
+                return others[int(choice) - 1][0]
+            print("Invalid choice. Please try again.")
 
     def view_category_ui(self):
         """List out the categories for expense & income"""
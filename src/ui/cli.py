@@ -0,0 +1,242 @@
+"""Headless command-line interface: scripted access to the model layer with JSON output.
+
+No screen clears, pauses or prompts; every command writes one JSON document
+to stdout and exits non-zero on a validation error.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from src.utils.dates import DATE_FORMAT, parse_date
+from src.utils.settings import API_HOST, API_PORT
+from src.services.import_service import DEFAULT_COLUMNS, validate_row
+from src.models.category_registry import get_category_registry
+
+
+class CommandError(Exception):
+    """A command could not be carried out; the message is reported as JSON."""
+
+
+class NotFoundError(CommandError):
+    """The transaction a command refers to does not exist."""
+
+
+def _date_argument(text):
+    try:
+        return parse_date(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
+def _validated(fields, date_cache):
+    """Validate add/update fields the same way CSV rows are, returning (date, amount, category, remarks, type)."""
+    row = {field: "" if fields.get(field) is None else str(fields[field]) for field in DEFAULT_COLUMNS}
+    try:
+        return validate_row(row, DEFAULT_COLUMNS, DATE_FORMAT, get_category_registry().categories,
+                            "expense", date_cache)
+    except ValueError as error:
+        raise CommandError(str(error)) from None
+
+
+def _write(document):
+    json.dump(document, sys.stdout)
+    sys.stdout.write("\n")
+
+
+def command_add(args):
+    from src.models.transaction import add_transaction
+    date, amount, category, remarks, transaction_type = _validated(vars(args), {})
+    _write(add_transaction(date, amount, category, remarks, transaction_type).to_dict())
+
+
+def command_list(args):
+    """Stream matching transactions as a JSON array without building the whole list first."""
+    from itertools import islice
+    from src.models.transaction import iter_transactions
+    transactions = iter_transactions(args.type, args.category, args.start, args.end)
+    if args.limit is not None:
+        transactions = islice(transactions, args.limit)
+
+    separator = "["
+    for transaction in transactions:
+        sys.stdout.write(separator + json.dumps(transaction.to_dict()))
+        separator = ","
+    sys.stdout.write("[]\n" if separator == "[" else "]\n")
+
+
+def command_summary(args):
+    from src.services.report_service import get_financial_summary, get_period_totals
+    if args.start is None and args.end is None:
+        _write(get_financial_summary())
+        return
+    totals = get_period_totals(args.start, args.end)
+    _write({"income": totals["income"], "expenses": totals["expense"],
+            "balance": round(totals["income"] - totals["expense"], 2)})
+
+
+def command_report(args):
+    from src.services import report_service
+    if args.name == "categories":
+        _write([{"category": category, "amount": amount}
+                for category, amount in report_service.get_category_breakdown(args.type)])
+    elif args.name == "monthly":
+        _write(report_service.get_monthly_breakdown())
+    else:
+        categories, months, rows = report_service.get_category_month_pivot(args.type)
+        _write({"categories": categories, "months": months, "amounts": rows})
+
+
+def command_search(args):
+    from src.models.transaction import search_transactions
+    transactions, count = search_transactions(args.query, args.limit)
+    _write({"count": count, "transactions": [t.to_dict() for t in transactions]})
+
+
+def command_categories(args):
+    categories = get_category_registry().categories
+    _write(categories[args.type] if args.type else categories)
+
+
+def command_convert(args):
+    """Convert between transactions.json and the binary ledger; the configured backend is not opened."""
+    from src.models.binary_store import json_to_binary, binary_to_json
+    from src.utils.settings import DATA_FILE, BINARY_FILE, BINARY_META_FILE
+    source, target = (DATA_FILE, BINARY_FILE) if args.to == "binary" else (BINARY_FILE, DATA_FILE)
+    if not os.path.exists(source):
+        raise CommandError(f"{source} not found")
+    if args.to == "binary":
+        count = json_to_binary(DATA_FILE, BINARY_FILE, BINARY_META_FILE)
+    else:
+        count = binary_to_json(BINARY_FILE, DATA_FILE)
+    _write({"from": source, "to": target, "transactions": count})
+
+
+def command_serve(args):
+    from src.ui.api_server import run_server
+    run_server(args.host, args.port)
+
+
+def apply_operation(operation, date_cache):
+    """Apply one add/update/delete operation (see run_batch) and return its result document."""
+    from src.models.transaction import add_transaction, update_transaction, delete_transaction, get_transaction
+    op = operation.get("op")
+    if op == "add":
+        date, amount, category, remarks, transaction_type = _validated(operation, date_cache)
+        return add_transaction(date, amount, category, remarks, transaction_type).to_dict()
+
+    if op in ("update", "delete"):
+        transaction = get_transaction(operation.get("id", 0)) if str(operation.get("id", "")).isdigit() else None
+        if transaction is None:
+            raise NotFoundError(f"transaction {operation.get('id')} not found")
+        if op == "delete":
+            return delete_transaction(transaction.id).to_dict()
+
+        # the type of an existing transaction cannot change
+        fields = {**transaction.to_dict(), **operation, "type": transaction.type}
+        date, amount, category, remarks, _ = _validated(fields, date_cache)
+        return update_transaction(transaction.id, amount, category, date, remarks).to_dict()
+
+    raise CommandError(f"unknown op \"{op}\"")
+
+
+def run_batch(lines):
+    """Apply JSON-lines operations from ``lines`` as one group commit.
+
+    Each line is an object such as {"op": "add", "date": ..., "amount": ...,
+    "category": ..., "remarks": ..., "type": ...}, {"op": "update", "id": ...,
+    <fields to change>} or {"op": "delete", "id": ...}. Invalid lines are
+    reported and skipped; the rest are loaded and persisted once.
+    """
+    from src.models.transaction import transaction_batch
+    results = []
+    errors = []
+    date_cache = {}
+    with transaction_batch():
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                operation = json.loads(line)
+                if not isinstance(operation, dict):
+                    raise CommandError("expected a JSON object")
+                results.append(apply_operation(operation, date_cache))
+            except (CommandError, json.JSONDecodeError) as error:
+                errors.append({"line": line_number, "error": str(error)})
+
+    _write({"applied": len(results), "errors": errors, "results": results})
+    return 1 if errors else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Budget tracker. Run without arguments for the menus.")
+    parser.add_argument("--batch", action="store_true",
+                        help="read JSON-lines add/update/delete operations from stdin and apply them in one commit")
+    commands = parser.add_subparsers(dest="command")
+
+    add = commands.add_parser("add", help="add a transaction")
+    add.add_argument("--type", default="expense", choices=["expense", "income"])
+    add.add_argument("--amount", required=True)
+    add.add_argument("--date", required=True, help="DD/MM/YYYY")
+    add.add_argument("--category", required=True)
+    add.add_argument("--remarks", default="")
+    add.set_defaults(handler=command_add)
+
+    listing = commands.add_parser("list", help="list transactions as a JSON array")
+    listing.add_argument("--type", choices=["expense", "income"])
+    listing.add_argument("--category")
+    listing.add_argument("--from", dest="start", type=_date_argument, help="DD/MM/YYYY")
+    listing.add_argument("--to", dest="end", type=_date_argument, help="DD/MM/YYYY")
+    listing.add_argument("--limit", type=int)
+    listing.set_defaults(handler=command_list)
+
+    summary = commands.add_parser("summary", help="income, expenses and balance, optionally for a date range")
+    summary.add_argument("--from", dest="start", type=_date_argument, help="DD/MM/YYYY")
+    summary.add_argument("--to", dest="end", type=_date_argument, help="DD/MM/YYYY")
+    summary.set_defaults(handler=command_summary)
+
+    report = commands.add_parser("report", help="category, monthly or category x month report")
+    report.add_argument("name", choices=["categories", "monthly", "pivot"])
+    report.add_argument("--type", default="expense", choices=["expense", "income"])
+    report.set_defaults(handler=command_report)
+
+    search = commands.add_parser("search", help="search remarks and categories")
+    search.add_argument("query", help="words to match; OR separates alternatives, a trailing * matches a prefix")
+    search.add_argument("--limit", type=int)
+    search.set_defaults(handler=command_search)
+
+    categories = commands.add_parser("categories", help="list categories")
+    categories.add_argument("--type", choices=["expense", "income"])
+    categories.set_defaults(handler=command_categories)
+
+    convert = commands.add_parser("convert", help="convert the ledger between transactions.json and transactions.bin")
+    convert.add_argument("--to", required=True, choices=["binary", "json"])
+    convert.set_defaults(handler=command_convert)
+
+    serve = commands.add_parser("serve", help="serve the ledger to local tools as an HTTP/JSON API until interrupted")
+    serve.add_argument("--host", default=API_HOST)
+    serve.add_argument("--port", type=int, default=API_PORT, help="0 picks a free port")
+    serve.set_defaults(handler=command_serve)
+    return parser
+
+
+def run_cli(argv):
+    """Run a headless command and return the process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.batch:
+        return run_batch(sys.stdin)
+    if args.command is None:
+        parser.error("a command or --batch is required")
+
+    try:
+        args.handler(args)
+    except CommandError as error:
+        _write({"error": str(error)})
+        return 1
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head), stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
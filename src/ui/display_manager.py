@@ -1,11 +1,172 @@
 """Module for managing display formatting and screen operations."""
 
+import io
 import os
+import sys
+import shutil
+
+from src.utils.instrumentation import instrumented, count_bytes
+
+# clears the visible screen only, so the scrollback above it is kept
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+
+
+def _ansi_supported(stream):
+    """Whether the terminal understands ANSI sequences, turning them on for Windows consoles that can."""
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+        import msvcrt
+        kernel32 = ctypes.windll.kernel32
+        handle = msvcrt.get_osfhandle(stream.fileno())
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(mode.value & 0x0004 or kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, ImportError, OSError, ValueError):
+        return False
+
+
+class _ScreenWriter(io.TextIOBase):
+    """Stands in for sys.stdout so screens can be collected into frames.
+
+    While a frame is open, writes are buffered and the next flush (input()
+    flushes stdout before showing its prompt) hands the whole frame to the
+    display. Outside a frame, writes pass straight through and only the
+    number of rows they add is tracked.
+    """
+
+    def __init__(self, display, target):
+        self.display = display
+        self.target = target
+        self.frame = None
+
+    def write(self, text):
+        if self.frame is not None:
+            self.frame.append(text)
+        else:
+            self.display.rows_written += text.count("\n")
+            self.target.write(text)
+        return len(text)
+
+    def flush(self):
+        if self.frame is not None:
+            frame, self.frame = "".join(self.frame), None
+            self.display.render(frame)
+        else:
+            # an input() is about to read a line, which echoes one more row
+            self.display.rows_written += 1
+            self.target.flush()
+
+    def isatty(self):
+        return self.target.isatty()
+
+    def fileno(self):
+        return self.target.fileno()
+
+    @property
+    def encoding(self):
+        return self.target.encoding
+
 
 class DisplayManager:
+    """Terminal output for the interactive screens.
+
+    Each screen is built into a frame and drawn with ANSI sequences in a
+    single write. Rows that are already on the terminal are left alone and
+    only the rows that changed are rewritten, so no shell is spawned and
+    little is sent on a screen change. When the frame would not fit, or the
+    screen has scrolled since the last frame, the screen is cleared and
+    redrawn in full. Windows consoles without ANSI support are cleared with
+    cls and redrawn in full on every screen.
+    """
+
+    def __init__(self):
+        self.writer = None
+        self.screen = None
+        self.rows_written = 0
+        self.ansi = None
+        # callables returning a warning to show at the top of the next screen, or None
+        self.notices = []
+
     def clear(self):
-        """Clear the terminal screen."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Start a new screen; everything printed until the next prompt is drawn as one frame."""
+        if self.writer is None or sys.stdout is not self.writer:
+            self.writer = _ScreenWriter(self, sys.stdout)
+            self.screen = None
+            self.ansi = None
+            sys.stdout = self.writer
+        elif self.writer.frame is not None:
+            # the previous screen was never shown, draw it before starting the next
+            self.writer.flush()
+        self.writer.frame = []
+        for notice in self.notices:
+            message = notice()
+            if message:
+                print(message)
+                print("")
+
+    def end_frame(self):
+        """Draw the screen built so far and write everything after it straight to the terminal.
+
+        Used before a listing of unknown length, so its rows show as they are
+        produced instead of being held until the next prompt.
+        """
+        if self.writer is not None and self.writer.frame is not None:
+            self.writer.flush()
+
+    def restore(self):
+        """Draw any screen still being built and give sys.stdout back to the terminal."""
+        if self.writer is not None and sys.stdout is self.writer:
+            self.writer.flush()
+            sys.stdout = self.writer.target
+        self.writer = None
+
+    @instrumented("render")
+    def render(self, frame):
+        """Draw a frame, rewriting only the rows that differ from the ones on screen."""
+        target = self.writer.target
+        rows = frame.split("\n")
+        if not target.isatty():
+            target.write(frame)
+            target.flush()
+            count_bytes("render", written=len(frame))
+            return
+        if self.ansi is None:
+            self.ansi = _ansi_supported(target)
+        if not self.ansi:
+            target.flush()
+            os.system('cls')
+            target.write(frame)
+            target.flush()
+            count_bytes("render", written=len(frame))
+            return
+
+        width, height = shutil.get_terminal_size()
+        known = self.screen
+        if (known is None or len(rows) >= height or len(known) + self.rows_written >= height
+                or any(len(row) >= width for row in rows)):
+            output = CLEAR_SCREEN + frame
+        else:
+            parts = []
+            for index, row in enumerate(rows[:-1]):
+                if index < len(known) and known[index] == row:
+                    continue
+                parts.append(f"\x1b[{index + 1};1H{row}{CLEAR_LINE_END}")
+            # the last row is left unfinished for the prompt, so it always ends with the cursor
+            parts.append(f"\x1b[{len(rows)};1H{rows[-1]}{CLEAR_BELOW}")
+            output = "".join(parts)
+
+        target.write(output)
+        target.flush()
+        count_bytes("render", written=len(output))
+        # only complete rows are known, the prompt row changes as soon as the user types
+        self.screen = rows[:-1]
+        self.rows_written = 0
 
     def show_transaction_details(self, amount, date, category, remarks):
         """Display transaction details in a formatted way."""
@@ -14,36 +175,78 @@ class DisplayManager:
         print(f"Category: {category}")
         print(f"Remark: {remarks}")
 
-    def show_filtered_transactions(self, transactions, transaction_type):
-        """Display filtered transactions and return if any exist."""
-        transactions_exist = False
+    def show_transaction_page(self, transactions, transaction_type, page, page_count):
+        """Display one page of transactions as a table."""
+        lines = [f"{transaction_type.capitalize()} transactions (page {page + 1} of {page_count})", ""]
+        lines.append(f"{'ID':>6}  {'Date':<10}  {'Amount':>12}  {'Category':<20}  Remark")
         for transaction in transactions:
-            if transaction.get("type", "expense") == transaction_type:
-                transactions_exist = True
-                print(f"ID: {transaction['id']}")
-                # Extract only the required fields for show_transaction_details
-                details = {
-                    'amount': transaction['amount'],
-                    'date': transaction['date'],
-                    'category': transaction['category'],
-                    'remarks': transaction['remarks']
-                }
-                self.show_transaction_details(**details)
-                print("")
+            lines.append(f"{transaction.id:>6}  {transaction.date:<10}  {transaction.amount:>12}  "
+                         f"{transaction.category[:20]:<20}  {transaction.remarks}")
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    def show_transaction_table(self, transactions):
+        """Display transactions of both types as a table."""
+        print(f"{'ID':>6}  {'Type':<7}  {'Date':<10}  {'Amount':>12}  {'Category':<20}  Remark")
+        for transaction in transactions:
+            print(f"{transaction.id:>6}  {transaction.type:<7}  {transaction.date:<10}  {transaction.amount:>12}  "
+                  f"{transaction.category[:20]:<20}  {transaction.remarks}")
+
+    def show_search_results(self, transactions, query, count):
+        """Display the first search matches as a table."""
+        print("")
+        if not count:
+            print(f"No transactions match \"{query}\".")
+            return
+
+        shown = f", showing the first {len(transactions)}" if count > len(transactions) else ""
+        print(f"{count} transaction(s) match \"{query}\"{shown}")
+        print("")
+        self.show_transaction_table(transactions)
+
+    def show_date_range(self, transactions, start, end, totals, page, page_count):
+        """Display one page of the transactions in a date range, with the totals for the whole range."""
+        print(f"Transactions from {start:%d/%m/%Y} to {end:%d/%m/%Y} (page {page + 1} of {page_count})")
+        print("")
+        count = sum(totals.counts.values())
+        print(f"Income: ${totals.total('income'):.2f}  Expenses: ${totals.total('expense'):.2f}  "
+              f"Net: ${totals.balance():.2f}  ({count} transactions)")
+        print("")
+        if not count:
+            print("No transactions in this period.")
+            return
+        self.show_transaction_table(transactions)
+
+    def show_diagnostics(self, metrics, enabled):
+        """Display the instrumentation counters as a table."""
+        print("Instrumentation")
+        print("-----------------")
+        if not enabled:
+            print("Instrumentation is off.")
+            print("Set INSTRUMENTATION in src/utils/settings.py (or BUDGET_INSTRUMENTATION=1) and restart to collect it.")
+            return
+        if not metrics:
+            print("Nothing recorded yet.")
+            return
 
-        if not transactions_exist:
-            print(f"No {transaction_type} transactions found.")
-            print("")
+        def ms(seconds):
+            return f"{seconds * 1000:.2f}" if seconds is not None else "-"
 
-        return transactions_exist
+        width = max(len(name) for name in metrics)
+        print(f"{'Path':<{width}}  {'Calls':>7}  {'Total ms':>10}  {'Mean ms':>9}  {'p95 ms':>9}  {'Max ms':>9}  "
+              f"{'Read KB':>9}  {'Written KB':>10}")
+        for name, metric in metrics.items():
+            print(f"{name:<{width}}  {metric['calls']:>7}  {ms(metric['seconds']):>10}  {ms(metric['mean_seconds']):>9}  "
+                  f"{ms(metric['p95_seconds']):>9}  {ms(metric['max_seconds']):>9}  "
+                  f"{metric['bytes_read'] / 1024:>9.1f}  {metric['bytes_written'] / 1024:>10.1f}")
 
     def show_edit_menu(self, transaction, transaction_type):
         """Display the edit menu for a transaction."""
         print(f"Current {transaction_type} details:")
-        print(f"1. Amount: ${transaction['amount']}")
-        print(f"2. Date: {transaction['date']}")
-        print(f"3. Category: {transaction['category']}")
-        print(f"4. Remark: {transaction['remarks']}")
+        print(f"1. Amount: ${transaction.amount}")
+        print(f"2. Date: {transaction.date}")
+        print(f"3. Category: {transaction.category}")
+        print(f"4. Remark: {transaction.remarks}")
         print("5. Go back")
         print("")
 
@@ -3,22 +3,43 @@
 import time
 
 class MenuManager:
+    """Loop-driven menu state machine.
+
+    Each screen is a function that shows a menu, runs the chosen action and
+    returns where to go next: the name of a screen to open (or to return to,
+    if it is already on the stack), "back", "exit", or None to show the same
+    screen again. Navigation never recurses, so a session of any length runs
+    in constant stack depth and memory.
+    """
+
     def __init__(self):
         self.main_menu = {}
         self.transaction_menu = {}
         self.reports_menu = {}
         self.categories_menu = {}
+        self.diagnostics_menu = {}
+        self.screens = {}
+        self.stack = []
         self.exit_handler = None
 
     def initialize_menus(self, handlers):
         """Initialize menu configurations with function references."""
         self.exit_handler = handlers.exit_app
 
+        self.screens.update({
+            "main": handlers.main,
+            "manage_transactions": handlers.manage_transactions,
+            "view_reports": handlers.view_reports,
+            "manage_categories": handlers.manage_categories,
+            "diagnostics": handlers.diagnostics
+        })
+
         self.main_menu.update({
-            "1": ("Manage Transactions", handlers.manage_transactions),
-            "2": ("View Reports", handlers.view_reports),
-            "3": ("Manage Categories", handlers.manage_categories),
-            "4": ("Exit", handlers.exit_app)
+            "1": ("Manage Transactions", lambda:"manage_transactions"),
+            "2": ("View Reports", lambda:"view_reports"),
+            "3": ("Manage Categories", lambda:"manage_categories"),
+            "4": ("Diagnostics", lambda:"diagnostics"),
+            "5": ("Exit", handlers.exit_app)
         })
 
         self.transaction_menu.update({
@@ -28,15 +49,24 @@ class MenuManager:
             "4": ("Edit Income", lambda:handlers.edit_transaction("income")),
             "5": ("Delete Expense", lambda:handlers.delete_transaction("expense")),
             "6": ("Delete Income", lambda:handlers.delete_transaction("income")),
-            "7": ("Go Back", handlers.main)
+            "7": ("Import from CSV", handlers.import_transactions),
+            "8": ("Go Back", lambda:"back")
         })
 
         self.reports_menu.update({
             "1": ("View All Expenses", lambda:handlers.view_transactions("expense")),
             "2": ("View All Income", lambda:handlers.view_transactions("income")),
             "3": ("View Financial Summary", handlers.view_balance),
-            "4": ("Delete All Transactions", handlers.delete_all_transactions),
-            "5": ("Go Back", handlers.main)
+            "4": ("Expenses by Category", lambda:handlers.view_category_breakdown("expense")),
+            "5": ("Income by Category", lambda:handlers.view_category_breakdown("income")),
+            "6": ("Monthly Breakdown", handlers.view_monthly_breakdown),
+            "7": ("Expenses by Category and Month", lambda:handlers.view_category_pivot("expense")),
+            "8": ("Income by Category and Month", lambda:handlers.view_category_pivot("income")),
+            "9": ("Verify Totals", handlers.verify_totals),
+            "10": ("Search Transactions", handlers.search_transactions),
+            "11": ("Transactions Between Dates", handlers.view_between_dates),
+            "12": ("Delete All Transactions", handlers.delete_all_transactions),
+            "13": ("Go Back", lambda:"back")
         })
 
         self.categories_menu.update({
@@ -47,7 +77,13 @@ class MenuManager:
             "5": ("Delete Expense Category", lambda:handlers.delete_category("expense")),
             "6": ("Delete Income Category", lambda:handlers.delete_category("income")),
             "7": ("View Categories", handlers.view_category),
-            "8": ("Go Back", handlers.main)
+            "8": ("Go Back", lambda:"back")
+        })
+
+        self.diagnostics_menu.update({
+            "1": ("Dump to JSON File", handlers.dump_diagnostics),
+            "2": ("Reset Counters", handlers.reset_diagnostics),
+            "3": ("Go Back", lambda:"back")
         })
 
     def display_menu(self, title, menu_items):
@@ -57,23 +93,34 @@ class MenuManager:
         for key, (label, _) in menu_items.items():
             print(f"{key}. {label}")
 
-    def handle_menu_choice(self, menu_items, choice, return_to):
-        """Handle user's menu choice."""
+    def handle_menu_choice(self, menu_items, choice):
+        """Run the action for the user's menu choice and return where to go next."""
         if choice == "exit":
             return self.exit_handler()
 
         if not choice.isdigit() or choice not in menu_items:
             print("Invalid choice. Please try again.")
             time.sleep(0.5)
-            return return_to()
+            return None
 
         _, function = menu_items[choice]
-        result = function()
+        return function()
 
-        # Handle menu transitions
-        if result in ["manage_transactions", "manage_categories"]:
-            return return_to()  # Return to the previous menu (manage transactions)
-        elif result == "main":
-            return self.main_menu["1"][1]()  # Return to main menu
+    def navigate(self, result):
+        """Apply a screen's result to the screen stack."""
+        if result == "exit":
+            self.stack.clear()
+        elif result == "back":
+            if len(self.stack) > 1:
+                self.stack.pop()
+        elif result in self.stack:
+            # returning to a screen that is already open unwinds everything above it
+            del self.stack[self.stack.index(result) + 1:]
+        elif result in self.screens:
+            self.stack.append(result)
 
-        return result
\ No newline at end of file
+    def run(self, start="main"):
+        """Show screens until one of them exits the application."""
+        self.stack = [start]
+        while self.stack:
+            self.navigate(self.screens[self.stack[-1]]())
\ No newline at end of file
@@ -1,14 +1,16 @@
 """Module for handling transaction-related UI operations."""
 
+import os
 import time
-from src.utils.settings import IDLE_TIME
-from src.ui.category_ui import CategoryUI
-from src.models.transaction import add_transaction, update_transaction, delete_transaction, load_transactions, delete_all_transactions
+from src.utils.settings import IDLE_TIME, PAGE_SIZE
+from src.utils.dates import parse_date, validate_date
+from src.models.category_registry import get_category_registry
+from src.models.transaction import add_transaction, update_transaction, delete_transaction, delete_all_transactions, get_transaction, get_transactions_page, search_transactions, get_transactions_between, get_range_totals
 
 class TransactionUI:
     def __init__(self, display_manager):
         self.display = display_manager
-        self.categories = CategoryUI(display_manager)
+        self.categories = get_category_registry()
 
     def add_transaction_ui(self, transaction_type="expense"):
         """Handle UI for adding a transaction."""
@@ -18,7 +20,10 @@ class TransactionUI:
         if amount is None:
             return "manage_transactions"
 
-        date = input("Enter the date (DD/MM/YYYY): ") # TODO: Find a better way to validate date.
+        date = self._validate_date("Enter the date (DD/MM/YYYY) or \"cancel\" to go back: ")
+        if date is None:
+            return "manage_transactions"
+
         category = self._get_categories(transaction_type)
         remark = input("Enter a remark (optional): ")
 
@@ -33,47 +38,37 @@ class TransactionUI:
 
     def edit_transaction_ui(self, transaction_type="expense"):
         """Handle UI for editing a transaction."""
-        transactions = load_transactions()
-        transactions_exist = self.display.show_filtered_transactions(transactions, transaction_type)
-
-        if not transactions_exist:
-            input("\nPress Enter to continue...")
-            return "manage_transactions"
-
-        transaction_id = input(f"Enter the ID of the {transaction_type} to edit (type \"cancel\" to go back): ")
-
-        if transaction_id == "cancel":
-            return "manage_transactions"
+        while True:
+            transaction_id = self._choose_transaction(transaction_type, "edit")
 
-        # Check if the transaction ID is valid
-        if not self._validate_transaction_id(transaction_id, transactions, transaction_type):
-            return self.edit_transaction_ui(transaction_type)
+            if transaction_id is None:
+                return "manage_transactions"
 
-        # Get the transaction to edit
-        transaction = next(t for t in transactions
-                        if t["id"] == int(transaction_id) and t.get("type", "expense") == transaction_type)
+            # Get the transaction to edit
+            transaction = get_transaction(transaction_id)
 
-        self.display.clear()
-        self.display.show_edit_menu(transaction, transaction_type)
-        detail_choice = input("Which detail would you like to edit? (1-5): ")
+            self.display.clear()
+            self.display.show_edit_menu(transaction, transaction_type)
+            detail_choice = input("Which detail would you like to edit? (1-5): ")
 
-        # Check if the user wants to go back
-        if detail_choice == "5":
-            return "manage_transactions"
+            # Check if the user wants to go back
+            if detail_choice == "5":
+                return "manage_transactions"
 
-        # Input validation
-        if not detail_choice.isdigit() or int(detail_choice) < 1 or int(detail_choice) > 5:
-            print("Invalid choice. Please try again.")
-            time.sleep(IDLE_TIME)
-            return self.edit_transaction_ui(transaction_type)
+            # Input validation
+            if not detail_choice.isdigit() or int(detail_choice) < 1 or int(detail_choice) > 5:
+                print("Invalid choice. Please try again.")
+                time.sleep(IDLE_TIME)
+                continue
 
+            updated_values = self._get_updated_values(detail_choice, transaction)
 
-        updated_values = self._get_updated_values(detail_choice, transaction)
+            # Check if the user wants to cancel the operation
+            if updated_values is None:
+                self.display.clear()
+                continue
 
-        # Check if the user wants to cancel the operation
-        if updated_values is None:
-            self.display.clear()
-            return self.edit_transaction_ui(transaction_type)
+            break
 
         update_transaction(transaction_id, **updated_values)
 
@@ -91,31 +86,20 @@ class TransactionUI:
 
     def delete_transaction_ui(self, transaction_type="expense"):
         """Handle UI for deleting a transaction."""
-        transactions = load_transactions()
-        transactions_exist = self.display.show_filtered_transactions(transactions, transaction_type)
-
-        if not transactions_exist:
-            input("\nPress Enter to continue...")
-            return "manage_transactions"
-
-        transaction_id = input(f"Enter the ID of the {transaction_type} to delete (type \"cancel\" to go back): ")
+        transaction_id = self._choose_transaction(transaction_type, "delete")
 
-        if transaction_id == "cancel":
+        if transaction_id is None:
             return "manage_transactions"
 
-        if not self._validate_transaction_id(transaction_id, transactions, transaction_type):
-            return self.delete_transaction_ui(transaction_type)
-
-        transaction = next(t for t in transactions
-                        if t["id"] == int(transaction_id) and t.get("type", "expense") == transaction_type)
+        transaction = get_transaction(transaction_id)
 
         self.display.clear()
         print(f"You are about to delete this {transaction_type}:")
         details = {
-            'amount': transaction['amount'],
-            'date': transaction['date'],
-            'category': transaction['category'],
-            'remarks': transaction['remarks']
+            'amount': transaction.amount,
+            'date': transaction.date,
+            'category': transaction.category,
+            'remarks': transaction.remarks
         }
         self.display.show_transaction_details(**details)
 
@@ -127,6 +111,83 @@ class TransactionUI:
         time.sleep(IDLE_TIME)
         return "manage_transactions"
 
+    def import_transactions_ui(self):
+        """Handle UI for importing transactions from a CSV file."""
+        while True:
+            print("Import Transactions from CSV")
+            print("----------------------")
+            path = input("Enter the path of the CSV file (type \"cancel\" to go back): ").strip()
+
+            if path == "cancel":
+                return "manage_transactions"
+
+            if os.path.isfile(path):
+                break
+
+            print("File not found. Please try again.")
+            time.sleep(IDLE_TIME)
+            self.display.clear()
+
+        date_format = input("Enter the date format used in the file (press Enter for %d/%m/%Y): ").strip() or "%d/%m/%Y"
+        mapping = input("Enter column mappings such as date=Posted,amount=Value (press Enter for defaults): ")
+
+        # csv parsing is only needed here, keep it off the startup path
+        from src.services.import_service import import_csv, parse_column_map, display_import_summary
+        try:
+            columns = parse_column_map(mapping)
+            summary = import_csv(path, self.categories.categories, columns, date_format)
+        except (ValueError, OSError) as error:
+            print(f"Import failed: {error}")
+            input("\nPress Enter to continue...")
+            return "manage_transactions"
+
+        display_import_summary(summary)
+        input("\nPress Enter to continue...")
+        return "manage_transactions"
+
+    def search_transactions_ui(self):
+        """Handle UI for searching transactions by remark and category."""
+        print("Search Transactions")
+        print("----------------------")
+        print("Words must all match, OR separates alternatives and a trailing * matches a prefix.")
+        query = input("Enter search words (type \"cancel\" to go back): ").strip()
+
+        if not query or query == "cancel":
+            return "manage_transactions"
+
+        transactions, count = search_transactions(query, PAGE_SIZE)
+        self.display.show_search_results(transactions, query, count)
+        input("\nPress Enter to continue...")
+        return "manage_transactions"
+
+    def view_between_dates_ui(self):
+        """Handle UI for listing the transactions between two dates with their totals."""
+        print("Transactions Between Dates")
+        print("----------------------")
+        start = self._validate_date("Enter the start date (DD/MM/YYYY) or \"cancel\" to go back: ")
+        if start is None:
+            return "manage_transactions"
+        end = self._validate_date("Enter the end date (DD/MM/YYYY) or \"cancel\" to go back: ")
+        if end is None:
+            return "manage_transactions"
+
+        start, end = sorted((parse_date(start), parse_date(end)))
+        transactions = get_transactions_between(start, end)
+        totals = get_range_totals(start, end)
+        page_count = max(1, (len(transactions) + PAGE_SIZE - 1) // PAGE_SIZE)
+        page = 0
+        while True:
+            self.display.clear()
+            self.display.show_date_range(transactions[page * PAGE_SIZE:(page + 1) * PAGE_SIZE], start, end,
+                                         totals, page, page_count)
+            choice = input("\nEnter \"n\"/\"p\" for next/previous page or press Enter to go back: ").strip().lower()
+            if choice == "n":
+                page = min(page + 1, page_count - 1)
+            elif choice == "p":
+                page = max(page - 1, 0)
+            else:
+                return "manage_transactions"
+
     def delete_all_transactions(self):
         """Handle UI for deleting all transactions."""
         confirm = input("Are you sure you want to delete all transactions? (yes/no): ").lower()
@@ -157,7 +218,34 @@ class TransactionUI:
 
         return "manage_transactions"
 
-    def _validate_transaction_id(self, transaction_id, transactions, transaction_type):
+    def _choose_transaction(self, transaction_type, action):
+        """Page through transactions until the user enters a valid ID. Returns None on cancel."""
+        page = 0
+        while True:
+            transactions, count = get_transactions_page(transaction_type, page, PAGE_SIZE)
+
+            if not count:
+                print(f"No {transaction_type} transactions found.")
+                input("\nPress Enter to continue...")
+                return None
+
+            page_count = (count + PAGE_SIZE - 1) // PAGE_SIZE
+            self.display.clear()
+            self.display.show_transaction_page(transactions, transaction_type, page, page_count)
+
+            choice = input(f"Enter the ID of the {transaction_type} to {action}, \"n\"/\"p\" for next/previous page "
+                           f"(type \"cancel\" to go back): ").strip().lower()
+
+            if choice == "cancel":
+                return None
+            if choice == "n":
+                page = min(page + 1, page_count - 1)
+            elif choice == "p":
+                page = max(page - 1, 0)
+            elif self._validate_transaction_id(choice, transaction_type):
+                return choice
+
+    def _validate_transaction_id(self, transaction_id, transaction_type):
         """Validate transaction ID input."""
         if not transaction_id.isdigit():
             print("Invalid ID. Please try again.")
@@ -165,11 +253,9 @@ class TransactionUI:
             self.display.clear()
             return False
 
-        transaction_exists = any(t["id"] == int(transaction_id) and
-                            t.get("type", "expense") == transaction_type
-                            for t in transactions)
+        transaction = get_transaction(transaction_id)
 
-        if not transaction_exists:
+        if transaction is None or transaction.type != transaction_type:
             print(f"{transaction_type.capitalize()} transaction not found. Please try again.")
             time.sleep(IDLE_TIME)
             self.display.clear()
@@ -179,36 +265,51 @@ class TransactionUI:
 
     def _validate_expense_amount(self):
         """Validate expense amount input."""
-        amount = input('Enter the amount (or type \"cancel\" to go back): $')
+        while True:
+            amount = input('Enter the amount (or type \"cancel\" to go back): $')
+
+            if amount.lower() == "cancel":
+                return None
 
-        if amount.lower() == "cancel":
-            return None
+            # Remove any whitespace
+            amount = amount.strip()
 
-        # Remove any whitespace
-        amount = amount.strip()
+            # Check if amount if empty
+            if not amount:
+                print("Amount cannot be empty. Please try again.")
+                time.sleep(IDLE_TIME)
+                continue
 
-        # Check if amount if empty
-        if not amount:
-            print("Amount cannot be empty. Please try again.")
-            time.sleep(IDLE_TIME)
-            return self._validate_expense_amount()
+            # Check if amount is a valid number
+            if not amount.replace(".", "", 1).isdigit():
+                print("Invalid amount. Please try again.")
+                time.sleep(IDLE_TIME)
+                continue
 
-        # Check if amount is a valid number
-        if not amount.replace(".", "", 1).isdigit():
-            print("Invalid amount. Please try again.")
-            time.sleep(IDLE_TIME)
-            return self._validate_expense_amount()
+            # Convert to float and format to 2 decimal places
+            return f"{float(amount):.2f}"
 
-        # Convert to float and format to 2 decimal places
-        return f"{float(amount):.2f}"
+    def _validate_date(self, prompt):
+        """Ask for a date until it is valid. Returns it as DD/MM/YYYY, or None on cancel."""
+        while True:
+            date = input(prompt).strip()
+
+            if date.lower() == "cancel":
+                return None
+
+            try:
+                return validate_date(date)
+            except ValueError:
+                print("Invalid date. Please enter a real date as DD/MM/YYYY.")
+                time.sleep(IDLE_TIME)
 
     def _get_updated_values(self, detail_choice, transaction):
         """Get updated values for transaction editing."""
         values = {
-            'amount': transaction['amount'],
-            'date': transaction['date'],
-            'category': transaction['category'],
-            'remarks': transaction['remarks']
+            'amount': transaction.amount,
+            'date': transaction.date,
+            'category': transaction.category,
+            'remarks': transaction.remarks
         }
 
         if detail_choice == "1":
@@ -218,13 +319,13 @@ class TransactionUI:
             values['amount'] = f"{float(amount_input):.2f}"
 
         elif detail_choice == "2":
-            date_input = input("Enter new date (DD/MM/YYYY) or \"cancel\": ")
-            if date_input == "cancel":
+            date_input = self._validate_date("Enter new date (DD/MM/YYYY) or \"cancel\": ")
+            if date_input is None:
                 return None
             values['date'] = date_input
 
         elif detail_choice == "3":
-            category_input = self._get_categories(transaction['type'])
+            category_input = self._get_categories(transaction.type)
             if category_input == "cancel":
                 return None
             values['category'] = category_input
@@ -248,16 +349,17 @@ class TransactionUI:
 
     def _get_categories(self, transaction_type):
         """Get the appropriate categories for the transaction type."""
-        categories = self.categories.get_category_list(transaction_type)
-        for index, category in enumerate(categories, start=1):
-            print(f"{index}. {category}")
+        while True:
+            categories = self.categories.get_category_list(transaction_type)
+            for index, category in enumerate(categories, start=1):
+                print(f"{index}. {category}")
 
-        category_choice = input(f"Choose a category (1-{len(categories)}) or \"cancel\" to go back: ")
+            category_choice = input(f"Choose a category (1-{len(categories)}) or \"cancel\" to go back: ")
 
-        # Input validation
-        if not category_choice.isdigit() or int(category_choice) < 1 or int(category_choice) > len(categories):
-            print("Invalid choice. Please try again.")
-            time.sleep(IDLE_TIME)
-            return self._get_categories(transaction_type)
+            # Input validation
+            if not category_choice.isdigit() or int(category_choice) < 1 or int(category_choice) > len(categories):
+                print("Invalid choice. Please try again.")
+                time.sleep(IDLE_TIME)
+                continue
 
-        return categories[int(category_choice) - 1]
+            return categories[int(category_choice) - 1]
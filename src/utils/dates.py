@@ -0,0 +1,29 @@
+import re
+from datetime import datetime
+
+DATE_FORMAT = "%d/%m/%Y"
+
+# day, month and year separated by /, -, . or spaces
+_DATE_PARTS = re.compile(r"\s*(\d{1,2})\s*[-/.\s]\s*(\d{1,2})\s*[-/.\s]\s*(\d{4})\s*")
+
+# parse a day/month/year date, tolerating other separators and missing zero padding
+def parse_date(text):
+    match = _DATE_PARTS.fullmatch(text) if isinstance(text, str) else None
+    if match is None:
+        raise ValueError(f"invalid date \"{text}\", expected DD/MM/YYYY")
+    day, month, year = map(int, match.groups())
+    try:
+        return datetime(year, month, day).date()
+    except ValueError:
+        raise ValueError(f"invalid date \"{text}\", no such day") from None
+
+# validate a date as entered and return it in canonical DD/MM/YYYY form, raising ValueError if it does not parse
+def validate_date(text):
+    return parse_date(text).strftime(DATE_FORMAT)
+
+# convert a DD/MM/YYYY date into sortable YYYY-MM-DD, or None if it does not parse
+def normalize_date(date):
+    try:
+        return parse_date(date).isoformat()
+    except ValueError:
+        return None
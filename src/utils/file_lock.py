@@ -0,0 +1,123 @@
+"""Advisory file locking and atomic file replacement shared by every writer of the data files."""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # not available on Windows, where writes are left unlocked
+    fcntl = None
+
+# files created through mkstemp are private, give replacements the usual permissions instead
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+class _PathLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.shared = False
+        self.file = None
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _path_lock(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), _PathLock())
+
+
+def _enter(lock, path, shared):
+    if lock.depth == 0:
+        lock.file = open(path, 'a', encoding='utf-8')
+        lock.shared = shared
+        if fcntl:
+            fcntl.flock(lock.file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    elif lock.shared and not shared:
+        lock.shared = False
+        if fcntl:
+            fcntl.flock(lock.file, fcntl.LOCK_EX)
+    lock.depth += 1
+
+
+def _exit(lock):
+    lock.depth -= 1
+    if lock.depth == 0:
+        # closing the descriptor releases the flock
+        lock.file.close()
+        lock.file = None
+
+
+@contextmanager
+def locked(path, shared=False):
+    """Hold an fcntl advisory lock on ``path`` for the duration of the block.
+
+    The lock is reentrant within a process: nested blocks (from the same
+    thread) only count depth, and only the outermost one takes and releases
+    the OS lock. An exclusive request nested in a shared one upgrades it.
+    """
+    lock = _path_lock(path)
+    with lock.thread_lock:
+        _enter(lock, path, shared)
+        try:
+            yield
+        finally:
+            _exit(lock)
+
+
+def hold(path):
+    """Take the exclusive lock on ``path`` and keep the OS lock after the calling block ends.
+
+    Other processes stay locked out until ``release(path)``; threads of this
+    process still take turns through ``locked`` as usual.
+    """
+    lock = _path_lock(path)
+    with lock.thread_lock:
+        _enter(lock, path, False)
+
+
+def release(path):
+    """Give up a lock taken with ``hold``."""
+    lock = _path_lock(path)
+    with lock.thread_lock:
+        _exit(lock)
+
+
+@contextmanager
+def atomic_write(path, encoding='utf-8'):
+    """Yield a file that replaces ``path`` only once it is completely written; binary if ``encoding`` is None.
+
+    The data goes to a temporary file in the same directory which is fsynced
+    and renamed over ``path``, so readers see either the old or the new
+    contents and a crash never leaves a half-written file behind.
+    """
+    import tempfile # only writers need it, keep it off the startup path
+
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, 'w' if encoding else 'wb', encoding=encoding) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o666 & ~_umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # make the rename itself durable
+    if hasattr(os, "O_DIRECTORY"):
+        directory_descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
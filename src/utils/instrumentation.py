@@ -0,0 +1,116 @@
+"""Lightweight timing and byte counters for the model, aggregation and rendering hot paths.
+
+Enabled with INSTRUMENTATION in settings. When it is off, ``instrumented``
+hands back the undecorated function and ``count_bytes`` returns at once, so
+the hot paths pay nothing.
+"""
+
+import json
+from functools import wraps
+from time import perf_counter
+
+from src.utils.settings import INSTRUMENTATION
+
+# bucket i holds calls that took less than 2**i microseconds, the last one everything slower
+BUCKETS = 32
+
+
+class Metric:
+    """Call count, cumulative and worst time, a log2 latency histogram and bytes moved for one path."""
+
+    __slots__ = ("calls", "seconds", "max_seconds", "histogram", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.histogram = [0] * BUCKETS
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def record(self, seconds):
+        self.calls += 1
+        self.seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.histogram[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, fraction):
+        """Upper bound in seconds of the bucket holding the given fraction of calls, or None without calls."""
+        if not self.calls:
+            return None
+        wanted = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= wanted:
+                return min(2 ** bucket / 1e6, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "mean_seconds": self.seconds / self.calls if self.calls else None,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "p99_seconds": self.percentile(0.99),
+            "max_seconds": self.max_seconds,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            # only the buckets in use, keyed by their upper bound
+            "histogram_us": {f"<{2 ** bucket}": count for bucket, count in enumerate(self.histogram) if count}
+        }
+
+
+metrics = {}
+
+
+def _metric(name):
+    metric = metrics.get(name)
+    if metric is None:
+        metric = metrics[name] = Metric()
+    return metric
+
+
+def instrumented(name):
+    """Decorator counting the calls and time of a function under ``name``; a no-op when disabled."""
+    def decorate(function):
+        if not INSTRUMENTATION:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _metric(name).record(perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def count_bytes(name, read=0, written=0):
+    """Add to the bytes read or written under ``name``."""
+    if not INSTRUMENTATION:
+        return
+    metric = _metric(name)
+    metric.bytes_read += read
+    metric.bytes_written += written
+
+
+def snapshot():
+    """Return {name: metric dict} for every path recorded so far, sorted by name."""
+    return {name: metrics[name].to_dict() for name in sorted(metrics)}
+
+
+def reset():
+    metrics.clear()
+
+
+def dump(path):
+    """Write the current snapshot to ``path`` as JSON and return it."""
+    data = {"enabled": INSTRUMENTATION, "metrics": snapshot()}
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=4)
+    return data
@@ -0,0 +1,7 @@
+# convert an amount string such as "12.40" into integer cents
+def to_cents(amount):
+    return round(float(amount) * 100)
+
+# format integer cents back into a two decimal amount string
+def format_cents(cents):
+    return f"{cents / 100:.2f}"
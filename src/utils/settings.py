@@ -1,8 +1,50 @@
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+DATA_DIR = os.environ.get("BUDGET_DATA_DIR", os.path.join(BASE_DIR, 'data')) # overridable for benchmarks
 
 IDLE_TIME = 0.5 #seconds
+PAGE_SIZE = 20 # transactions per page in the edit/delete screens
+IMPORT_BATCH_SIZE = 10000 # CSV rows committed per persist
 DATA_FILE = os.path.join(DATA_DIR, 'transactions.json')
 CATEGORIES_FILE = os.path.join(DATA_DIR, 'categories.json')
+META_FILE = os.path.join(DATA_DIR, 'transactions.meta.json')
+
+# "json" rewrites transactions.json on every change, "journal" appends changes
+# to JOURNAL_FILE and periodically compacts them back into DATA_FILE, "sqlite"
+# keeps the ledger in DATABASE_FILE and "binary" as fixed-width records in
+# BINARY_FILE, read through mmap (both imported from DATA_FILE on first run).
+STORAGE_BACKEND = os.environ.get("BUDGET_STORAGE_BACKEND", "json")
+DATABASE_FILE = os.path.join(DATA_DIR, 'transactions.db')
+BINARY_FILE = os.path.join(DATA_DIR, 'transactions.bin')
+BINARY_META_FILE = os.path.join(DATA_DIR, 'transactions.bin.meta.json')
+JOURNAL_FILE = os.path.join(DATA_DIR, 'transactions.journal')
+JOURNAL_COMPACT_EVERY = 1000
+INDEX_FILE = os.path.join(DATA_DIR, 'transactions.index.json') # saved search index
+
+# the interactive app saves changes from a background thread once none has come for
+# WRITE_BEHIND_DELAY seconds, and at most WRITE_BEHIND_MAX_DELAY seconds after the
+# first one, so a crash loses at most that much; 0 saves before each change returns
+WRITE_BEHIND_DELAY = float(os.environ.get("BUDGET_WRITE_BEHIND_DELAY", "0.2"))
+WRITE_BEHIND_MAX_DELAY = 1.0
+
+# ledgers with at least this many rows rebuild and verify their rollups through the
+# NumPy columnar view; below it, importing NumPy costs more than a Python pass
+COLUMNAR_THRESHOLD = 20000
+
+# a JSON or journal ledger with more rows than this that is not loaded yet has its
+# date range totals computed from monthly shard files under SHARD_DIR, each reduced
+# in a separate process; once loaded, the date index answers ranges instead, and the
+# category and monthly reports come from the rollups either way
+PARALLEL_THRESHOLD = 200000
+SHARD_DIR = os.path.join(DATA_DIR, 'shards')
+SHARD_WORKERS = None # defaults to the number of CPUs
+
+# address of the local JSON API started with "main.py serve"
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+
+# time and count the ledger I/O, totals and screen rendering paths, shown under
+# Diagnostics and dumped to DIAGNOSTICS_FILE; free when off
+INSTRUMENTATION = os.environ.get("BUDGET_INSTRUMENTATION", "0") == "1"
+DIAGNOSTICS_FILE = os.path.join(DATA_DIR, 'diagnostics.json')
@@ -0,0 +1,15 @@
+"""Shared test setup: the settings read BUDGET_DATA_DIR on import, so it points at a scratch directory before any test imports src."""
+
+import os
+import atexit
+import shutil
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="budget-tests-")
+os.environ["BUDGET_DATA_DIR"] = DATA_DIR
+os.environ["BUDGET_STORAGE_BACKEND"] = "json"
+shutil.copy(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "categories.json"),
+            DATA_DIR)
+
+# registered before src is imported, so it runs after the application's own exit handlers have saved into it
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
@@ -0,0 +1,94 @@
+"""Reads run beside the writer, and a write that is applied but not saved is answered as such."""
+
+import json
+import asyncio
+import threading
+
+import pytest
+
+from src.models import transaction
+from src.models.transaction_store import TransactionStore
+from src.ui import api_server
+from src.ui.api_server import ApiServer
+
+EXPENSE = {"date": "01/03/2025", "amount": "12.50", "category": "Food & Dining", "remarks": "api test"}
+
+
+async def _request(port, method, path, document=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if document is None else json.dumps(document).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    head, _, payload = (await reader.read()).partition(b"\r\n\r\n")
+    writer.close()
+    return int(head.split()[1]), json.loads(payload)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Run a test coroutine against a server on a free port, restoring the store's saving afterwards."""
+    store = transaction.get_store()
+    monkeypatch.setattr(store, "write_behind", store.write_behind)
+
+    def serve(test):
+        async def run():
+            server = ApiServer()
+            _, port = await server.start("127.0.0.1", 0)
+            try:
+                await test(port)
+            finally:
+                await server.close()
+        asyncio.run(run())
+    return serve
+
+
+def test_write_that_cannot_be_saved_is_applied_and_retried(serve, monkeypatch):
+    persist = TransactionStore._persist
+
+    def failing(store, pending):
+        raise OSError("disk full")
+
+    async def test(port):
+        monkeypatch.setattr(TransactionStore, "_persist", failing)
+        status, added = await _request(port, "POST", "/transactions", EXPENSE)
+        assert status == 202
+        status, found = await _request(port, "GET", f"/transactions/{added['id']}")
+        assert status == 200 and found == added
+
+        monkeypatch.setattr(TransactionStore, "_persist", persist)
+        status, second = await _request(port, "POST", "/transactions", EXPENSE)
+        assert status == 201
+        with open(transaction.get_store().path, 'r', encoding='utf-8') as file:
+            saved = {row["id"] for row in json.load(file)}
+        assert {added["id"], second["id"]} <= saved
+
+    serve(test)
+
+
+def test_listing_being_written_out_holds_up_neither_writes_nor_reads(serve, monkeypatch):
+    rendering, release = threading.Event(), threading.Event()
+    records_json = api_server._records_json
+
+    def slow(transactions):
+        rendering.set()
+        release.wait(10)
+        return records_json(transactions)
+
+    async def test(port):
+        await _request(port, "POST", "/transactions", EXPENSE)
+        monkeypatch.setattr(api_server, "_records_json", slow)
+        listing = asyncio.ensure_future(_request(port, "GET", "/transactions"))
+        await asyncio.get_running_loop().run_in_executor(None, rendering.wait, 10)
+        try:
+            status, _ = await asyncio.wait_for(_request(port, "POST", "/transactions", EXPENSE), 5)
+            assert status == 201
+            status, _ = await asyncio.wait_for(_request(port, "GET", "/reports/monthly"), 5)
+            assert status == 200
+            assert not listing.done()
+        finally:
+            release.set()
+        status, rows = await listing
+        assert status == 200 and rows
+
+    serve(test)
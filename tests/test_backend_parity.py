@@ -0,0 +1,147 @@
+"""Every storage backend behaves the same through the store interface."""
+
+import os
+from datetime import date
+
+import pytest
+
+from src.models.transaction_store import TransactionStore, JournalTransactionStore
+from src.models.sqlite_store import SqliteTransactionStore
+from src.models.binary_store import BinaryTransactionStore
+
+
+def _json_store(directory):
+    return TransactionStore(os.path.join(directory, "transactions.json"),
+                            os.path.join(directory, "transactions.meta.json"))
+
+
+def _journal_store(directory):
+    return JournalTransactionStore(os.path.join(directory, "transactions.json"),
+                                   os.path.join(directory, "transactions.journal"),
+                                   meta_path=os.path.join(directory, "transactions.meta.json"))
+
+
+def _sqlite_store(directory):
+    return SqliteTransactionStore(os.path.join(directory, "transactions.db"))
+
+
+def _binary_store(directory):
+    return BinaryTransactionStore(os.path.join(directory, "transactions.bin"),
+                                  os.path.join(directory, "transactions.bin.meta.json"))
+
+
+BACKENDS = {"json": _json_store, "journal": _journal_store, "sqlite": _sqlite_store, "binary": _binary_store}
+
+ROWS = [
+    ("07/02/2025", "6500.00", "Salary", "", "income"),
+    ("28/02/2025", "12.40", "Food & Dining", "lunch at hawker", "expense"),
+    ("04/03/2025", "14.70", "Food & Dining", "lunch downstairs", "expense"),
+    ("15/03/2025", "45.00", "Shopping", "socks", "expense"),
+]
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def open_store(request, tmp_path):
+    """Return a function that opens the backend's store on a fresh directory, the same one every call."""
+    with open(tmp_path / "transactions.json", 'w', encoding='utf-8') as file:
+        file.write("[]")
+    return lambda: BACKENDS[request.param](str(tmp_path))
+
+
+@pytest.fixture
+def store(open_store):
+    store = open_store()
+    for row in ROWS:
+        store.add(*row)
+    return store
+
+
+def _row(transaction):
+    return transaction.to_dict()
+
+
+def _rows(transactions):
+    return [_row(transaction) for transaction in transactions]
+
+
+def test_add_assigns_increasing_ids(store):
+    assert [t.id for t in store.all()] == [1, 2, 3, 4]
+    added = store.add("16/03/2025", "3.20", "Transportation", "bus", "expense")
+    assert added.id == 5
+    assert _row(store.get(5)) == {"id": 5, "date": "16/03/2025", "amount": "3.20",
+                                  "category": "Transportation", "remarks": "bus", "type": "expense"}
+
+
+def test_get_missing_returns_none(store):
+    assert store.get(99) is None
+
+
+def test_update_changes_fields_and_totals(store):
+    updated = store.update(2, "20.00", "Shopping", "01/03/2025", "corrected")
+    assert _row(updated) == {"id": 2, "date": "01/03/2025", "amount": "20.00",
+                             "category": "Shopping", "remarks": "corrected", "type": "expense"}
+    assert store.get(2).remarks == "corrected"
+    assert store.total("expense") == pytest.approx(79.70)
+    assert store.update(99, "1.00", "Shopping", "01/03/2025", "") is None
+
+
+def test_delete_removes_once(store):
+    assert store.delete(3).id == 3
+    assert store.get(3) is None
+    assert store.delete(3) is None
+    assert [t.id for t in store.all()] == [1, 2, 4]
+    assert store.total("expense") == pytest.approx(57.40)
+    # ids of deleted transactions are not reused
+    assert store.add("16/03/2025", "1.00", "Others", "", "expense").id == 5
+
+
+def test_clear_empties_the_ledger(store):
+    store.clear()
+    assert store.all() == []
+    assert store.total("expense") == 0
+    assert store.total("income") == 0
+
+
+def test_totals_per_type(store):
+    assert store.total("expense") == pytest.approx(72.10)
+    assert store.total("income") == pytest.approx(6500.00)
+    assert store.totals().counts == {"expense": 3, "income": 1}
+
+
+def test_filter_keeps_ledger_order(store):
+    assert [t.id for t in store.filter("expense")] == [2, 3, 4]
+    assert [t.id for t in store.filter("income")] == [1]
+    assert [t.id for t in store.page("expense", 1, 5)] == [3, 4]
+
+
+def test_date_ranges(store):
+    assert [t.id for t in store.between(date(2025, 3, 1), date(2025, 3, 31))] == [3, 4]
+    assert store.period_totals(date(2025, 2, 1), date(2025, 2, 28)).cents == {"income": 650000, "expense": 1240}
+
+
+def test_add_many_commits_every_row(open_store):
+    store = open_store()
+    assert store.add_many(ROWS) == len(ROWS)
+    assert [t.remarks for t in store.all()] == [row[3] for row in ROWS]
+
+
+def test_changes_survive_reopening(store, open_store):
+    store.update(4, "50.00", "Shopping", "15/03/2025", "socks and shoes")
+    store.delete(1)
+    store.flush()
+    expected = _rows(store.all())
+    reopened = open_store()
+    assert _rows(reopened.all()) == expected
+    assert reopened.total("expense") == pytest.approx(77.10)
+    assert reopened.add("16/03/2025", "1.00", "Others", "", "expense").id == 5
+
+
+def test_binary_ledger_exports_over_any_file(tmp_path):
+    binary = _binary_store(str(tmp_path))
+    binary.add_many(ROWS)
+    binary.delete(2)
+    json_path = str(tmp_path / "transactions.json")
+    with open(json_path, 'w', encoding='utf-8') as file:
+        file.write("not a ledger")
+    binary.export_json(json_path)
+    assert _rows(TransactionStore(json_path).all()) == _rows(binary.all())
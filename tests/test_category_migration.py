@@ -0,0 +1,96 @@
+"""Ledgers written before the category table are converted to ids once, and loading never writes."""
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+
+from src.models.category_registry import get_category_registry
+from src.models.transaction_store import TransactionStore, JournalTransactionStore, migrate_category_ids
+from src.utils.settings import CATEGORIES_FILE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEGACY_ROWS = [
+    {"id": 1, "date": "07/02/2025", "amount": "6500.00", "category": "Salary", "remarks": "", "type": "income"},
+    {"id": 2, "date": "28/02/2025", "amount": "12.40", "category": "Food & Dining", "remarks": "", "type": "expense"},
+    {"id": 3, "date": "01/03/2025", "amount": "30.00", "category": "Old Hobby", "remarks": "", "type": "expense"},
+]
+
+
+def _write_legacy(directory):
+    path = os.path.join(directory, "transactions.json")
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(LEGACY_ROWS, file, indent=4)
+    return path
+
+
+def _stats(*paths):
+    return [os.stat(path).st_mtime_ns for path in paths]
+
+
+def test_resolve_does_not_add_unknown_names():
+    registry = get_category_registry()
+    before = _stats(CATEGORIES_FILE)
+    assert registry.resolve("expense", "Never Seen") is None
+    assert _stats(CATEGORIES_FILE) == before
+
+
+def test_legacy_ledger_is_converted_once(tmp_path):
+    path = _write_legacy(tmp_path)
+    assert migrate_category_ids(path)
+
+    with open(path, 'r', encoding='utf-8') as file:
+        rows = json.load(file)
+    assert all("category_id" in row and "category" not in row for row in rows)
+    # a name missing from the table gets a deleted entry, so the row keeps it
+    assert [t.category for t in TransactionStore(path).all()] == ["Salary", "Food & Dining", "Old Hobby"]
+    assert "Old Hobby" not in get_category_registry().get_category_list("expense")
+
+    before = _stats(path, CATEGORIES_FILE)
+    assert not migrate_category_ids(path)
+    TransactionStore(path).all()
+    assert _stats(path, CATEGORIES_FILE) == before
+
+
+def test_rename_reaches_converted_rows(tmp_path):
+    path = _write_legacy(tmp_path)
+    migrate_category_ids(path)
+    registry = get_category_registry()
+    category_id = registry.resolve("expense", "Food & Dining")
+    registry.rename(category_id, "Dining")
+    try:
+        assert TransactionStore(path).get(2).category == "Dining"
+    finally:
+        registry.rename(category_id, "Food & Dining")
+
+
+def test_pending_journal_is_converted(tmp_path):
+    path = os.path.join(tmp_path, "transactions.json")
+    journal_path = os.path.join(tmp_path, "transactions.journal")
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("[]")
+    with open(journal_path, 'w', encoding='utf-8') as file:
+        for row in LEGACY_ROWS:
+            file.write(json.dumps({"op": "add", "transaction": row}) + "\n")
+
+    assert migrate_category_ids(path, journal_path)
+    store = JournalTransactionStore(path, journal_path)
+    assert [t.category for t in store.all()] == ["Salary", "Food & Dining", "Old Hobby"]
+    assert os.path.getsize(journal_path) == 0
+
+
+def test_importing_the_models_leaves_the_ledger_alone(tmp_path):
+    path = _write_legacy(tmp_path)
+    shutil.copy(CATEGORIES_FILE, tmp_path)
+    environment = {**os.environ, "BUDGET_DATA_DIR": str(tmp_path)}
+    script = "import src.models.transaction, src.services.report_service, src.ui.cli"
+    before = _stats(path)
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=environment, check=True)
+    assert _stats(path) == before
+
+    script = "from src.models.transaction import load_transactions; load_transactions()"
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=environment, check=True)
+    with open(path, 'r', encoding='utf-8') as file:
+        assert all("category_id" in row for row in json.load(file))
@@ -0,0 +1,70 @@
+"""Screens are drawn as frames, and long listings are written as they are produced."""
+
+import io
+import sys
+
+import pytest
+
+from src.ui.display_manager import DisplayManager
+
+
+class _Terminal(io.StringIO):
+    def __init__(self, tty):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+@pytest.fixture(params=[False, True], ids=["pipe", "tty"])
+def attach(request, monkeypatch):
+    """Return a function that points sys.stdout at a fake terminal.
+
+    It is called from the test itself, since pytest puts its own capture back
+    on sys.stdout after the fixtures have run.
+    """
+    def attach():
+        terminal = _Terminal(request.param)
+        monkeypatch.setattr(sys, "stdout", terminal)
+        return terminal
+    return attach
+
+
+def test_frame_is_held_until_the_prompt(attach):
+    terminal = attach()
+    display = DisplayManager()
+    display.clear()
+    print("Main Menu:")
+    assert terminal.getvalue() == ""
+    sys.stdout.flush()
+    assert "Main Menu:" in terminal.getvalue()
+    display.restore()
+
+
+def test_listing_is_written_before_it_is_consumed(attach):
+    terminal = attach()
+    display = DisplayManager()
+    display.clear()
+    print("Expense transactions")
+    display.end_frame()
+
+    consumed = []
+    seen = []
+
+    def listing():
+        for index in range(3):
+            consumed.append(index)
+            yield index
+
+    for index in listing():
+        print(f"ID: {index}")
+        seen.append(terminal.getvalue())
+    display.restore()
+
+    assert "Expense transactions" in seen[0]
+    for index, output in enumerate(seen):
+        assert f"ID: {index}" in output
+        assert f"ID: {index + 1}" not in output
+    assert consumed == [0, 1, 2]
+    assert display.writer is None and sys.stdout is terminal
@@ -0,0 +1,31 @@
+"""CSV rows are checked with the same date rules as dates typed into the app."""
+
+import pytest
+
+from src.services.import_service import DEFAULT_COLUMNS, validate_row
+from src.utils.dates import DATE_FORMAT
+
+CATEGORIES = {"expense": ["Food & Dining"], "income": ["Salary"]}
+
+
+def _row(date):
+    return {"date": date, "amount": "12.40", "category": "Food & Dining", "remarks": "lunch", "type": "expense"}
+
+
+def _validate(date, date_format=DATE_FORMAT):
+    return validate_row(_row(date), DEFAULT_COLUMNS, date_format, CATEGORIES, "expense", {})
+
+
+def test_default_format_accepts_what_the_app_accepts():
+    assert _validate("1/3/2025")[0] == "01/03/2025"
+    assert _validate("01-03-2025")[0] == "01/03/2025"
+
+
+@pytest.mark.parametrize("date", ["31/02/2025", "2025-03-01", ""])
+def test_default_format_rejects_dates_the_app_rejects(date):
+    with pytest.raises(ValueError, match="invalid date"):
+        _validate(date)
+
+
+def test_other_formats_are_strptime_formats():
+    assert _validate("2025-03-01", "%Y-%m-%d")[0] == "01/03/2025"
@@ -0,0 +1,63 @@
+"""The NumPy columnar view computes the same rollups as the per-row Python pass."""
+
+import os
+import random
+
+from src.models import binary_store, ledger_rollups
+from src.models.binary_store import BinaryTransactionStore
+from src.models.ledger_columns import LedgerColumns
+from src.models.ledger_rollups import LedgerRollups, UNKNOWN_MONTH
+from src.models.transaction_record import Transaction
+
+CATEGORIES = ["Food & Dining", "Shopping", "Transportation", "Others", "Salary"]
+
+
+def _transactions(count, seed=0):
+    rng = random.Random(seed)
+    transactions = []
+    for index in range(count):
+        # about one row in twenty keeps a date that did not parse
+        ordinal = 0 if rng.random() < 0.05 else rng.randint(730000, 740000)
+        transactions.append(Transaction.from_values(index + 1, ordinal, None if ordinal else "someday",
+                                                    rng.randint(-500, 10 ** 9), rng.choice([1, 2, 3, 70000]), "",
+                                                    rng.choice(["expense", "income"])))
+    return transactions
+
+
+def _looped(transactions):
+    rollups = LedgerRollups()
+    for transaction in transactions:
+        rollups.add(transaction)
+    return rollups
+
+
+def test_columns_match_the_python_pass():
+    transactions = _transactions(5000)
+    rollups = LedgerColumns.from_transactions(transactions).rollups()
+    assert rollups == _looped(transactions)
+    assert any(month == UNKNOWN_MONTH for month, _, _ in rollups.cells)
+
+
+def test_empty_ledger_has_no_cells():
+    assert LedgerColumns.from_transactions([]).rollups().cells == {}
+
+
+def test_large_ledgers_go_through_the_columns(monkeypatch):
+    transactions = _transactions(300, seed=1)
+    monkeypatch.setattr(ledger_rollups, "COLUMNAR_THRESHOLD", 100)
+    assert LedgerRollups.from_transactions(transactions) == _looped(transactions)
+
+
+def test_binary_scan_reads_the_columns_from_the_map(monkeypatch, tmp_path):
+    store = BinaryTransactionStore(os.path.join(tmp_path, "transactions.bin"))
+    rng = random.Random(2)
+    store.add_many([(f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025", f"{rng.randint(1, 9999) / 100:.2f}",
+                     rng.choice(CATEGORIES[:4]), "", "expense") for _ in range(500)]
+                   + [("not a date", "10.00", "Salary", "", "income")])
+    for transaction_id in range(1, 501, 7):
+        store.delete(transaction_id)
+
+    monkeypatch.setattr(binary_store, "COLUMNAR_THRESHOLD", 10 ** 9)
+    looped = store._scan()
+    monkeypatch.setattr(binary_store, "COLUMNAR_THRESHOLD", 0)
+    assert store._scan() == looped == _looped(store.all())
@@ -0,0 +1,116 @@
+"""Write-behind saves changes in the background and keeps what was acknowledged."""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import subprocess
+
+import pytest
+
+from src.models.write_behind import WriteBehind
+from src.utils.settings import WRITE_BEHIND_MAX_DELAY
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# seconds allowed on top of WRITE_BEHIND_MAX_DELAY for a flush to reach the disk
+SLACK = 1.0
+
+# adds rows until stopped, writing "<id> <monotonic time>" once each add has returned
+WRITER = """
+import sys, time
+from src.models import transaction
+
+transaction.enable_write_behind()
+with open(sys.argv[1], 'w', encoding='utf-8', buffering=1) as file:
+    index = 0
+    while True:
+        added = transaction.add_transaction("15/06/2025", "1.00", "Others", f"writer {index}", "expense")
+        file.write(f"{added.id} {time.monotonic()}\\n")
+        index += 1
+        time.sleep(0.001)
+"""
+
+LOADER = """
+import json
+from src.models.transaction import load_transactions
+
+print(json.dumps([t.id for t in load_transactions()]))
+"""
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_flush_failure_is_kept_until_taken_and_retried():
+    disk_full = [True]
+    saved = []
+
+    def flush():
+        if disk_full[0]:
+            raise OSError(28, "No space left on device")
+        saved.append(time.monotonic())
+
+    write_behind = WriteBehind(flush, 0.01, 0.05)
+    write_behind.schedule()
+    _wait_for(lambda: write_behind.error is not None)
+    error = write_behind.take_error()
+    assert isinstance(error, OSError) and error.errno == 28
+    # while the disk stays full every retry reports the failure again
+    _wait_for(lambda: write_behind.error is not None)
+
+    # the queued changes are retried until a flush goes through, which clears the failure
+    disk_full[0] = False
+    _wait_for(lambda: saved)
+    assert write_behind.take_error() is None
+
+
+def test_bursts_are_saved_together():
+    calls = []
+    write_behind = WriteBehind(lambda: calls.append(time.monotonic()), 0.05, 1.0)
+    for _ in range(5):
+        write_behind.schedule()
+        time.sleep(0.005)
+    _wait_for(lambda: calls)
+    time.sleep(0.1)
+    assert len(calls) == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs POSIX signals")
+@pytest.mark.parametrize("backend", ["json", "journal"])
+@pytest.mark.parametrize("stop_signal", ["SIGKILL", "SIGINT"])
+def test_stopped_writer_keeps_acknowledged_changes(tmp_path, backend, stop_signal):
+    """A killed writer loses at most the last WRITE_BEHIND_MAX_DELAY seconds; Ctrl-C loses nothing."""
+    (tmp_path / "transactions.json").write_text("[]", encoding='utf-8')
+    shutil.copy(os.path.join(BASE_DIR, "data", "categories.json"), tmp_path)
+    env = dict(os.environ, BUDGET_DATA_DIR=str(tmp_path), BUDGET_STORAGE_BACKEND=backend)
+    acknowledgements = tmp_path / "acknowledged.txt"
+
+    writer = subprocess.Popen([sys.executable, "-c", WRITER, str(acknowledgements)],
+                              cwd=BASE_DIR, env=env, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for(lambda: acknowledgements.exists() and acknowledgements.stat().st_size, timeout=30.0)
+        time.sleep(1.0)
+    finally:
+        stopped_at = time.monotonic()
+        writer.send_signal(getattr(signal, stop_signal))
+        writer.wait()
+
+    with open(acknowledgements, 'r', encoding='utf-8') as file:
+        # a line cut off by the kill was never complete, so its add was not acknowledged
+        acknowledged = {int(line.split()[0]): float(line.split()[1]) for line in file if line.endswith("\n")}
+    loader = subprocess.run([sys.executable, "-c", LOADER], cwd=BASE_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    saved = set(json.loads(loader.stdout))
+
+    lost = [stopped_at - at for id, at in acknowledged.items() if id not in saved]
+    assert acknowledged
+    if stop_signal == "SIGKILL":
+        assert all(age < WRITE_BEHIND_MAX_DELAY + SLACK for age in lost), lost
+    else:
+        assert not lost